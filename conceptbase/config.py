@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from enum import StrEnum, auto
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class ConceptCoding(StrEnum):
@@ -24,6 +24,56 @@ class DataSource(StrEnum):
     EICU = auto()
 
 
+class SourceBackend(StrEnum):
+    """
+    Enum for the backends that answer the queries of the source mappers and samplers of a data source.
+    """
+
+    DATABASE = auto()
+    FILE = auto()
+    REPLAY = auto()
+
+
+class FetchEngine(StrEnum):
+    """
+    Enum for the engines that fetch query results from a database source.
+    """
+
+    PANDAS = auto()
+    BINARY_COPY = auto()
+
+
+class SamplingStrategy(StrEnum):
+    """
+    Enum for the strategies that split the subjects of a database source into chunks.
+    """
+
+    DISTINCT = auto()
+    RANGE = auto()
+    WEIGHTED = auto()
+
+
+class DtypeBackend(StrEnum):
+    """
+    Enum for the backends of the columns of the frames returned by the source mappers.
+    """
+
+    NUMPY = auto()
+    PYARROW = auto()
+
+
+class ValidationMode(StrEnum):
+    """
+    Enum for the policies that validate the frames of the source mappers against their FHIR schema.
+    """
+
+    FULL = auto()
+    SAMPLE = auto()
+    FIRST = auto()
+    SCHEMA = auto()
+    OFF = auto()
+
+
 @dataclass
 class MapperConfig:
     """
@@ -46,10 +96,19 @@ class ConceptConfig(BaseModel):
     description: str
     identifiers: dict[ConceptCoding, str]
     unit: str
+    # plausibility limits of the values in the unit of the concept, values outside of them are dropped (None = open)
+    lower_limit: float | None = None
+    upper_limit: float | None = None
     # TODO - We either need the schema attribute, or the klass attribute but not both
     # schema: str
     mapper: list[MapperConfig]
 
+    @field_validator("lower_limit", "upper_limit", mode="before")
+    @classmethod
+    def _parse_limit(cls, value: Any) -> Any:
+        # Concepts without a limit declare it as an empty string
+        return None if value == "" else value
+
 
 @dataclass
 class SourceConfig:
@@ -57,7 +116,39 @@ class SourceConfig:
     Configuration for the source mapper.s
     """
 
+    # database URL of the database backend, directory of the Parquet/CSV tables of the file backend, or directory
+    # of the recorded query results of the replay backend
     connection: str
+    # backend that answers the queries of the source, the file and replay backends require the optional pyarrow package
+    backend: SourceBackend = SourceBackend.DATABASE
     chunksize: int = 10000
     # optional limit for the number of rows to be fetched
     limit: int = -1
+    # strategy that splits the subjects into chunks, range chunks are ordered and contiguous subject ID ranges,
+    # weighted chunks are contiguous ranges of roughly equal estimated row volume
+    sampling: SamplingStrategy = SamplingStrategy.DISTINCT
+    # stream the results of a chunk in batches of the given number of rows (-1 = no streaming)
+    fetch_size: int = -1
+    # engine that fetches the (non-streamed) results of a chunk
+    fetch_engine: FetchEngine = FetchEngine.PANDAS
+    # backend of the typed columns of the query results (pyarrow requires the optional pyarrow package)
+    dtype_backend: DtypeBackend = DtypeBackend.NUMPY
+    # directory of the persistent query result cache, which requires the optional pyarrow package (None = no cache)
+    cache_dir: str | None = None
+    # maximum size of the cache in bytes, the least recently used results are evicted first (-1 = unbounded)
+    cache_size: int = -1
+    # directory into which all query results of the database backend are recorded, to be replayed by the replay backend
+    record_dir: str | None = None
+    # simulated latency of a query of the replay backend in seconds
+    replay_latency: float = 0.0
+    # load the subjects of a chunk into a temporary table, which is joined by all queries of the chunk
+    subject_table: bool = False
+    # connection pool settings, the pool is shared by all mappers and samplers of a source
+    pool_size: int = 5
+    max_overflow: int = 10
+    # recycle connections after the given number of seconds (-1 = never)
+    pool_recycle: int = -1
+    # test connections for liveness before handing them out
+    pool_pre_ping: bool = False
+    # executions of a query on a connection before it's prepared server-side (None = never, psycopg only)
+    prepare_threshold: int | None = 1
@@ -0,0 +1,29 @@
+from importlib import import_module
+from types import ModuleType
+
+
+def import_pyarrow(feature: str) -> ModuleType:
+    """
+    Imports the optional pyarrow package together with the modules used by the pipeline.
+
+    Parameters
+    ----------
+    feature : str
+        The feature which requires pyarrow, e.g. "The query cache".
+
+    Returns
+    -------
+    ModuleType
+        The pyarrow package, with its compute, dataset and parquet modules loaded.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow isn't installed, e.g. without the `pyarrow` extra.
+    """
+    try:
+        for module in ("pyarrow.compute", "pyarrow.dataset", "pyarrow.parquet"):
+            import_module(module)
+    except ImportError as e:
+        raise ImportError(f"{feature} requires the optional pyarrow package.") from e
+    return import_module("pyarrow")
@@ -1,10 +1,11 @@
-from typing import Any
+from typing import Any, Generator
 
 from pandera.typing import DataFrame
 
 from conceptbase.config import ConceptCoding, ConceptConfig
 from icu_pipeline.graph import Node
-from icu_pipeline.source import AbstractSourceMapper, DataSource, SourceConfig, getDataSourceMapper
+from icu_pipeline.schema.validation import SchemaValidator
+from icu_pipeline.source import AbstractSourceMapper, DataSource, SourceConfig, getBackendMapper, getDataSourceMapper
 from icu_pipeline.unit import BaseConverter, ConverterConfig
 
 from .job import Job
@@ -63,7 +64,8 @@ class Concept(Node):
                 unit=config.unit,
                 **config.params,
             )
-            self._data_sources[config.source] = mapper
+            # e.g. the queries of a database source mapper are answered from files by the file backend
+            self._data_sources[config.source] = getBackendMapper(mapper, source_configs[config.source])
 
         self._concept_coding = concept_coding
 
@@ -88,6 +90,96 @@ class Concept(Node):
         # Query the DB and return the DF
         return self._data_sources[job.database].get_data(job)
 
+    def get_batches(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> Generator[DataFrame, None, None]:
+        """Map the concept to data from the sources, yielding the data in batches."""
+        assert (
+            job.database in self._data_sources
+        ), f"Data Source '{job.database}' doesn't have a mapper for Concept '{self._concept_config.name}'"
+        yield from self._data_sources[job.database].get_batches(job)
+
+    async def get_data_async(self, job: Job) -> DataFrame:
+        """Map the concept to data from the sources, without blocking the event loop of the graph."""
+        assert (
+            job.database in self._data_sources
+        ), f"Data Source '{job.database}' doesn't have a mapper for Concept '{self._concept_config.name}'"
+        return await self._data_sources[job.database].get_data_async(job)
+
+    def setValidator(self, validator: SchemaValidator) -> None:
+        """
+        Sets the validator of the frames of all mappers of the concept.
+
+        Parameters
+        ----------
+        validator : SchemaValidator
+            The validator with the validation policy of the pipeline.
+        """
+        for mapper in self._data_sources.values():
+            mapper.set_validator(validator)
+
+    def pushConversion(self, converter: BaseConverter) -> bool:
+        """
+        Pushes the unit conversion of a converter into the mappers of the concept.
+
+        Conversions that are an affine function of the values are applied by the mappers, e.g. in
+        the query of a database source mapper, such that the converter isn't needed. Sources, whose
+        unit already is the unit of the concept, aren't converted at all.
+
+        Parameters
+        ----------
+        converter : BaseConverter
+            The converter of the concept.
+
+        Returns
+        -------
+        bool
+            Whether the conversion was pushed into the mappers. If not, none of them was changed.
+        """
+        transforms = converter.getLinearTransforms()
+        if transforms is None:
+            return False
+
+        sink_unit = converter._config.sink_unit
+        conversions = {
+            source: transform
+            for source, transform in transforms.items()
+            if source in self._data_sources and converter._config.source_units[source] != sink_unit
+        }
+        if not all(self._data_sources[source].supports_conversion() for source in conversions):
+            return False
+
+        for source, (factor, offset) in conversions.items():
+            self._data_sources[source].push_conversion(sink_unit, factor, offset)
+        return True
+
+    def pushLimits(self, lower_limit: float | None, upper_limit: float | None, count_dropped: bool = False) -> bool:
+        """
+        Pushes the plausibility limits of the concept into its mappers.
+
+        The limits are in the unit of the concept, so they can only be applied by mappers, which
+        already provide their values in this unit, e.g. after `pushConversion`.
+
+        Parameters
+        ----------
+        lower_limit : float | None
+            The lowest plausible value, None for no lower limit.
+        upper_limit : float | None
+            The highest plausible value, None for no upper limit.
+        count_dropped : bool
+            Whether the rows dropped in the database are counted with an additional query per chunk.
+
+        Returns
+        -------
+        bool
+            Whether the limits were pushed into the mappers. If not, none of them was changed.
+        """
+        mappers = list(self._data_sources.values())
+        if not all(m.supports_limits() and m._unit == self._concept_config.unit for m in mappers):
+            return False
+
+        for mapper in mappers:
+            mapper.push_limits(lower_limit, upper_limit, count_dropped)
+        return True
+
     def getDefaultConverter(self) -> BaseConverter:
         return BaseConverter.getConverter(
             config=ConverterConfig(
@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Generator
+
+import numpy as np
+import pandas as pd
+from pandera.typing import DataFrame
+
+from icu_pipeline.graph import Node
+from icu_pipeline.job import Job
+from icu_pipeline.schema.fhir import FHIRMedicationStatement, FHIRObservation
+
+
+@dataclass
+class FilterStatistics:
+    """
+    Counters of the rows of a single concept, which were compared to its plausibility limits.
+
+    Attributes
+    ----------
+    rows : int
+        Number of rows that were compared to the limits.
+    dropped : int
+        Number of rows that were dropped, since their value is outside of the limits.
+    """
+
+    rows: int = 0
+    dropped: int = 0
+
+    def __str__(self) -> str:
+        return f"FilterStatistics(rows={self.rows}, dropped={self.dropped})"
+
+
+class LimitFilter(Node):
+    """
+    Drops the rows of a concept, whose values are outside of the plausibility limits of the concept.
+
+    The limits are given in the unit of the concept, so the filter is attached after the converter
+    of the concept. The rows are selected by a single vectorized mask per frame. Missing values are
+    not implausible and therefore kept. Limits that are pushed into the queries of the mappers
+    instead (see `Concept.pushLimits`) drop the rows in the database or the file source.
+
+    The dropped rows are counted per concept in a process-wide registry. The processes of a
+    multiprocessing graph pass their counters back to their parent process, which merges them
+    (see `merge`). The mappers count the rows dropped by their pushed limits in the same registry
+    (see `count`).
+
+    Parameters
+    ----------
+    concept_id : str
+        The ID of the concept to be filtered.
+    lower_limit : float | None
+        The lowest plausible value, None for no lower limit.
+    upper_limit : float | None
+        The highest plausible value, None for no upper limit.
+
+    Methods
+    -------
+    filter(df):
+        Drops the rows of a frame in FHIR format outside of the limits.
+    apply(concept_id, df, field, lower_limit, upper_limit):
+        Drops the rows of a frame, whose field is outside of the limits.
+    count(concept_id, rows, dropped):
+        Counts the compared and dropped rows of a concept.
+    get_statistics():
+        Returns the counters of all concepts that were filtered so far.
+    merge(statistics):
+        Adds the counters of another process to the counters of all concepts.
+    reset():
+        Clears the counters of all concepts.
+    """
+
+    # The fields of the FHIR schemas, which hold the values compared to the limits
+    VALUE_FIELDS = [FHIRObservation.value_quantity__value, FHIRMedicationStatement.dosage__rate_quantity__value]
+
+    _statistics: dict[str, FilterStatistics] = {}
+    _lock = Lock()
+
+    def __init__(self, concept_id: str, lower_limit: float | None, upper_limit: float | None) -> None:
+        super().__init__(concept_id=concept_id)
+        self._lower_limit = lower_limit
+        self._upper_limit = upper_limit
+
+    def get_data(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
+        data = super().fetch_sources(job, *args, **kwargs)
+        return self.filter(data[self._concept_id])
+
+    def get_batches(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> Generator[DataFrame, None, None]:
+        for batch in self._sources[self._concept_id].read_batches(job, *args, **kwargs):
+            yield self.filter(batch)
+
+    def filter(self, df: pd.DataFrame) -> DataFrame:
+        """
+        Drops the rows of a frame in FHIR format, whose values are outside of the limits.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The frame of the concept.
+
+        Returns
+        -------
+        DataFrame
+            The frame without the implausible rows.
+        """
+        field = next((f for f in self.VALUE_FIELDS if f in df.columns), None)
+        if field is None:
+            return df.pipe(DataFrame)
+        return self.apply(self._concept_id, df, field, self._lower_limit, self._upper_limit).pipe(DataFrame)
+
+    @staticmethod
+    def mask(values: pd.Series, lower_limit: float | None, upper_limit: float | None) -> np.ndarray:
+        """Returns whether every value is plausible, missing values are."""
+        array = values.to_numpy(dtype=float, na_value=np.nan)
+        implausible = np.zeros(len(array), dtype=bool)
+        if lower_limit is not None:
+            implausible |= array < lower_limit
+        if upper_limit is not None:
+            implausible |= array > upper_limit
+        return ~implausible
+
+    @staticmethod
+    def apply(
+        concept_id: str, df: pd.DataFrame, field: str, lower_limit: float | None, upper_limit: float | None
+    ) -> pd.DataFrame:
+        """
+        Drops the rows of a frame, whose field is outside of the limits, and counts them for the concept.
+
+        Parameters
+        ----------
+        concept_id : str
+            The ID of the concept, for which the rows are counted.
+        df : pd.DataFrame
+            The frame to be filtered.
+        field : str
+            The column of the values compared to the limits.
+        lower_limit : float | None
+            The lowest plausible value, None for no lower limit.
+        upper_limit : float | None
+            The highest plausible value, None for no upper limit.
+
+        Returns
+        -------
+        pd.DataFrame
+            The frame without the implausible rows, the frame itself if no row was dropped.
+        """
+        keep = LimitFilter.mask(df[field], lower_limit, upper_limit)
+        dropped = len(keep) - int(keep.sum())
+        LimitFilter.count(concept_id, len(keep), dropped)
+        return df[keep].reset_index(drop=True) if dropped else df
+
+    @staticmethod
+    def count(concept_id: str, rows: int, dropped: int) -> None:
+        """
+        Counts the rows of a concept, which were compared to its limits, and the dropped ones.
+
+        Parameters
+        ----------
+        concept_id : str
+            The ID of the concept, for which the rows are counted.
+        rows : int
+            The number of rows that were compared to the limits.
+        dropped : int
+            The number of rows that were dropped.
+        """
+        with LimitFilter._lock:
+            statistics = LimitFilter._statistics.setdefault(concept_id, FilterStatistics())
+            statistics.rows += rows
+            statistics.dropped += dropped
+
+    @staticmethod
+    def get_statistics() -> dict[str, FilterStatistics]:
+        with LimitFilter._lock:
+            return dict(LimitFilter._statistics)
+
+    @staticmethod
+    def merge(statistics: dict[str, FilterStatistics]) -> None:
+        """
+        Adds the counters of another process, e.g. of a process of the graph, to the counters of all concepts.
+
+        Parameters
+        ----------
+        statistics : dict[str, FilterStatistics]
+            The counters of the other process (see `get_statistics`).
+        """
+        for concept_id, filter_statistics in statistics.items():
+            LimitFilter.count(concept_id, filter_statistics.rows, filter_statistics.dropped)
+
+    @staticmethod
+    def reset() -> None:
+        with LimitFilter._lock:
+            LimitFilter._statistics.clear()
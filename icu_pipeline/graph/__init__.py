@@ -5,6 +5,7 @@ from enum import StrEnum, auto
 class GraphType(StrEnum):
     InMemory = auto()
     Multiprocessing = auto()
+    Async = auto()
 
 
 t = os.environ.get("GRAPH_TYPE", GraphType.InMemory)
@@ -15,7 +16,12 @@ match t:
     case GraphType.Multiprocessing:
         from icu_pipeline.graph.parallel import MultiprocessingNode as Node  # type: ignore[assignment]
         from icu_pipeline.graph.parallel import MultiprocessingPipe as Pipe  # type: ignore[assignment]
+    case GraphType.Async:
+        from icu_pipeline.graph.asynchronous import AsyncNode as Node  # type: ignore[assignment]
+        from icu_pipeline.graph.asynchronous import AsyncPipe as Pipe  # type: ignore[assignment]
     case _:
         raise EnvironmentError(f"Unknown GraphType '{t}'. Available Modules: {[tt.value for tt in GraphType]}")
 
-__all__ = ["Node", "Pipe"]
+GRAPH_TYPE = GraphType(t)
+
+__all__ = ["GRAPH_TYPE", "GraphType", "Node", "Pipe"]
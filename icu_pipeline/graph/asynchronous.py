@@ -0,0 +1,109 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Coroutine, Generator, TypeVar
+
+from pandera.typing import DataFrame
+
+from icu_pipeline.graph.base import BaseNode, BasePipe
+from icu_pipeline.job import Job
+from icu_pipeline.logger import ICULogger
+
+logger = ICULogger.get_logger()
+
+T = TypeVar("T")
+
+# The event loop of the graph, it's inherited by the worker threads of the synchronous node methods
+_loop: ContextVar[asyncio.AbstractEventLoop | None] = ContextVar("icu_pipeline_loop", default=None)
+# The node and the data of its sources, which were read before the node runs in a worker thread
+_prefetched: ContextVar[tuple[BaseNode, dict[str, DataFrame]] | None] = ContextVar(
+    "icu_pipeline_prefetched", default=None
+)
+# Every job runs on the same event loop, so that async connections can be pooled across jobs
+_runner: asyncio.Runner | None = None
+
+
+def run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a coroutine of the graph from synchronous code.
+
+    Calls from the worker thread of a node are scheduled on the event loop of the graph, every
+    other call runs the coroutine on the event loop, which is shared by all jobs.
+
+    Parameters
+    ----------
+    coroutine : Coroutine
+        The coroutine to be run.
+
+    Returns
+    -------
+    Any
+        The result of the coroutine.
+    """
+    loop = _loop.get()
+    if loop is not None:
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner()
+    return _runner.run(_run_on_loop(coroutine))
+
+
+async def _run_on_loop(coroutine: Coroutine[Any, Any, T]) -> T:
+    _loop.set(asyncio.get_running_loop())
+    return await coroutine
+
+
+def _single_batch(df: DataFrame) -> Generator[DataFrame, None, None]:
+    yield df
+
+
+class AsyncNode(BaseNode):
+    """
+    Node, which reads all of its sources concurrently on an event loop.
+
+    The sources of a node are read with `asyncio.gather`, so that e.g. the queries of all concepts
+    of a job are in flight at once. Concepts of database sources run their queries on async
+    connections, every other node runs its synchronous `get_data` in a worker thread after its
+    sources have been read.
+    """
+
+    async def fetch_sources_async(self, job: Job) -> dict[str, DataFrame]:
+        logger.debug(f"Getting data for Node '{self}'...")
+        data = await asyncio.gather(*(s.read_async(job) for s in self._sources.values()))
+        return dict(zip(self._sources.keys(), data))
+
+    def fetch_sources(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> dict[str, DataFrame]:
+        prefetched = _prefetched.get()
+        if prefetched is not None and prefetched[0] is self:
+            return prefetched[1]
+        return run(self.fetch_sources_async(job))
+
+    def fetch_source_batches(
+        self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]
+    ) -> dict[str, Generator[DataFrame, None, None]]:
+        # All sources are read at once, so they can't be streamed
+        return {c: _single_batch(df) for c, df in self.fetch_sources(job, *args, **kwargs).items()}
+
+    async def get_data_async(self, job: Job) -> DataFrame:
+        token = _prefetched.set((self, await self.fetch_sources_async(job)))
+        try:
+            # The worker thread inherits the context, so `fetch_sources` returns the prefetched data
+            return await asyncio.to_thread(self.get_data, job)
+        finally:
+            _prefetched.reset(token)
+
+
+class AsyncPipe(BasePipe):
+    def __init__(self, source: AsyncNode, sink: AsyncNode) -> None:
+        super().__init__(source, sink)
+
+    def read(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
+        return run(self.read_async(job))
+
+    def read_batches(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> Generator[DataFrame, None, None]:
+        yield self.read(job)
+
+    def write(self, job: Job, data: DataFrame, *args: list[Any], **kwargs: dict[Any, Any]) -> None:
+        # The sink reads the data from the source node, the pipe doesn't buffer it
+        return None
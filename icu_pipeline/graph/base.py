@@ -1,16 +1,15 @@
-from typing import TYPE_CHECKING, Any
+import asyncio
+from typing import Any, Generator
 
 from pandera.typing import DataFrame
 
 from icu_pipeline.job import Job
 
-if TYPE_CHECKING:
-    from icu_pipeline.concept import Concept
-
 
 class BaseNode:
     ID = 0
-    REQUIRED_CONCEPTS: list["Concept"] = []
+    # The IDs of the concepts, whose data the node needs in addition to its own
+    REQUIRED_CONCEPTS: list[str] = []
 
     def __init__(self, concept_id: str) -> None:
         self._node_id = BaseNode.ID
@@ -36,6 +35,18 @@ class BaseNode:
     def get_data(self, job: Job, *args: Any, **kwargs: Any) -> DataFrame:
         raise NotImplementedError
 
+    def get_batches(self, job: Job, *args: Any, **kwargs: Any) -> Generator[DataFrame, None, None]:
+        """Yields the data of the node in batches. By default, the data is yielded as a single batch."""
+        yield self.get_data(job, *args, **kwargs)
+
+    def fetch_source_batches(self, job: Job, *args: Any, **kwargs: Any) -> dict[str, Generator[DataFrame, None, None]]:
+        """Returns the batches of every source. By default, the sources are read lazily one after another."""
+        return {c: s.read_batches(job, *args, **kwargs) for c, s in self._sources.items()}
+
+    async def get_data_async(self, job: Job) -> DataFrame:
+        """Returns the data of the node from a coroutine. By default, the node runs in a worker thread."""
+        return await asyncio.to_thread(self.get_data, job)
+
 
 class BasePipe:
     def __init__(self, source: BaseNode, sink: BaseNode) -> None:
@@ -48,6 +59,14 @@ class BasePipe:
     def read(self, job: Job, *args: Any, **kwargs: Any) -> DataFrame:
         raise NotImplementedError
 
+    def read_batches(self, job: Job, *args: Any, **kwargs: Any) -> Generator[DataFrame, None, None]:
+        # Without streaming support, the complete data is read as a single batch
+        yield self._source.get_data(job)
+
+    async def read_async(self, job: Job) -> DataFrame:
+        # Forward the get_data_async method
+        return await self._source.get_data_async(job)
+
 
 class Graph:
     def __init__(self) -> None:
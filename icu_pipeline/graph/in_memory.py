@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Generator
 
 from pandera.typing import DataFrame
 
@@ -22,6 +22,10 @@ class InMemoryPipe(BasePipe):
         # Forward the get_data method
         return self._source.get_data(job)
 
+    def read_batches(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> Generator[DataFrame, None, None]:
+        # Forward the get_batches method
+        return self._source.get_batches(job)
+
     def write(self, job: Job, data: DataFrame, *args: list[Any], **kwargs: dict[Any, Any]) -> None:
         # Nothing special
         return data  # type: ignore[return-value]  # TODO
@@ -10,16 +10,52 @@ from icu_pipeline.logger import ICULogger
 logger = ICULogger.get_logger()
 
 
+def _get_statistics() -> dict[str, Any]:
+    # The counters of the process-wide registries, which are passed back to the parent process, the validated
+    # concepts aren't validated again by the processes of the next jobs
+    from icu_pipeline.filter import LimitFilter
+    from icu_pipeline.schema.validation import SchemaValidator
+
+    return {
+        "limits": LimitFilter.get_statistics(),
+        "validation": SchemaValidator.get_statistics(),
+        "validated": SchemaValidator.get_validated(),
+    }
+
+
+def _merge_statistics(statistics: dict[str, Any]) -> None:
+    from icu_pipeline.filter import LimitFilter
+    from icu_pipeline.schema.validation import SchemaValidator
+
+    LimitFilter.merge(statistics["limits"])
+    SchemaValidator.merge(statistics["validation"], statistics["validated"])
+
+
+def _reset_statistics() -> None:
+    from icu_pipeline.filter import LimitFilter
+    from icu_pipeline.schema.validation import SchemaValidator
+
+    # The concepts validated by the parent process stay validated
+    validated = SchemaValidator.get_validated()
+    LimitFilter.reset()
+    SchemaValidator.reset()
+    SchemaValidator.merge({}, validated)
+
+
 class MultiprocessingNode(BaseNode):
     def fetch_sources(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> dict[str, DataFrame]:
         manager = multiprocessing.Manager()
         out = manager.dict()
+        statistics = manager.list()
 
         logger.debug(f"Getting data for Node '{self}'...")
-        procs = [s.read(job, out) for s in self._sources.values()]
+        procs = [s.read(job, out, statistics) for s in self._sources.values()]
         for p in procs:
             assert isinstance(p, multiprocessing.Process)
             p.join()
+        # The counters of the sources are counted by this process, so they are passed on to its parent
+        for source_statistics in statistics:
+            _merge_statistics(source_statistics)
         return out  # type: ignore[return-value]
 
     def get_data(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
@@ -33,12 +69,22 @@ class MultiprocessingPipe(BasePipe):
     def __init__(self, source: MultiprocessingNode, sink: MultiprocessingNode) -> None:
         super().__init__(source, sink)
 
-    def read(self, job: Job, managed_dict: dict[Any, Any], *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
-        def _read(result: dict) -> None:
+    def read(
+        self,
+        job: Job,
+        managed_dict: dict[Any, Any],
+        managed_statistics: list[Any],
+        *args: list[Any],
+        **kwargs: dict[Any, Any],
+    ) -> DataFrame:
+        def _read(result: dict, statistics: list) -> None:
+            # The forked process starts with the counters of its parent, only its own are passed back
+            _reset_statistics()
             df = self._source.get_data(job)
             result[self._source._concept_id] = df
+            statistics.append(_get_statistics())
 
-        p = multiprocessing.Process(target=_read, args=[managed_dict], daemon=False)
+        p = multiprocessing.Process(target=_read, args=[managed_dict, managed_statistics], daemon=False)
         p.start()
         return p  # type: ignore[return-value]
 
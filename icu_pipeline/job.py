@@ -1,12 +1,20 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 from pandera.typing import DataFrame
 
 from icu_pipeline.source import DataSource
 
+if TYPE_CHECKING:
+    from icu_pipeline.source.database.session import SubjectSession
+
 
 @dataclass(frozen=True)
 class Job:
     jobID: str
     database: DataSource
     subjects: DataFrame
+    # database session of the chunk, which holds the subjects in a temporary table
+    session: "SubjectSession | None" = None
+    # inclusive range of the first identifier of the subjects, if the chunk is a contiguous range
+    subject_range: tuple[Any, Any] | None = None
@@ -1,15 +1,21 @@
+from dataclasses import replace
 from pathlib import Path
 from typing import Generator
 
 from pandera.typing import DataFrame
 from yaml import safe_load_all
 
+from conceptbase.config import ValidationMode
 from icu_pipeline.concept import Concept, ConceptCoding, ConceptConfig
+from icu_pipeline.filter import LimitFilter
+from icu_pipeline.graph import GRAPH_TYPE, GraphType
 from icu_pipeline.graph.base import BaseNode, Graph
 from icu_pipeline.job import Job
 from icu_pipeline.logger import ICULogger
+from icu_pipeline.schema.validation import SchemaValidator
 from icu_pipeline.sink import AbstractSinkMapper, MappingFormat
 from icu_pipeline.source import DataSource, SourceConfig, getDataSampler
+from icu_pipeline.source.database import AbstractDatabaseSourceMapper, EngineRegistry, fuse_mappers
 
 logger = ICULogger.get_logger()
 
@@ -22,11 +28,28 @@ class Pipeline:
         mapping_format: MappingFormat = MappingFormat.FHIR,
         concept_coding: ConceptCoding = ConceptCoding.SNOMED,
         processes: int = 2,
+        fuse_queries: bool = True,
+        push_conversions: bool = True,
+        push_limits: bool = True,
+        count_dropped: bool = False,
+        validation: ValidationMode = ValidationMode.FULL,
+        validation_sample_size: int = 1000,
     ) -> None:
         """A Pipeline that extracts, transforms, and loads data into sinks.
         Arguments:
           sources: (List[str]) List of ICU Databases that are supposed to be queries.
             Available DBs: mimic, amds, eicu, sicdb
+          fuse_queries: (bool) Query concepts, which read the same table, with a single query per chunk.
+          push_conversions: (bool) Convert values, whose conversion into the unit of the concept is linear,
+            in the queries of the mappers instead of converter nodes.
+          push_limits: (bool) Drop values outside of the plausibility limits of the concepts in the queries
+            of the mappers instead of filter nodes.
+          count_dropped: (bool) Count the rows dropped by pushed limits in the database with an additional
+            count query per chunk, which scans the rows a second time. The rows dropped by filter nodes, fused
+            queries and file sources are always counted.
+          validation: (ValidationMode) Validate the frames of the mappers completely, a random sample of rows per
+            frame, only the first frame of every concept, only the columns and dtypes of every frame, or none.
+          validation_sample_size: (int) Number of rows of a frame, which are validated by the sample validation.
         """
         assert len(source_configs) > 0, "No sources were passed."
         self._sink_mapper = sink_mapper
@@ -34,6 +57,11 @@ class Pipeline:
         self._source_configs = source_configs
         self._concept_coding = concept_coding
         self._processes = processes
+        self._fuse_queries = fuse_queries
+        self._push_conversions = push_conversions
+        self._push_limits = push_limits
+        self._count_dropped = count_dropped
+        self._validator = SchemaValidator(validation, validation_sample_size)
         self._graph = Graph()
 
     def _load_concepts(
@@ -64,6 +92,29 @@ class Pipeline:
                 raise TypeError(f"Type of concept not recognized: '{type(next_concept)}'")
         return out
 
+    def _attach_converter(self, concept: Concept) -> BaseNode:
+        """Attaches the default converter to a concept and returns the node, which provides the converted data."""
+        converter = concept.getDefaultConverter()
+        if self._push_conversions and concept.pushConversion(converter):
+            # The mappers of the concept already provide the converted data
+            return concept
+        self._graph.addPipe(concept, converter)
+        return converter
+
+    def _attach_filter(self, concept: Concept, node: BaseNode) -> BaseNode:
+        """Attaches the plausibility limits of a concept to the node, which provides its converted data,
+        and returns the node, which provides the filtered data."""
+        lower_limit, upper_limit = concept._concept_config.lower_limit, concept._concept_config.upper_limit
+        if lower_limit is None and upper_limit is None:
+            return node
+        # Only values of the mappers themselves can be limited in their queries, not the ones of a converter
+        if self._push_limits and node is concept and concept.pushLimits(lower_limit, upper_limit, self._count_dropped):
+            logger.debug(f"Pushed the limits of '{concept._concept_id}' into its mappers.")
+            return node
+        limit_filter = LimitFilter(concept._concept_id, lower_limit, upper_limit)
+        self._graph.addPipe(node, limit_filter)
+        return limit_filter
+
     def transform(
         self, concepts: list[str | Path | Concept], base_path: str | None = None
     ) -> Generator[DataFrame, None, None]:
@@ -74,6 +125,8 @@ class Pipeline:
         assert concepts and len(concepts) > 0, "'concepts' is either None or empty."
 
         self._graph = Graph()
+        SchemaValidator.reset()
+        LimitFilter.reset()
 
         _concepts: list[Concept] = self._load_concepts(concepts, base_path)
         concept_id_to_node: dict[str, BaseNode] = {}
@@ -94,12 +147,11 @@ class Pipeline:
         for v in concept_id_to_node:
             next_concept = concept_id_to_node[v]
             assert isinstance(next_concept, Concept)
-            next_converter = next_concept.getDefaultConverter()
-            self._graph.addPipe(next_concept, next_converter)
-            concept_id_to_node[v] = next_converter
+            concept_id_to_node[v] = self._attach_converter(next_concept)
 
-        # TODO - Attach Filter
-        #   Pass
+        # Attach filters
+        for c in _concepts:
+            concept_id_to_node[c._concept_id] = self._attach_filter(c, concept_id_to_node[c._concept_id])
 
         # Attach Sinks
         for _, n in concept_id_to_node.items():
@@ -114,16 +166,18 @@ class Pipeline:
                 if d not in concept_id_to_node:
                     # Create Concept
                     next_concept = self._load_concepts([d], base_path)[0]
-                    next_converter = next_concept.getDefaultConverter()
-                    # Attach Concept to Converter
-                    self._graph.addPipe(next_concept, next_converter)
-                    # Attach Converter to Original Node
-                    self._graph.addPipe(next_converter, n)
+                    # Attach Concept to Converter and Filter
+                    next_node = self._attach_filter(next_concept, self._attach_converter(next_concept))
+                    # Attach Filter to Original Node
+                    self._graph.addPipe(next_node, n)
                     # Add Mapping
-                    concept_id_to_node[next_concept._concept_id] = next_converter
+                    concept_id_to_node[next_concept._concept_id] = next_node
                     out += 1
                     # Check if converter has dependencies
-                    out += _attachDependencies(next_converter)
+                    out += _attachDependencies(next_node)
+                elif d not in n._sources:
+                    # The concept is already part of the graph, e.g. requested or needed by another node
+                    self._graph.addPipe(concept_id_to_node[d], n)
 
             # Repeat for all sources
             for s in n._sources.values():
@@ -140,7 +194,51 @@ class Pipeline:
 
         print(self._graph)
 
+        # The mappers of all concepts, including the dependencies, validate by the policy of the pipeline
+        for concept_node in self._graph._nodes:
+            if isinstance(concept_node, Concept):
+                concept_node.setValidator(self._validator)
+
+        ##############################
+        # Fuse Queries
+        ##############################
+        # Fused results are shared in memory, separate processes would each run the full fused query
+        if self._fuse_queries and GRAPH_TYPE in (GraphType.InMemory, GraphType.Async):
+            concept_nodes = [n for n in self._graph._nodes if isinstance(n, Concept)]
+            for data_source, source_config in self._source_configs.items():
+                if source_config.fetch_size > 0:
+                    # The result of a fused query can't be streamed, it's shared by all of its mappers
+                    continue
+                # The mappers of other backends and recorded mappers answer their queries themselves
+                mappers = [
+                    m
+                    for c in concept_nodes
+                    if isinstance(m := c._data_sources.get(data_source), AbstractDatabaseSourceMapper)
+                ]
+                fused_queries = fuse_mappers(mappers)
+                logger.debug(f"Fused {len(mappers)} queries of '{data_source}' into {len(fused_queries)} queries.")
+
         for data_source, source_config in self._source_configs.items():
+            # The connection of a session can't be shared with separate processes
+            if source_config.subject_table and GRAPH_TYPE != GraphType.InMemory:
+                logger.warning(f"Subject tables of '{data_source}' are not supported by graph '{GRAPH_TYPE}'.")
+                source_config = replace(source_config, subject_table=False)
+
             next_sampler = getDataSampler(data_source, source_config)
-            for next_chunk in next_sampler.get_samples():
-                yield self._sink_mapper.get_data(job=Job(jobID="test", database=data_source, subjects=next_chunk))
+            for i, next_chunk in enumerate(next_sampler.get_samples()):
+                with next_sampler.create_session(next_chunk) as session:
+                    job = Job(
+                        jobID=f"{data_source}_{i}",
+                        database=data_source,
+                        subjects=next_chunk,
+                        session=session,
+                        subject_range=next_sampler.get_subject_range(next_chunk),
+                    )
+                    result = self._sink_mapper.get_data(job=job)
+                yield result
+            logger.info(f"Connection pool of '{data_source}': {EngineRegistry.get_statistics(source_config)}")
+
+        for schema, statistics in SchemaValidator.get_statistics().items():
+            logger.info(f"Validation of '{schema}': {statistics}")
+        for concept_id, filter_statistics in LimitFilter.get_statistics().items():
+            logger.info(f"Limits of '{concept_id}': {filter_statistics}")
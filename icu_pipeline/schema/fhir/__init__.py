@@ -6,6 +6,8 @@ from icu_pipeline.schema.fhir.base import (
     Period,
     Quantity,
     Reference,
+    SEPARATOR,
+    to_nested,
 )
 from icu_pipeline.schema.fhir.deviceusage import FHIRDeviceUsage
 from icu_pipeline.schema.fhir.encounter import FHIREncounter
@@ -25,4 +27,6 @@ __all__ = [
     "FHIRMedicationStatement",
     "Dosage",
     "FHIRObservation",
+    "SEPARATOR",
+    "to_nested",
 ]
@@ -1,10 +1,13 @@
-from typing import TypedDict, Annotated
+from typing import Any, Annotated, Hashable, Mapping, TypedDict
 
 import pandas as pd
 from pydantic import PlainValidator
 
 from icu_pipeline.schema import AbstractSinkSchema
 
+# Separates the names of an element and its fields in the flat columns of the FHIR schemas
+SEPARATOR = "__"
+
 
 class Reference(TypedDict):
     """
@@ -102,6 +105,36 @@ class AbstractFHIRSinkSchema(AbstractSinkSchema):
 
     This class is used to define the structure of a FHIR sink schema. It is an abstract class
     that should be inherited by the specific FHIR sink schemas.
+
+    The schemas are flat: every field of a nested element (e.g. the `value` of the `Quantity`
+    of `value_quantity`) is a column of its own, named by the path to the field joined by the
+    `SEPARATOR` (e.g. `value_quantity__value`). The TypedDicts describe the nested elements,
+    which are only built by sinks that write nested documents, see `to_nested`. String fields
+    like codes, units and references are categorical, since they repeat a few values per chunk.
     """
 
     pass
+
+
+def to_nested(record: Mapping[Hashable, Any]) -> dict[str, Any]:
+    """
+    Nests the flat columns of a record into the elements of a FHIR resource.
+
+    Parameters
+    ----------
+    record : Mapping[Hashable, Any]
+        A row of a frame of a FHIR schema, e.g. {"value_quantity__value": 80.0, "value_quantity__unit": "bpm"}.
+
+    Returns
+    -------
+    dict[str, Any]
+        The nested record, e.g. {"value_quantity": {"value": 80.0, "unit": "bpm"}}.
+    """
+    nested: dict[str, Any] = {}
+    for column, value in record.items():
+        *path, field = str(column).split(SEPARATOR)
+        element = nested
+        for name in path:
+            element = element.setdefault(name, {})
+        element[field] = value
+    return nested
@@ -3,11 +3,7 @@ from typing import Annotated
 import pandas as pd
 from pandera.typing import Series
 
-from icu_pipeline.schema.fhir import (
-    AbstractFHIRSinkSchema,
-    Reference,
-    CodeableReference,
-)
+from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
 
 
 class FHIRDeviceUsage(AbstractFHIRSinkSchema):
@@ -24,19 +20,27 @@ class FHIRDeviceUsage(AbstractFHIRSinkSchema):
     _SINK_NAME : str
         The name of the sink, which is "deviceusage" for this class.
 
-    patient : Series[Reference]
-        A pandas Series of References representing the patients.
+    patient__reference : Series[pd.CategoricalDtype]
+        A pandas Series of the references of the References representing the patients.
+
+    patient__type : Series[pd.CategoricalDtype]
+        A pandas Series of the types of the References representing the patients.
 
     timing_date_time : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
         A pandas Series of datetime objects representing the timing dates and times.
 
-    device : Series[CodeableReference]
-        A pandas Series of CodeableReferences representing the devices.
+    device__concept__coding__code : Series[pd.CategoricalDtype]
+        A pandas Series of the codes of the CodeableReferences representing the devices.
+
+    device__concept__coding__system : Series[pd.CategoricalDtype]
+        A pandas Series of the systems of the CodeableReferences representing the devices.
 
     """
 
     _SINK_NAME = "deviceusage"
 
-    patient: Series[Reference]  # type: ignore[type-var]
+    patient__reference: Series[pd.CategoricalDtype]
+    patient__type: Series[pd.CategoricalDtype]
     timing_date_time: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
-    device: Series[CodeableReference]  # type: ignore[type-var]
+    device__concept__coding__code: Series[pd.CategoricalDtype]
+    device__concept__coding__system: Series[pd.CategoricalDtype]
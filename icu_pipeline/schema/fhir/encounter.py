@@ -1,10 +1,9 @@
+from typing import Annotated
+
+import pandas as pd
 from pandera.typing import Series
 
-from icu_pipeline.schema.fhir import (
-    AbstractFHIRSinkSchema,
-    Reference,
-    Period,
-)
+from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
 
 
 class FHIREncounter(AbstractFHIRSinkSchema):
@@ -21,19 +20,31 @@ class FHIREncounter(AbstractFHIRSinkSchema):
     _SINK_NAME : str
         The name of the sink, which is "encounter" for this class.
 
-    subject : Series[Reference]
-        A pandas Series of References representing the subjects.
+    subject__reference : Series[pd.CategoricalDtype]
+        A pandas Series of the references of the References representing the subjects.
+
+    subject__type : Series[pd.CategoricalDtype]
+        A pandas Series of the types of the References representing the subjects.
+
+    actual_period__start : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+        A pandas Series of the starts of the Periods representing the actual periods.
+
+    actual_period__end : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+        A pandas Series of the ends of the Periods representing the actual periods.
 
-    actual_period : Series[Period]
-        A pandas Series of Periods representing the actual periods.
+    care_team__reference : Series[pd.CategoricalDtype]
+        A pandas Series of the references of the References representing the care teams.
 
-    care_team : Series[Reference]
-        A pandas Series of References representing the care teams.
+    care_team__type : Series[pd.CategoricalDtype]
+        A pandas Series of the types of the References representing the care teams.
 
     """
 
     _SINK_NAME = "encounter"
 
-    subject: Series[Reference]  # type: ignore[type-var]
-    actual_period: Series[Period]  # type: ignore[type-var]
-    care_team: Series[Reference]  # type: ignore[type-var]
+    subject__reference: Series[pd.CategoricalDtype]
+    subject__type: Series[pd.CategoricalDtype]
+    actual_period__start: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+    actual_period__end: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+    care_team__reference: Series[pd.CategoricalDtype]
+    care_team__type: Series[pd.CategoricalDtype]
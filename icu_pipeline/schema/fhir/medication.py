@@ -1,13 +1,12 @@
-from typing import TypedDict
+from typing import Annotated, TypedDict
 
+import pandas as pd
+import pandera as pa
 from pandera.typing import Series
 
 from icu_pipeline.schema.fhir import (
     AbstractFHIRSinkSchema,
-    Reference,
     Quantity,
-    CodeableReference,
-    Period,
 )
 
 
@@ -41,23 +40,47 @@ class FHIRMedicationStatement(AbstractFHIRSinkSchema):
     _SINK_NAME : str
         The name of the sink, which is "medicationstatement" for this class.
 
-    subject : Series[Reference]
-        A pandas Series of References representing the subjects.
+    subject__reference : Series[pd.CategoricalDtype]
+        A pandas Series of the references of the References representing the subjects.
 
-    effective_period : Series[Period]
-        A pandas Series of Periods representing the effective periods.
+    subject__type : Series[pd.CategoricalDtype]
+        A pandas Series of the types of the References representing the subjects.
 
-    medication : Series[CodeableReference]
-        A pandas Series of CodeableReferences representing the medications.
+    effective_period__start : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+        A pandas Series of the starts of the Periods representing the effective periods.
 
-    dosage : Series[Dosage]
-        A pandas Series of Dosages representing the dosages.
+    effective_period__end : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+        A pandas Series of the ends of the Periods representing the effective periods.
+
+    medication__concept__coding__code : Series[pd.CategoricalDtype]
+        A pandas Series of the codes of the CodeableReferences representing the medications.
+
+    medication__concept__coding__system : Series[pd.CategoricalDtype]
+        A pandas Series of the systems of the CodeableReferences representing the medications.
+
+    dosage__dose_quantity__value : Series[float]
+        A pandas Series of the values of the dose quantities of the Dosages.
+
+    dosage__dose_quantity__unit : Series[pd.CategoricalDtype]
+        A pandas Series of the units of the dose quantities of the Dosages.
+
+    dosage__rate_quantity__value : Series[float]
+        A pandas Series of the values of the rate quantities of the Dosages, missing for non-continuous doses.
+
+    dosage__rate_quantity__unit : Series[pd.CategoricalDtype]
+        A pandas Series of the units of the rate quantities of the Dosages, missing for non-continuous doses.
 
     """
 
     _SINK_NAME = "medicationstatement"
 
-    subject: Series[Reference]  # type: ignore[type-var]
-    effective_period: Series[Period]  # type: ignore[type-var]
-    medication: Series[CodeableReference]  # type: ignore[type-var]
-    dosage: Series[Dosage]  # type: ignore[type-var]
+    subject__reference: Series[pd.CategoricalDtype]
+    subject__type: Series[pd.CategoricalDtype]
+    effective_period__start: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+    effective_period__end: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
+    medication__concept__coding__code: Series[pd.CategoricalDtype]
+    medication__concept__coding__system: Series[pd.CategoricalDtype]
+    dosage__dose_quantity__value: Series[float] = pa.Field(nullable=True)
+    dosage__dose_quantity__unit: Series[pd.CategoricalDtype]
+    dosage__rate_quantity__value: Series[float] = pa.Field(nullable=True)
+    dosage__rate_quantity__unit: Series[pd.CategoricalDtype] = pa.Field(nullable=True)
@@ -1,14 +1,10 @@
 from typing import Annotated
 
 import pandas as pd
+import pandera as pa
 from pandera.typing import Series
 
-from icu_pipeline.schema.fhir import (
-    AbstractFHIRSinkSchema,
-    Reference,
-    Quantity,
-    CodeableConcept,
-)
+from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
 
 
 class FHIRObservation(AbstractFHIRSinkSchema):
@@ -25,23 +21,35 @@ class FHIRObservation(AbstractFHIRSinkSchema):
     _SINK_NAME : str
         The name of the sink, which is "observation" for this class.
 
-    code : Series[CodeableConcept]
-        A pandas Series of CodeableConcepts representing the codes.
+    code__coding__code : Series[pd.CategoricalDtype]
+        A pandas Series of the codes of the CodeableConcepts representing the codes.
 
-    subject : Series[Reference]
-        A pandas Series of References representing the subjects.
+    code__coding__system : Series[pd.CategoricalDtype]
+        A pandas Series of the systems of the CodeableConcepts representing the codes.
+
+    subject__reference : Series[pd.CategoricalDtype]
+        A pandas Series of the references of the References representing the subjects.
+
+    subject__type : Series[pd.CategoricalDtype]
+        A pandas Series of the types of the References representing the subjects.
 
     effective_date_time : Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
         A pandas Series of datetime objects representing the effective dates and times.
 
-    value_quantity : Series[Quantity]
-        A pandas Series of Quantities representing the value quantities.
+    value_quantity__value : Series[float]
+        A pandas Series of the values of the Quantities representing the value quantities.
+
+    value_quantity__unit : Series[pd.CategoricalDtype]
+        A pandas Series of the units of the Quantities representing the value quantities.
 
     """
 
     _SINK_NAME = "observation"
 
-    code: Series[CodeableConcept]  # type: ignore[type-var]
-    subject: Series[Reference]  # type: ignore[type-var]
+    code__coding__code: Series[pd.CategoricalDtype]
+    code__coding__system: Series[pd.CategoricalDtype]
+    subject__reference: Series[pd.CategoricalDtype]
+    subject__type: Series[pd.CategoricalDtype]
     effective_date_time: Series[Annotated[pd.DatetimeTZDtype, "ns", "utc"]]
-    value_quantity: Series[Quantity]  # type: ignore[type-var]
+    value_quantity__value: Series[float] = pa.Field(nullable=True)
+    value_quantity__unit: Series[pd.CategoricalDtype]
@@ -0,0 +1,201 @@
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import TypeVar, cast
+
+import numpy as np
+import pandas as pd
+from pandera.typing import DataFrame
+
+from conceptbase.config import ValidationMode
+from icu_pipeline.schema import AbstractSinkSchema
+
+S = TypeVar("S", bound=AbstractSinkSchema)
+
+
+def _to_numpy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # The schemas declare NumPy dtypes, the Arrow columns are checked by their NumPy equivalents
+    dtypes = {
+        column: dtype.pyarrow_dtype.to_pandas_dtype()
+        for column, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.ArrowDtype)
+    }
+    return df.astype(dtypes) if dtypes else df
+
+
+@dataclass
+class ValidationStatistics:
+    """
+    Counters of the validations of a single schema.
+
+    Attributes
+    ----------
+    frames : int
+        Number of frames that were validated, completely or partially.
+    skipped : int
+        Number of frames that were passed without validation.
+    rows : int
+        Number of rows that were validated.
+    time : float
+        Accumulated time in seconds spent validating.
+    """
+
+    frames: int = 0
+    skipped: int = 0
+    rows: int = 0
+    time: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"ValidationStatistics(frames={self.frames}, skipped={self.skipped}, rows={self.rows}, "
+            f"time={self.time:.3f}s)"
+        )
+
+
+class SchemaValidator:
+    """
+    Validates the frames of the mappers against their schema, according to a `ValidationMode`.
+
+    Full validation checks every row of every frame, such that its cost grows with the size of
+    the extraction. The other modes trade coverage for speed:
+
+    - `SAMPLE` validates a random sample of `sample_size` rows of every frame.
+    - `FIRST` validates the first frame of every concept completely and passes all others.
+    - `SCHEMA` validates only the columns and dtypes of every frame, but none of its rows.
+    - `OFF` passes all frames without validation.
+
+    Since the frames are never coerced, a frame that isn't validated is passed unchanged.
+    The time spent validating is accumulated per schema in a process-wide registry, next to the
+    concepts whose first frame was validated. Thereby all mappers of a concept, e.g. of several
+    sources, share the first frame. The processes of a multiprocessing graph pass both back to
+    their parent process, which merges them (see `merge`).
+
+    Parameters
+    ----------
+    mode : ValidationMode
+        The validation policy.
+    sample_size : int
+        The number of rows of a frame that are validated by the `SAMPLE` mode.
+
+    Methods
+    -------
+    validate(df, schema, concept_id):
+        Validates a frame according to the validation policy.
+    get_statistics():
+        Returns the counters of all schemas that were validated so far.
+    get_validated():
+        Returns the concepts whose first frame was validated so far.
+    merge(statistics, validated):
+        Adds the counters and validated concepts of another process to the ones of this process.
+    reset():
+        Clears the counters of all schemas and the validated concepts.
+    """
+
+    _statistics: dict[str, ValidationStatistics] = {}
+    # The concepts, whose first frame was validated
+    _validated: set[str] = set()
+    _lock = Lock()
+
+    def __init__(self, mode: ValidationMode = ValidationMode.FULL, sample_size: int = 1000) -> None:
+        assert sample_size > 0, f"The sample size of the validation must be positive, got {sample_size}."
+        self._mode = mode
+        self._sample_size = sample_size
+        # Samples without replacement from a generator, unlike the legacy random state, don't permute all rows
+        self._rng = np.random.default_rng()
+
+    def _select(self, df: pd.DataFrame, concept_id: str) -> pd.DataFrame | None:
+        match self._mode:
+            case ValidationMode.FULL:
+                return df
+            case ValidationMode.SAMPLE:
+                return df.sample(n=self._sample_size, random_state=self._rng) if len(df) > self._sample_size else df
+            case ValidationMode.FIRST:
+                with SchemaValidator._lock:
+                    return None if concept_id in SchemaValidator._validated else df
+            case ValidationMode.SCHEMA:
+                return df.iloc[:0]
+            case ValidationMode.OFF:
+                return None
+            case _:
+                raise NotImplementedError(f"Validation mode '{self._mode}' is not supported.")
+
+    def validate(self, df: pd.DataFrame, schema: type[S], concept_id: str | None = None) -> DataFrame[S]:
+        """
+        Validates a frame according to the validation policy.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The frame to be validated.
+        schema : type[AbstractSinkSchema]
+            The schema the frame is validated against.
+        concept_id : str | None
+            The concept of the frame, whose first frame is validated by the `FIRST` mode. Frames
+            without a concept share the first frame of their schema.
+
+        Returns
+        -------
+        DataFrame[AbstractSinkSchema]
+            The unchanged frame.
+
+        Raises
+        ------
+        pandera.errors.SchemaError
+            If the validated part of the frame doesn't match the schema.
+        """
+        key = concept_id if concept_id is not None else schema.__name__
+        selected = self._select(df, key)
+        if selected is None:
+            with SchemaValidator._lock:
+                SchemaValidator._statistics.setdefault(schema.__name__, ValidationStatistics()).skipped += 1
+            return cast(DataFrame[S], df)
+
+        start = time.perf_counter()
+        try:
+            schema.validate(_to_numpy_dtypes(selected))
+        finally:
+            with SchemaValidator._lock:
+                statistics = SchemaValidator._statistics.setdefault(schema.__name__, ValidationStatistics())
+                statistics.frames += 1
+                statistics.rows += len(selected)
+                statistics.time += time.perf_counter() - start
+        with SchemaValidator._lock:
+            SchemaValidator._validated.add(key)
+        return cast(DataFrame[S], df)
+
+    @staticmethod
+    def get_statistics() -> dict[str, ValidationStatistics]:
+        with SchemaValidator._lock:
+            return dict(SchemaValidator._statistics)
+
+    @staticmethod
+    def get_validated() -> set[str]:
+        with SchemaValidator._lock:
+            return set(SchemaValidator._validated)
+
+    @staticmethod
+    def merge(statistics: dict[str, ValidationStatistics], validated: set[str] | None = None) -> None:
+        """
+        Adds the counters of another process, e.g. of a process of the graph, to the counters of all schemas.
+
+        Parameters
+        ----------
+        statistics : dict[str, ValidationStatistics]
+            The counters of the other process (see `get_statistics`).
+        validated : set[str] | None
+            The concepts, whose first frame was validated by the other process (see `get_validated`).
+        """
+        with SchemaValidator._lock:
+            SchemaValidator._validated.update(validated or set())
+            for schema, validation_statistics in statistics.items():
+                merged = SchemaValidator._statistics.setdefault(schema, ValidationStatistics())
+                merged.frames += validation_statistics.frames
+                merged.skipped += validation_statistics.skipped
+                merged.rows += validation_statistics.rows
+                merged.time += validation_statistics.time
+
+    @staticmethod
+    def reset() -> None:
+        with SchemaValidator._lock:
+            SchemaValidator._statistics.clear()
+            SchemaValidator._validated.clear()
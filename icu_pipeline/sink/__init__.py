@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from enum import StrEnum, auto
-from typing import Generator
+from typing import Any, Generator
 
 from pandera.typing import DataFrame
 
 from icu_pipeline.concept import Concept
 from icu_pipeline.graph import Node
+from icu_pipeline.graph.base import BaseNode
+from icu_pipeline.job import Job
 from icu_pipeline.schema import AbstractSinkSchema
 
 
@@ -26,10 +28,25 @@ class AbstractSinkMapper(ABC, Node):
     def __init__(self) -> None:
         super().__init__(concept_id="")  # TODO - Sink doesn't have a concept_id for now
 
+    def get_data(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
+        # Every concept is written batch by batch, so the data of a job is never materialized at once
+        out = {}
+        for concept_id, batches in self.fetch_source_batches(job, *args, **kwargs).items():
+            concept = self._get_concept(self._sources[concept_id]._source)
+            out[concept_id] = self.to_output_format(batches, concept)
+        return out  # type: ignore[return-value]
+
+    @staticmethod
+    def _get_concept(node: BaseNode) -> Concept:
+        # Follow the data of the concept upstream (e.g. through its converter)
+        while not isinstance(node, Concept):
+            node = node._sources[node._concept_id]._source
+        return node
+
     @abstractmethod
     def to_output_format(
         self,
         df_generator: Generator[DataFrame[AbstractSinkSchema], None, None],
         concept: Concept,
-    ) -> None:
+    ) -> dict[str, int] | None:
         raise NotImplementedError
@@ -1,12 +1,15 @@
+import uuid
 from abc import ABCMeta
 from pathlib import Path
-from typing import Generator
+from typing import Any, Generator
 
 import pandas as pd
 from pandera.typing import DataFrame
 
+from icu_pipeline.arrow import import_pyarrow
 from icu_pipeline.concept import Concept
 from icu_pipeline.schema import AbstractSinkSchema
+from icu_pipeline.schema.fhir import to_nested
 from icu_pipeline.sink import AbstractSinkMapper
 
 
@@ -59,7 +62,7 @@ class AbstractFileSinkMapper(AbstractSinkMapper, metaclass=ABCMeta):
         self,
         df_generator: Generator[DataFrame[AbstractSinkSchema], None, None],
         concept: Concept,
-    ) -> None:
+    ) -> dict[str, int] | None:
         raise NotImplementedError
 
 
@@ -109,13 +112,13 @@ class CSVFileSinkMapper(AbstractFileSinkMapper):
         self,
         df_generator: Generator[DataFrame[AbstractSinkSchema], None, None],
         concept: Concept,
-    ) -> None:
+    ) -> dict[str, int]:
         """
         Writes data from a generator of pandas DataFrames to a CSV file.
 
         The file is named after the concept's name with the CSV extension. If the file
         already exists, the data is appended to the file. If the file does not exist,
-        a new file is created.
+        a new file is created. The flat columns of the FHIR schemas are written as they are.
 
         Parameters
         ----------
@@ -138,27 +141,18 @@ class CSVFileSinkMapper(AbstractFileSinkMapper):
             if not file_path.exists():
                 header = True
 
-            for column in df.columns:
-                if not isinstance(df[column][0], dict):
-                    continue
-
-                df = df.join(pd.json_normalize(df[column]).add_prefix(f"{column}__"))  # type: ignore
-                df = df.drop(columns=[column])
-
-            df.columns = df.columns.str.replace(".", "__")
-
             # TODO - Some basic statistics. Maybe more details?
             out["total_rows"] += len(df)
             df.to_csv(file_path, mode="a+", index=False, header=header)
+        return out
 
 
 class JSONLFileSinkMapper(AbstractFileSinkMapper):
     """
     A class used to map data to a JSONL file.
 
-    This class inherits from the AbstractFileSinkMapper and is intended to override
-    the `to_output_format` method to write data to a JSONL file. However, currently
-    this method is not implemented.
+    This class inherits from the AbstractFileSinkMapper and overrides the
+    `to_output_format` method to write data to a JSONL file.
 
     ...
 
@@ -169,34 +163,157 @@ class JSONLFileSinkMapper(AbstractFileSinkMapper):
 
     Methods
     -------
-    _to_output_format(
+    to_output_format(
         self,
-        df: pd.DataFrame,
+        df_generator: Generator[pd.DataFrame, None, None],
+        concept: Concept,
     ) -> None:
-        Intended to write data from a pandas DataFrame to a JSONL file. Currently not implemented.
+        Writes data from a generator of pandas DataFrames to a JSONL file.
 
     """
 
     FILE_EXTENSION = "jsonl"
 
-    def _to_output_format(
+    def to_output_format(
         self,
         df_generator: Generator[DataFrame[AbstractSinkSchema], None, None],
         concept: Concept,
+    ) -> dict[str, int]:
+        """
+        Writes data from a generator of pandas DataFrames to a JSONL file.
+
+        Every row is written as a nested FHIR resource, whose elements are built from the flat
+        columns of the FHIR schemas, e.g. {"value_quantity": {"value": 80.0, "unit": "bpm"}}.
+        The file is named after the concept's name with the JSONL extension, and the data is
+        appended to the file if it already exists.
+
+        Parameters
+        ----------
+        df_generator : Generator[pd.DataFrame, None, None]
+            A generator that yields pandas DataFrames.
+        concept : Concept
+            The concept that the data represents.
+
+        Returns
+        -------
+        dict
+            A dictionary with a single key-value pair. The key is "total_rows" and the
+            value is the total number of rows written to the file.
+
+        """
+        out = dict(total_rows=0)
+        file_path = self._path / f"{concept._concept_config.name}.{self.FILE_EXTENSION}"
+        for df in df_generator:
+            if len(df) == 0:
+                continue
+
+            # Only this sink needs the nested elements, which are built per row
+            nested_df = pd.DataFrame([to_nested(record) for record in df.to_dict("records")])
+
+            out["total_rows"] += len(df)
+            with open(file_path, "a") as file:
+                nested_df.to_json(file, orient="records", lines=True, date_format="iso")
+        return out
+
+
+class ParquetFileSinkMapper(AbstractFileSinkMapper):
+    """
+    A class used to map data to Parquet files.
+
+    This class inherits from the AbstractFileSinkMapper and overrides the
+    `to_output_format` method to write data to Parquet files. Requires the pyarrow package.
+
+    ...
+
+    Attributes
+    ----------
+    FILE_EXTENSION : str
+        The file extension for the output files. This is always "parquet" for this class.
+
+    Methods
+    -------
+    __init__(self, path: Path | None = None) -> None:
+        Initializes the ParquetFileSinkMapper.
+
+    to_output_format(
+        self,
+        df_generator: Generator[pd.DataFrame, None, None],
+        concept: Concept,
     ) -> None:
+        Writes data from a generator of pandas DataFrames to a Parquet file.
+
+    """
+
+    FILE_EXTENSION = "parquet"
+
+    def __init__(self, path: Path | None = None) -> None:
+        """
+        Initializes the ParquetFileSinkMapper.
+
+        Parameters
+        ----------
+        path : Path | None, optional
+            The path where the output files should be written, by default None
+
         """
-        Intended to write data from a pandas DataFrame to a JSONL file. Currently not implemented.
+        super().__init__(path)
+        self._pa = import_pyarrow("The Parquet sink")
+        self._pq = self._pa.parquet
+
+    def _get_schema(self, table: Any) -> Any:
+        # The categories of the batches differ, so their dictionaries need an index type large enough for all
+        fields = [
+            self._pa.field(f.name, self._pa.dictionary(self._pa.int32(), f.type.value_type))
+            if self._pa.types.is_dictionary(f.type)
+            else f
+            for f in table.schema
+        ]
+        return self._pa.schema(fields, metadata=table.schema.metadata)
+
+    def to_output_format(
+        self,
+        df_generator: Generator[DataFrame[AbstractSinkSchema], None, None],
+        concept: Concept,
+    ) -> dict[str, int]:
+        """
+        Writes data from a generator of pandas DataFrames to a Parquet file.
+
+        The files of a concept form a Parquet dataset, a directory named after the concept's
+        name with the Parquet extension. Every call writes a new file into the directory, with
+        a row group per batch. Categorical columns are written as dictionary-encoded columns,
+        so their strings are stored once per row group instead of once per row.
 
         Parameters
         ----------
-        df : pd.DataFrame
-            A pandas DataFrame containing the data to be written to the file.
+        df_generator : Generator[pd.DataFrame, None, None]
+            A generator that yields pandas DataFrames.
+        concept : Concept
+            The concept that the data represents.
 
-        Raises
-        ------
-        NotImplementedError
-            This method is not yet implemented.
+        Returns
+        -------
+        dict
+            A dictionary with a single key-value pair. The key is "total_rows" and the
+            value is the total number of rows written to the file.
 
         """
-        raise NotImplementedError
-        # df.to_json(self._path, mode="a", orient="records", lines=True)
+        out = dict(total_rows=0)
+        directory = self._path / f"{concept._concept_config.name}.{self.FILE_EXTENSION}"
+        writer = None
+        try:
+            for df in df_generator:
+                if len(df) == 0:
+                    continue
+
+                table = self._pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    directory.mkdir(exist_ok=True)
+                    file_path = directory / f"part-{uuid.uuid4().hex}.{self.FILE_EXTENSION}"
+                    writer = self._pq.ParquetWriter(file_path, self._get_schema(table), compression="zstd")
+
+                out["total_rows"] += len(df)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        return out
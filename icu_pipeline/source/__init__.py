@@ -1,12 +1,16 @@
+import asyncio
 from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
 from importlib import import_module
-from typing import TYPE_CHECKING, Generator, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generator, Generic, TypeVar
 
+import pandas as pd
 from pandera.typing import DataFrame
 
-from conceptbase.config import DataSource, MapperConfig, SourceConfig
+from conceptbase.config import DataSource, MapperConfig, SourceBackend, SourceConfig
 from icu_pipeline.logger import ICULogger
 from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
+from icu_pipeline.schema.validation import SchemaValidator
 
 if TYPE_CHECKING:
     from icu_pipeline.job import Job
@@ -65,6 +69,8 @@ class AbstractSourceMapper(ABC, Generic[F]):
         self._data_source = datasource
         self._source_config = source_config
         self._unit = unit
+        # Validates every frame completely, unless the pipeline sets its validation policy
+        self._validator = SchemaValidator()
 
     @abstractmethod
     def get_data(self, job: "Job") -> DataFrame:
@@ -80,6 +86,32 @@ class AbstractSourceMapper(ABC, Generic[F]):
         """
         raise NotImplementedError
 
+    def get_batches(self, job: "Job") -> Generator[DataFrame, None, None]:
+        """
+        Retrieves the data to be mapped in batches.
+
+        Mappers without streaming support yield the complete data of the job as a single batch.
+
+        Returns
+        -------
+        Generator
+            A generator that yields dataframes with the data to be mapped.
+        """
+        yield self.get_data(job)
+
+    async def get_data_async(self, job: "Job") -> DataFrame:
+        """
+        Retrieves the data to be mapped from a coroutine.
+
+        Mappers without async support retrieve the data in a worker thread.
+
+        Returns
+        -------
+        DataFrame
+            The data to be mapped.
+        """
+        return await asyncio.to_thread(self.get_data, job)
+
     @abstractmethod
     def _to_fihr(self, df: DataFrame) -> DataFrame[F]:
         """
@@ -99,6 +131,84 @@ class AbstractSourceMapper(ABC, Generic[F]):
         """
         raise NotImplementedError
 
+    def supports_conversion(self) -> bool:
+        """
+        Returns whether the mapper can convert its values into another unit, see `push_conversion`.
+        """
+        return False
+
+    def push_conversion(self, unit: str, factor: float, offset: float) -> None:
+        """
+        Converts the values of the mapper into another unit by `factor * value + offset`.
+
+        This method should be implemented by subclasses, which support the conversion.
+
+        Parameters
+        ----------
+        unit : str
+            The unit the values are converted into.
+        factor : float
+            The factor of the conversion.
+        offset : float
+            The offset of the conversion.
+        """
+        raise NotImplementedError
+
+    def supports_limits(self) -> bool:
+        """
+        Returns whether the mapper can drop values outside of plausibility limits, see `push_limits`.
+        """
+        return False
+
+    def push_limits(self, lower_limit: float | None, upper_limit: float | None, count_dropped: bool = False) -> None:
+        """
+        Drops the values of the mapper outside of plausibility limits in the unit of the mapper.
+
+        This method should be implemented by subclasses, which support the limits.
+
+        Parameters
+        ----------
+        lower_limit : float | None
+            The lowest plausible value, None for no lower limit.
+        upper_limit : float | None
+            The highest plausible value, None for no upper limit.
+        count_dropped : bool
+            Whether the dropped rows are counted, even if that requires an additional query.
+        """
+        raise NotImplementedError
+
+    def set_validator(self, validator: SchemaValidator) -> None:
+        """
+        Sets the validator of the frames of the mapper, i.e. the validation policy of the pipeline.
+
+        Parameters
+        ----------
+        validator : SchemaValidator
+            The validator, which is shared by the mappers of all concepts.
+        """
+        self._validator = validator
+
+    def _validate(self, df: pd.DataFrame, schema: type[F]) -> DataFrame[F]:
+        """
+        Validates a frame in FHIR format according to the validation policy of the pipeline.
+
+        The `FIRST` policy validates the first frame of the concept, which is shared by the mappers
+        of all sources of the concept.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The frame in FHIR format.
+        schema : type[AbstractFHIRSinkSchema]
+            The FHIR schema of the frame.
+
+        Returns
+        -------
+        DataFrame
+            The unchanged frame.
+        """
+        return self._validator.validate(df, schema, self._concept_id)
+
 
 class AbstractSourceSampler(ABC):
     """
@@ -109,6 +219,10 @@ class AbstractSourceSampler(ABC):
     -------
     get_samples():
         Create a Generator, which produces Sample IDs
+    create_session(subjects):
+        Create the session in which the jobs of a chunk of samples are processed.
+    get_subject_range(subjects):
+        Return the range of IDs covered by a chunk of samples, if the chunk is contiguous.
     """
 
     IDENTIFIER: list[str] = []
@@ -122,6 +236,14 @@ class AbstractSourceSampler(ABC):
     def get_samples(self) -> Generator[DataFrame, None, None]:
         pass
 
+    def create_session(self, subjects: DataFrame) -> AbstractContextManager[Any]:
+        # Sources without sessions process their jobs without one
+        return nullcontext()
+
+    def get_subject_range(self, subjects: DataFrame) -> tuple[Any, Any] | None:
+        # Chunks are not contiguous ID ranges by default
+        return None
+
 
 #######
 # Getter
@@ -135,15 +257,61 @@ def getDataSourceMapper(config: MapperConfig) -> type[AbstractSourceMapper]:
     return source_mapper  # type: ignore[no-any-return]
 
 
+def getBackendMapper(mapper: AbstractSourceMapper, source_config: SourceConfig) -> AbstractSourceMapper:
+    """Wrap the mapper of a concept into the mapper of the backend of its source."""
+    from icu_pipeline.source.database import AbstractDatabaseSourceMapper
+
+    if source_config.backend == SourceBackend.DATABASE and source_config.record_dir is None:
+        return mapper
+    assert isinstance(mapper, AbstractDatabaseSourceMapper), f"Backends can't answer {type(mapper)}."
+    match source_config.backend:
+        case SourceBackend.DATABASE:
+            from icu_pipeline.source.replay import RecordingSourceMapper
+
+            return RecordingSourceMapper(mapper)
+        case SourceBackend.FILE:
+            from icu_pipeline.source.file import FileSourceMapper
+
+            return FileSourceMapper(mapper)
+        case SourceBackend.REPLAY:
+            from icu_pipeline.source.replay import ReplaySourceMapper
+
+            return ReplaySourceMapper(mapper)
+        case _:
+            raise NotImplementedError
+
+
 def getDataSampler(source: DataSource, source_config: SourceConfig) -> AbstractSourceSampler:
+    sampler: AbstractSourceSampler
     match source:
         case DataSource.MIMICIV:
             from icu_pipeline.source.mimiciv import MimicSampler
 
-            return MimicSampler(source_config)
+            sampler = MimicSampler(source_config)
         case DataSource.EICU:
             from icu_pipeline.source.eicu import EICUSampler
 
-            return EICUSampler(source_config)
+            sampler = EICUSampler(source_config)
+        case _:
+            raise NotImplementedError
+
+    if source_config.backend == SourceBackend.DATABASE and source_config.record_dir is None:
+        return sampler
+    from icu_pipeline.source.database import AbstractDatabaseSourceSampler
+
+    assert isinstance(sampler, AbstractDatabaseSourceSampler)
+    match source_config.backend:
+        case SourceBackend.DATABASE:
+            from icu_pipeline.source.replay import RecordingSourceSampler
+
+            return RecordingSourceSampler(sampler)
+        case SourceBackend.FILE:
+            from icu_pipeline.source.file import FileSourceSampler
+
+            return FileSourceSampler(sampler)
+        case SourceBackend.REPLAY:
+            from icu_pipeline.source.replay import ReplaySourceSampler
+
+            return ReplaySourceSampler(sampler)
         case _:
             raise NotImplementedError
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from threading import Lock
+from typing import Any, Generator, Iterable
+
+import pandas as pd
+
+from icu_pipeline.arrow import import_pyarrow
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.source import SourceConfig
+
+logger = ICULogger.get_logger()
+
+# (cache directory, maximum size in bytes)
+CacheKey = tuple[str, int]
+
+
+class QueryCache:
+    """
+    Persistent on-disk cache of query results.
+
+    Every entry is the result of a single query, stored as zstd compressed Parquet file under
+    `<directory>/<namespace>/<key>.parquet`. The key is a content hash of everything the result
+    depends on (see `fingerprint`), so that entries never have to be invalidated when the source
+    data stays the same, e.g. for a frozen release of a database. Once the cache exceeds its
+    maximum size, the least recently used entries are evicted. Requires the pyarrow package.
+
+    Parameters
+    ----------
+    directory : str | Path
+        The directory of the cache, it's shared by all processes and runs.
+    max_size : int
+        The maximum size of the cache in bytes (-1 = unbounded).
+
+    Methods
+    -------
+    for_config(source_config):
+        Returns the shared cache of a source configuration, or None if it has no cache directory.
+    fingerprint(*parts, subjects):
+        Returns the content hash of the parts of a query and its subjects.
+    get(namespace, key):
+        Returns the cached result of a query, or None.
+    get_batches(namespace, key):
+        Yields the batches of a cached result, or returns None.
+    put(namespace, key, df):
+        Stores the result of a query.
+    put_batches(namespace, key, batches):
+        Stores the batches of a query result, while passing them through.
+    invalidate(namespace):
+        Removes all entries of a namespace, or the complete cache.
+    """
+
+    _caches: dict[CacheKey, "QueryCache"] = {}
+    _lock = Lock()
+
+    def __init__(self, directory: str | Path, max_size: int = -1) -> None:
+        self._pa = import_pyarrow("The query cache")
+        self._pq = self._pa.parquet
+        self._directory = Path(directory)
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"QueryCache(directory={self._directory}, hits={self.hits}, misses={self.misses})"
+
+    @staticmethod
+    def for_config(source_config: SourceConfig) -> "QueryCache | None":
+        if source_config.cache_dir is None:
+            return None
+        key = (source_config.cache_dir, source_config.cache_size)
+        with QueryCache._lock:
+            if key not in QueryCache._caches:
+                QueryCache._caches[key] = QueryCache(*key)
+            return QueryCache._caches[key]
+
+    @staticmethod
+    def fingerprint(*parts: Any, subjects: pd.DataFrame | None = None) -> str:
+        """
+        Returns the content hash of the parts of a query and its subjects.
+
+        Parameters
+        ----------
+        *parts : Any
+            JSON serializable parts of the query, e.g. the rendered query template and its arguments.
+        subjects : pd.DataFrame | None
+            The subjects of the query, only their IDs and columns are hashed.
+
+        Returns
+        -------
+        str
+            The hexadecimal SHA-256 hash.
+        """
+        digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode())
+        if subjects is not None:
+            digest.update(json.dumps(list(subjects.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(subjects, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _get_path(self, namespace: str, key: str) -> Path:
+        return self._directory / namespace / f"{key}.parquet"
+
+    def _lookup(self, namespace: str, key: str) -> Path | None:
+        path = self._get_path(namespace, key)
+        try:
+            # The modification time orders the entries by their last use
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            logger.debug(f"Cache miss for '{namespace}/{key}'.")
+            return None
+        self.hits += 1
+        logger.debug(f"Cache hit for '{namespace}/{key}'.")
+        return path
+
+    def get(self, namespace: str, key: str) -> pd.DataFrame | None:
+        """
+        Returns the cached result of a query.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the entry, e.g. the concept of the query.
+        key : str
+            The fingerprint of the query.
+
+        Returns
+        -------
+        pd.DataFrame | None
+            The result of the query, or None if it isn't cached.
+        """
+        path = self._lookup(namespace, key)
+        if path is None:
+            return None
+        return pd.read_parquet(path)
+
+    def get_batches(self, namespace: str, key: str) -> Generator[pd.DataFrame, None, None] | None:
+        """
+        Returns the batches of a cached result, as they were stored by `put_batches`.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the entry, e.g. the concept of the query.
+        key : str
+            The fingerprint of the query.
+
+        Returns
+        -------
+        Generator | None
+            A generator that yields the non-empty batches of the result, or None if it isn't cached.
+        """
+        path = self._lookup(namespace, key)
+        if path is None:
+            return None
+        return self._read_batches(path)
+
+    def _read_batches(self, path: Path) -> Generator[pd.DataFrame, None, None]:
+        parquet_file = self._pq.ParquetFile(path)
+        for i in range(parquet_file.num_row_groups):
+            row_group = parquet_file.read_row_group(i)
+            if row_group.num_rows > 0:
+                yield row_group.to_pandas()
+
+    def put(self, namespace: str, key: str, df: pd.DataFrame) -> None:
+        """
+        Stores the result of a query.
+
+        Results which can't be stored as Parquet (e.g. columns of mixed types) are not cached.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the entry, e.g. the concept of the query.
+        key : str
+            The fingerprint of the query.
+        df : pd.DataFrame
+            The result of the query.
+        """
+        for _ in self.put_batches(namespace, key, [df]):
+            pass
+
+    def put_batches(
+        self, namespace: str, key: str, batches: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Stores the batches of a query result, while passing them through.
+
+        Every batch is written as a row group of its own, as soon as it's yielded. The entry is only
+        stored, if all batches were consumed and written.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the entry, e.g. the concept of the query.
+        key : str
+            The fingerprint of the query.
+        batches : Iterable[pd.DataFrame]
+            The batches of the result.
+
+        Yields
+        ------
+        pd.DataFrame
+            The batches of the result.
+        """
+        path = self._get_path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.{id(batches)}.tmp")
+        writer: Any = None
+        failed = False
+        complete = False
+        try:
+            for df in batches:
+                if not failed:
+                    try:
+                        if writer is None:
+                            table = self._pa.Table.from_pandas(df, preserve_index=False)
+                            writer = self._pq.ParquetWriter(temp_path, table.schema, compression="zstd")
+                        else:
+                            # Later batches are cast to the schema of the first one
+                            table = self._pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+                        writer.write_table(table)
+                    except (self._pa.ArrowException, ValueError, TypeError) as e:
+                        logger.warning(f"Result of '{namespace}/{key}' can't be cached: {e}")
+                        failed = True
+                yield df
+            complete = not failed
+        finally:
+            if writer is None and complete:
+                # Empty results are cached as well, so that they are never queried again
+                self._pq.write_table(self._pa.table({}), temp_path, compression="zstd")
+            elif writer is not None:
+                writer.close()
+            if complete:
+                os.replace(temp_path, path)
+                self._evict()
+            else:
+                temp_path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        if self._max_size < 0:
+            return
+
+        entries = []
+        for path in self._directory.rglob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(e[1] for e in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self._max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            logger.debug(f"Evicted '{path}' from the cache.")
+
+    def invalidate(self, namespace: str | None = None) -> None:
+        """
+        Removes all entries of a namespace, or the complete cache.
+
+        Parameters
+        ----------
+        namespace : str | None
+            The namespace to be removed, e.g. the name of a concept. By default, all entries are removed.
+        """
+        path = self._directory if namespace is None else self._directory / namespace
+        shutil.rmtree(path, ignore_errors=True)
+        logger.info(f"Invalidated the cache entries of '{path}'.")
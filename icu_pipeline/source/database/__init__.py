@@ -1,8 +1,26 @@
-from icu_pipeline.source.database.mapper import AbstractDatabaseSourceMapper
+from icu_pipeline.source.database.binary_copy import BinaryCopyReader
+from icu_pipeline.source.database.engine import EngineRegistry, PoolStatistics
+from icu_pipeline.source.database.mapper import AbstractDatabaseSourceMapper, AbstractWrappedSourceMapper
 from icu_pipeline.source.database.sampler import AbstractDatabaseSourceSampler, AbstractSourceSampler
+from icu_pipeline.source.database.session import SubjectSession
+from icu_pipeline.source.database.fusion import (
+    AbstractFusedQuery,
+    FusedColumnQuery,
+    FusedRowQuery,
+    fuse_mappers,
+)
 
 __all__ = [
     "AbstractDatabaseSourceMapper",
     "AbstractDatabaseSourceSampler",
+    "AbstractWrappedSourceMapper",
     "AbstractSourceSampler",
+    "BinaryCopyReader",
+    "AbstractFusedQuery",
+    "FusedColumnQuery",
+    "FusedRowQuery",
+    "fuse_mappers",
+    "EngineRegistry",
+    "PoolStatistics",
+    "SubjectSession",
 ]
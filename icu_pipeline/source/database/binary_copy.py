@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from psycopg import sql
+from sqlalchemy import Connection
+
+from icu_pipeline.logger import ICULogger
+
+logger = ICULogger.get_logger()
+
+SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+TRAILER = b"\xff\xff"
+# PostgreSQL timestamps are microseconds since 2000-01-01
+EPOCH_OFFSET = np.int64(946_684_800_000_000)
+INT64_MIN = np.iinfo(np.int64).min
+INT64_MAX = np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class BinaryType:
+    """
+    Fixed-width column type of the binary COPY format.
+
+    Attributes
+    ----------
+    wire_dtype : str
+        The (big-endian) NumPy dtype of the values in the COPY stream.
+    dtype : str
+        The NumPy dtype of the decoded column.
+    cast : str | None
+        The type the column is cast to before it is copied.
+    sentinel : str | None
+        The value, which replaces NULL values, so that every row has the same size.
+    """
+
+    wire_dtype: str
+    dtype: str
+    cast: str | None = None
+    sentinel: str | None = None
+
+
+# Maps from type OID -> binary type, columns of other types are not decoded
+BINARY_TYPES: dict[int, BinaryType] = {
+    16: BinaryType("?", "bool"),  # bool
+    20: BinaryType(">i8", "int64"),  # int8
+    21: BinaryType(">i2", "int64"),  # int2
+    23: BinaryType(">i4", "int64"),  # int4
+    700: BinaryType(">f4", "float64", sentinel="'NaN'"),  # float4
+    701: BinaryType(">f8", "float64", sentinel="'NaN'"),  # float8
+    1700: BinaryType(">f8", "float64", cast="float8", sentinel="'NaN'"),  # numeric
+    1114: BinaryType(">i8", "datetime64[ns]", sentinel="'-infinity'"),  # timestamp
+    1184: BinaryType(">i8", "datetime64[ns, UTC]", sentinel="'-infinity'"),  # timestamptz
+}
+
+
+class BinaryCopyReader:
+    """
+    Reads the result of a query with `COPY ... TO STDOUT (FORMAT BINARY)`.
+
+    If all columns of the result have a fixed-width type, every row of the COPY stream has the same
+    layout. The stream is then decoded at once into typed NumPy arrays with a structured dtype,
+    without creating Python objects for the single values. NULL values of float and timestamp
+    columns are replaced by NaN and -infinity (NaT) on the server to keep the rows fixed-width.
+
+    Methods
+    -------
+    read(connection, query, params):
+        Reads the result of a query, or returns None if the result can't be decoded.
+    """
+
+    def __init__(self) -> None:
+        # Maps from query -> [(column, binary type), ...] or None, if the result can't be decoded
+        self._columns: dict[str, list[tuple[str, BinaryType]] | None] = {}
+
+    def _get_columns(
+        self, cursor: Any, query: str, params: dict[str, Any] | None
+    ) -> list[tuple[str, BinaryType]] | None:
+        if query not in self._columns:
+            cursor.execute(sql.SQL("SELECT * FROM ({query}) AS q LIMIT 0").format(query=sql.SQL(query)), params)
+            columns = [(c.name, c.type_code) for c in cursor.description]
+            if all(type_code in BINARY_TYPES for _, type_code in columns):
+                self._columns[query] = [(name, BINARY_TYPES[type_code]) for name, type_code in columns]
+            else:
+                logger.debug(f"Columns {columns} can't be decoded from binary COPY.")
+                self._columns[query] = None
+        return self._columns[query]
+
+    @staticmethod
+    def _build_copy(query: str, columns: list[tuple[str, BinaryType]]) -> sql.Composable:
+        expressions = []
+        for name, binary_type in columns:
+            expression: sql.Composable = sql.SQL("q.{column}").format(column=sql.Identifier(name))
+            if binary_type.cast is not None:
+                expression = sql.SQL("{expression}::{cast}").format(
+                    expression=expression, cast=sql.SQL(binary_type.cast)
+                )
+            if binary_type.sentinel is not None:
+                expression = sql.SQL("COALESCE({expression}, {sentinel})").format(
+                    expression=expression, sentinel=sql.SQL(binary_type.sentinel)
+                )
+            expressions.append(
+                sql.SQL("{expression} AS {column}").format(expression=expression, column=sql.Identifier(name))
+            )
+
+        return sql.SQL("COPY (SELECT {expressions} FROM ({query}) AS q) TO STDOUT (FORMAT BINARY)").format(
+            expressions=sql.SQL(", ").join(expressions),
+            query=sql.SQL(query),
+        )
+
+    @staticmethod
+    def _decode_column(values: np.ndarray, binary_type: BinaryType) -> Any:
+        if not binary_type.dtype.startswith("datetime64"):
+            return values.astype(binary_type.dtype)
+
+        raw = values.astype(np.int64)
+        nat = (raw == INT64_MIN) | (raw == INT64_MAX)
+        timestamps = np.where(nat, INT64_MIN, raw + EPOCH_OFFSET).view("datetime64[us]").astype("datetime64[ns]")
+        return pd.to_datetime(timestamps, utc=binary_type.dtype.endswith("UTC]"))
+
+    def read(self, connection: Connection, query: str, params: dict[str, Any] | None) -> pd.DataFrame | None:
+        """
+        Reads the result of a query with binary COPY.
+
+        Parameters
+        ----------
+        connection : Connection
+            A connection to a PostgreSQL database through psycopg.
+        query : str
+            The query to be executed.
+        params : dict | None
+            The parameters bound to the query.
+
+        Returns
+        -------
+        pd.DataFrame | None
+            A DataFrame containing the result of the query, or None if the result contains columns
+            which are not fixed-width, or NULL values which can't be replaced.
+        """
+        cursor = connection.connection.cursor()
+        binary_columns = self._get_columns(cursor, query, params)
+        if binary_columns is None:
+            return None
+
+        with cursor.copy(self._build_copy(query, binary_columns), params) as copy:
+            data = b"".join(copy)
+
+        assert data.startswith(SIGNATURE) and data.endswith(TRAILER), "Invalid binary COPY stream."
+        header_size = len(SIGNATURE) + 8 + int.from_bytes(data[len(SIGNATURE) + 4 : len(SIGNATURE) + 8], "big")
+        body = memoryview(data)[header_size : -len(TRAILER)]
+
+        # Every row consists of the number of fields and the length and value of every field
+        row_fields = [("n", ">i2")]
+        for i, (_, binary_type) in enumerate(binary_columns):
+            row_fields.extend([(f"l{i}", ">i4"), (f"v{i}", binary_type.wire_dtype)])
+        row_dtype = np.dtype(row_fields)
+
+        if len(body) % row_dtype.itemsize != 0:
+            logger.debug("Binary COPY stream contains NULL values and can't be decoded.")
+            return None
+        rows = np.frombuffer(body, dtype=row_dtype)
+        if not (rows["n"] == len(binary_columns)).all() or not all(
+            (rows[f"l{i}"] == np.dtype(binary_type.wire_dtype).itemsize).all()
+            for i, (_, binary_type) in enumerate(binary_columns)
+        ):
+            logger.debug("Binary COPY stream contains NULL values and can't be decoded.")
+            return None
+
+        return pd.DataFrame(
+            {
+                name: self._decode_column(rows[f"v{i}"], binary_type)
+                for i, (name, binary_type) in enumerate(binary_columns)
+            }
+        )
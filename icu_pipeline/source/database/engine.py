@@ -0,0 +1,195 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, AsyncIterator
+
+from sqlalchemy import Connection, Engine, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.source import SourceConfig
+
+logger = ICULogger.get_logger()
+
+# (process id, connection string, pool size, max overflow, pool recycle, pre ping, prepare threshold)
+EngineKey = tuple[int, str, int, int, int, bool, int | None]
+# (engine key, event loop id), async connections can only be used by the loop that opened them
+AsyncEngineKey = tuple[EngineKey, int]
+
+
+@dataclass
+class PoolStatistics:
+    """
+    Counters of a single connection pool.
+
+    Attributes
+    ----------
+    hits : int
+        Number of checkouts that reused an already established connection.
+    misses : int
+        Number of checkouts that had to open a new connection to the database.
+    wait_time : float
+        Accumulated time in seconds spent waiting for a connection.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    wait_time: float = 0.0
+
+    @property
+    def checkouts(self) -> int:
+        return self.hits + self.misses
+
+    def __str__(self) -> str:
+        return f"PoolStatistics(hits={self.hits}, misses={self.misses}, wait_time={self.wait_time:.3f}s)"
+
+
+class EngineRegistry:
+    """
+    Process-wide registry of SQLAlchemy engines.
+
+    Every mapper and sampler of a source borrows its connections from the same engine, so that
+    connections are pooled across concepts and chunks instead of being opened for every query.
+    Engines are keyed by the connection and pool settings of the `SourceConfig` and by the
+    current process, since pooled connections must not be shared across forked processes.
+
+    Methods
+    -------
+    get_engine(source_config):
+        Returns the engine for the given source configuration, creating it on first use.
+    connect(source_config):
+        Checks out a connection from the pool of the given source configuration.
+    get_async_engine(source_config):
+        Returns the async engine of the running event loop for the given source configuration.
+    connect_async(source_config):
+        Checks out an async connection, bounding the number of concurrent connections to the pool size.
+    get_statistics(source_config):
+        Returns the hit/miss and wait-time counters of the pool.
+    dispose():
+        Closes all pooled connections and clears the registry.
+    """
+
+    _engines: dict[EngineKey, Engine] = {}
+    _statistics: dict[EngineKey, PoolStatistics] = {}
+    _async_engines: dict[AsyncEngineKey, AsyncEngine] = {}
+    _semaphores: dict[AsyncEngineKey, asyncio.Semaphore] = {}
+    _lock = Lock()
+
+    @staticmethod
+    def _get_key(source_config: SourceConfig) -> EngineKey:
+        return (
+            os.getpid(),
+            source_config.connection,
+            source_config.pool_size,
+            source_config.max_overflow,
+            source_config.pool_recycle,
+            source_config.pool_pre_ping,
+            source_config.prepare_threshold,
+        )
+
+    @staticmethod
+    def _track(engine: Engine, statistics: PoolStatistics) -> None:
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+            connection_record.info["icu_pipeline_fresh"] = True
+
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+            fresh = connection_record.info.pop("icu_pipeline_fresh", False)
+            with EngineRegistry._lock:
+                if fresh:
+                    statistics.misses += 1
+                else:
+                    statistics.hits += 1
+
+    @staticmethod
+    def _add_wait_time(key: EngineKey, seconds: float) -> None:
+        with EngineRegistry._lock:
+            EngineRegistry._statistics[key].wait_time += seconds
+
+    @staticmethod
+    def _get_engine_args(source_config: SourceConfig) -> dict[str, Any]:
+        connect_args: dict[str, Any] = {}
+        if make_url(source_config.connection).get_driver_name() == "psycopg":
+            # Let the server reuse the plans of repeated queries (e.g. a concept for every chunk)
+            connect_args["prepare_threshold"] = source_config.prepare_threshold
+        return {
+            "pool_size": source_config.pool_size,
+            "max_overflow": source_config.max_overflow,
+            "pool_recycle": source_config.pool_recycle,
+            "pool_pre_ping": source_config.pool_pre_ping,
+            "connect_args": connect_args,
+        }
+
+    @staticmethod
+    def get_engine(source_config: SourceConfig) -> Engine:
+        key = EngineRegistry._get_key(source_config)
+        with EngineRegistry._lock:
+            engine = EngineRegistry._engines.get(key)
+            if engine is None:
+                logger.debug(f"Creating engine with pool size {source_config.pool_size} for PID {os.getpid()}.")
+                engine = create_engine(source_config.connection, **EngineRegistry._get_engine_args(source_config))
+                statistics = PoolStatistics()
+                EngineRegistry._track(engine, statistics)
+                EngineRegistry._engines[key] = engine
+                EngineRegistry._statistics[key] = statistics
+        return engine
+
+    @staticmethod
+    def connect(source_config: SourceConfig) -> Connection:
+        engine = EngineRegistry.get_engine(source_config)
+        start = time.perf_counter()
+        connection = engine.connect()
+        EngineRegistry._add_wait_time(EngineRegistry._get_key(source_config), time.perf_counter() - start)
+        return connection
+
+    @staticmethod
+    def get_async_engine(source_config: SourceConfig) -> AsyncEngine:
+        key = EngineRegistry._get_key(source_config)
+        async_key = (key, id(asyncio.get_running_loop()))
+        with EngineRegistry._lock:
+            engine = EngineRegistry._async_engines.get(async_key)
+            if engine is None:
+                logger.debug(f"Creating async engine with pool size {source_config.pool_size} for PID {os.getpid()}.")
+                engine = create_async_engine(source_config.connection, **EngineRegistry._get_engine_args(source_config))
+                statistics = EngineRegistry._statistics.setdefault(key, PoolStatistics())
+                EngineRegistry._track(engine.sync_engine, statistics)
+                EngineRegistry._async_engines[async_key] = engine
+                EngineRegistry._semaphores[async_key] = asyncio.Semaphore(
+                    source_config.pool_size + max(source_config.max_overflow, 0)
+                )
+        return engine
+
+    @staticmethod
+    @asynccontextmanager
+    async def connect_async(source_config: SourceConfig) -> AsyncIterator[AsyncConnection]:
+        engine = EngineRegistry.get_async_engine(source_config)
+        key = EngineRegistry._get_key(source_config)
+        # Queries beyond the size of the pool wait here instead of timing out in the pool
+        semaphore = EngineRegistry._semaphores[(key, id(asyncio.get_running_loop()))]
+        start = time.perf_counter()
+        async with semaphore, engine.connect() as connection:
+            EngineRegistry._add_wait_time(key, time.perf_counter() - start)
+            yield connection
+
+    @staticmethod
+    def get_statistics(source_config: SourceConfig) -> PoolStatistics:
+        with EngineRegistry._lock:
+            return EngineRegistry._statistics.get(EngineRegistry._get_key(source_config), PoolStatistics())
+
+    @staticmethod
+    def dispose() -> None:
+        with EngineRegistry._lock:
+            for key, engine in EngineRegistry._engines.items():
+                # Never close connections that were inherited from a parent process
+                engine.dispose(close=key[0] == os.getpid())
+            for async_engine in EngineRegistry._async_engines.values():
+                # The event loops of async connections may be closed already, their connections are dropped
+                async_engine.sync_engine.dispose(close=False)
+            EngineRegistry._engines.clear()
+            EngineRegistry._statistics.clear()
+            EngineRegistry._async_engines.clear()
+            EngineRegistry._semaphores.clear()
@@ -0,0 +1,298 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Hashable
+
+import pandas as pd
+from psycopg.sql import Composable
+
+from icu_pipeline.job import Job
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.source.database.mapper import AbstractDatabaseSourceMapper
+
+logger = ICULogger.get_logger()
+
+
+class AbstractFusedQuery(ABC):
+    """
+    Abstract class for queries that answer the queries of several mappers at once.
+
+    Mappers that read the same table with the same fields only differ in a few constraints. A fused
+    query reads the union of their rows once per job and splits the result back into one frame per
+    mapper, before the mappers convert their frame to FHIR. The plausibility limits of the mappers
+    aren't part of the fused query, every mapper applies them to its own frame instead.
+
+    Parameters
+    ----------
+    mappers : list[AbstractDatabaseSourceMapper]
+        The mappers answered by this query. They must share the same fusion signature.
+
+    Methods
+    -------
+    get_data(mapper, job):
+        Returns the raw data of a single mapper, querying the database once per job.
+    get_data_async(mapper, job):
+        Returns the raw data of a single mapper from a coroutine, querying the database once per job.
+    compile_query(job):
+        Returns the rendered query template of the fused query, which is built only once.
+    build_query(job):
+        Builds the fused query template for the ID columns of a job.
+    split(df):
+        Splits the result of the fused query into the frames of the mappers.
+    get_signature(mapper):
+        Returns a key, which is equal for all mappers that can be fused, or None.
+    """
+
+    def __init__(self, mappers: list[AbstractDatabaseSourceMapper]) -> None:
+        assert len(mappers) > 1, "A fused query requires at least two mappers."
+        self._mappers = mappers
+        self._job_id: str | None = None
+        self._frames: dict[int, pd.DataFrame] = {}
+        # The mappers of an async graph request their data concurrently, only the first one queries
+        self._lock = asyncio.Lock()
+        # Maps from the ID columns, subject table and subject range -> rendered query template
+        self._compiled_queries: dict[tuple[tuple[str, ...], str | None, bool], str] = {}
+        for mapper in mappers:
+            mapper._fusion = self
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({', '.join(m._concept_id for m in self._mappers)})"
+
+    def get_data(self, mapper: AbstractDatabaseSourceMapper, job: Job) -> pd.DataFrame:
+        if self._job_id != job.jobID:
+            # Free the frames of the previous job before querying the next one
+            self._frames = {}
+            reader = self._mappers[0]
+            df = reader.read_query(self.compile_query(job), reader._get_params(job), reader._get_connection(job))
+            self._frames = self.split(df)
+            self._job_id = job.jobID
+        return self._frames[id(mapper)]
+
+    async def get_data_async(self, mapper: AbstractDatabaseSourceMapper, job: Job) -> pd.DataFrame:
+        async with self._lock:
+            if self._job_id != job.jobID:
+                self._frames = {}
+                reader = self._mappers[0]
+                df = await reader.read_query_async(self.compile_query(job), reader._get_params(job))
+                self._frames = self.split(df)
+                self._job_id = job.jobID
+        return self._frames[id(mapper)]
+
+    def compile_query(self, job: Job) -> str:
+        options = AbstractDatabaseSourceMapper._get_query_options(job)
+        key = (tuple(job.subjects.columns), options["subject_table"], options["subject_range"])
+        if key not in self._compiled_queries:
+            query = self.build_query(job).as_string(None)
+            logger.debug(query)
+            self._compiled_queries[key] = query
+        return self._compiled_queries[key]
+
+    @abstractmethod
+    def build_query(self, job: Job) -> Composable:
+        raise NotImplementedError
+
+    @abstractmethod
+    def split(self, df: pd.DataFrame) -> dict[int, pd.DataFrame]:
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    def get_signature(mapper: AbstractDatabaseSourceMapper) -> Hashable | None:
+        raise NotImplementedError
+
+
+def _freeze(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _as_list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+class FusedRowQuery(AbstractFusedQuery):
+    """
+    Fuses mappers that select different rows of the same table.
+
+    The mappers may only differ in the value of their `FUSION_KEY` constraint (e.g. the `itemid` of
+    `mimiciv_icu.chartevents`). The fused query selects the union of all values with a single
+    `= any(...)` constraint and additionally returns the key column, which is used to split the
+    result client-side.
+    """
+
+    KEY_FIELD = "fusion_key"
+
+    def __init__(self, mappers: list[AbstractDatabaseSourceMapper]) -> None:
+        super().__init__(mappers)
+        self._key = mappers[0].FUSION_KEY
+        assert self._key is not None
+
+        self._values: dict[int, list[str]] = {
+            id(m): [str(v) for v in _as_list(m._query_args["constraints"][self._key])] for m in mappers
+        }
+
+    def build_query(self, job: Job) -> Composable:
+        assert self._key is not None
+        query_args = dict(self._mappers[0]._query_args)
+        query_args["fields"] = {**query_args["fields"], self.KEY_FIELD: self._key}
+        query_args.pop("limits", None)
+
+        values: list[Any] = []
+        for mapper in self._mappers:
+            for value in _as_list(mapper._query_args["constraints"][self._key]):
+                if value not in values:
+                    values.append(value)
+        query_args["constraints"] = {**query_args["constraints"], self._key: values}
+
+        options = AbstractDatabaseSourceMapper._get_query_options(job)
+        return self._mappers[0].build_query(ids=job.subjects, **options, **query_args)
+
+    def split(self, df: pd.DataFrame) -> dict[int, pd.DataFrame]:
+        keys = df.pop(self.KEY_FIELD).astype(str)
+        return {mapper_id: df[keys.isin(values)].reset_index(drop=True) for mapper_id, values in self._values.items()}
+
+    @staticmethod
+    def get_signature(mapper: AbstractDatabaseSourceMapper) -> Hashable | None:
+        key = mapper.FUSION_KEY
+        query_args = mapper._query_args
+        if key is None or key not in query_args.get("constraints", {}):
+            return None
+
+        constraints = {k: v for k, v in query_args["constraints"].items() if k != key}
+        return (
+            type(mapper),
+            query_args["schema"],
+            query_args["table"],
+            _freeze(query_args["fields"]),
+            _freeze(query_args.get("joins")),
+            _freeze(constraints),
+            _freeze(query_args.get("transforms")),
+            key,
+        )
+
+
+class FusedColumnQuery(AbstractFusedQuery):
+    """
+    Fuses mappers that select different columns of the same rows of a wide table.
+
+    The mappers may only differ in the column of their `FUSION_FIELD` (e.g. the `heartrate` and
+    `sao2` columns of `eicu_crd.vitalperiodic`) and in the `not null` constraint on that column.
+    The fused query selects all columns in a single scan. The `not null` constraints are applied
+    client-side, when the result is unpivoted into the frames of the mappers.
+    """
+
+    FIELD_PREFIX = "fusion_"
+
+    def __init__(self, mappers: list[AbstractDatabaseSourceMapper]) -> None:
+        super().__init__(mappers)
+        self._field = mappers[0].FUSION_FIELD
+        assert self._field is not None
+
+        # Maps from mapper -> (fused field, column must not be null)
+        self._columns: dict[int, tuple[str, bool]] = {}
+        for mapper in mappers:
+            column = mapper._query_args["fields"][self._field]
+            constraint = mapper._query_args["constraints"].get(column)
+            self._columns[id(mapper)] = (
+                f"{self.FIELD_PREFIX}{column}",
+                isinstance(constraint, str) and constraint.lower() == "not null",
+            )
+
+    def build_query(self, job: Job) -> Composable:
+        assert self._field is not None
+        query_args = dict(self._mappers[0]._query_args)
+        fields = {k: v for k, v in query_args["fields"].items() if k != self._field}
+        transforms = {k: v for k, v in query_args.get("transforms", {}).items() if k != self._field}
+        for mapper in self._mappers:
+            column = mapper._query_args["fields"][self._field]
+            fields[f"{self.FIELD_PREFIX}{column}"] = column
+            # The values of every mapper are converted into the unit of its own concept
+            if (transform := mapper._query_args.get("transforms", {}).get(self._field)) is not None:
+                transforms[f"{self.FIELD_PREFIX}{column}"] = transform
+        query_args["fields"] = fields
+        query_args["transforms"] = transforms
+        query_args.pop("limits", None)
+        query_args["constraints"] = self._get_common_constraints(self._mappers[0])
+
+        options = AbstractDatabaseSourceMapper._get_query_options(job)
+        return self._mappers[0].build_query(ids=job.subjects, **options, **query_args)
+
+    def split(self, df: pd.DataFrame) -> dict[int, pd.DataFrame]:
+        fused_fields = {field for field, _ in self._columns.values()}
+        common_fields = [c for c in df.columns if c not in fused_fields]
+
+        out = {}
+        for mapper_id, (field, not_null) in self._columns.items():
+            frame = df[common_fields + [field]]
+            if not_null:
+                frame = frame[frame[field].notna()]
+            out[mapper_id] = frame.rename(columns={field: self._field}).reset_index(drop=True)
+        return out
+
+    @staticmethod
+    def _get_common_constraints(mapper: AbstractDatabaseSourceMapper) -> dict[str, Any]:
+        assert mapper.FUSION_FIELD is not None
+        column = mapper._query_args["fields"][mapper.FUSION_FIELD]
+        return {k: v for k, v in mapper._query_args["constraints"].items() if k != column}
+
+    @staticmethod
+    def get_signature(mapper: AbstractDatabaseSourceMapper) -> Hashable | None:
+        field = mapper.FUSION_FIELD
+        query_args = mapper._query_args
+        if field is None or field not in query_args.get("fields", {}):
+            return None
+
+        fields = {k: v for k, v in query_args["fields"].items() if k != field}
+        transforms = {k: v for k, v in query_args.get("transforms", {}).items() if k != field}
+        return (
+            type(mapper),
+            query_args["schema"],
+            query_args["table"],
+            _freeze(fields),
+            _freeze(query_args.get("joins")),
+            _freeze(FusedColumnQuery._get_common_constraints(mapper)),
+            _freeze(transforms),
+            field,
+        )
+
+
+FUSED_QUERY_TYPES: list[type[AbstractFusedQuery]] = [FusedRowQuery, FusedColumnQuery]
+
+
+def fuse_mappers(mappers: list[AbstractDatabaseSourceMapper]) -> list[AbstractFusedQuery]:
+    """
+    Groups mappers with equal fusion signatures and creates a fused query for every group.
+
+    Mappers that are already part of a fused query are released first. Groups with a single mapper
+    are not fused.
+
+    Parameters
+    ----------
+    mappers : list[AbstractDatabaseSourceMapper]
+        The mappers to be fused.
+
+    Returns
+    -------
+    list[AbstractFusedQuery]
+        The fused queries that were created.
+    """
+    for mapper in mappers:
+        mapper._fusion = None
+
+    out: list[AbstractFusedQuery] = []
+    remaining = list(mappers)
+    for fused_type in FUSED_QUERY_TYPES:
+        groups: dict[Hashable, list[AbstractDatabaseSourceMapper]] = defaultdict(list)
+        for mapper in remaining:
+            signature = fused_type.get_signature(mapper)
+            if signature is not None:
+                groups[signature].append(mapper)
+
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            fused_query = fused_type(group)
+            logger.debug(f"Created {fused_query}")
+            out.append(fused_query)
+        remaining = [m for m in remaining if m._fusion is None]
+    return out
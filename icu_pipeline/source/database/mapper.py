@@ -1,21 +1,46 @@
-from typing import Any, Generic, TypeVar
+import asyncio
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Generator, Generic, Iterator, TypeVar
 
 import pandas as pd
 from pandera.typing import DataFrame
 from psycopg import sql
 from psycopg.sql import Composable
-from sqlalchemy import Connection, create_engine
+from sqlalchemy import Connection
 
+from conceptbase.config import DtypeBackend, FetchEngine
 from icu_pipeline.job import Job
 from icu_pipeline.logger import ICULogger
 from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
+from icu_pipeline.schema.validation import SchemaValidator
 from icu_pipeline.source import AbstractSourceMapper, DataSource, SourceConfig
+from icu_pipeline.source.cache import QueryCache
+from icu_pipeline.source.database.binary_copy import BinaryCopyReader
+from icu_pipeline.source.database.engine import EngineRegistry
+from icu_pipeline.source.dtypes import FieldType, apply_dtypes, coerce_numeric
+
+if TYPE_CHECKING:
+    from icu_pipeline.source.database.fusion import AbstractFusedQuery
 
 logger = ICULogger.get_logger()
 
 F = TypeVar("F", bound=AbstractFHIRSinkSchema)
 
 
+def _to_array_literal(values: list[Any]) -> str:
+    def _to_element(value: Any) -> str:
+        if pd.isna(value):
+            return "NULL"
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float) and value.is_integer():
+            # Integer IDs are upcast to float when some of them are missing
+            return str(int(value))
+        return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    return "{" + ",".join(_to_element(v) for v in values) + "}"
+
+
 class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
     """
     Abstract class for the database source mappers.
@@ -36,14 +61,45 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
     Methods
     -------
     create_connection():
-        Establishes a connection to the database. This method should be implemented by subclasses.
+        Borrows a connection from the shared connection pool of the source.
     build_query(schema, table, fields, constraints):
-        Builds a SQL query to retrieve data from the database.
-    get_datab():
-        Retrieves data from the database. This method should be implemented by subclasses.
+        Builds a SQL query template to retrieve data from the database.
+    push_conversion(unit, factor, offset):
+        Converts the values into another unit in the query, instead of a converter node.
+    push_limits(lower_limit, upper_limit):
+        Drops the values outside of plausibility limits in the query, instead of a filter node.
+    count_dropped(job):
+        Counts the rows of a job, which are dropped by the pushed limits of the query.
+    build_params(ids):
+        Builds the bound parameters of the query template for a subset of IDs.
+    compile_query(job):
+        Returns the rendered query template of the mapper, which is built only once.
+    get_data(job):
+        Retrieves the data of a job from the database.
+    get_result(job):
+        Retrieves the query result of a job, before it's converted to the FHIR schema.
+    apply_dtypes(df):
+        Casts the fields of a query result to the dtypes of the mapper.
+    get_batches(job):
+        Retrieves the data of a job from the database in batches of `fetch_size` rows.
+    get_result_batches(job):
+        Retrieves the query result of a job in batches of `fetch_size` rows.
+    get_data_async(job):
+        Retrieves the data of a job from the database over an async connection.
+    get_result_async(job):
+        Retrieves the query result of a job over an async connection.
+
+    Results are read from the persistent query cache of the source configuration, if it has one
+    (see `QueryCache`). The entries of a mapper are stored under the name of its concept. The
+    queries of sources with another backend than the database are answered by a wrapping
+    `AbstractWrappedSourceMapper`, e.g. from files by a `FileSourceMapper`.
     """
 
     SQL_QUERY: str | Composable  # the SQL query to be executed
+    FUSION_KEY: str | None = None  # the constraint in which fusable queries of the same table differ
+    FUSION_FIELD: str | None = None  # the field in which fusable queries of the same (wide) table differ
+    FIELD_TYPES: dict[str, FieldType] = {}  # the types of the normalized fields of the query result
+    CONVERTED_FIELD: str | None = None  # the field of the values, which are converted into the unit of the concept
 
     def __init__(
         self,
@@ -58,10 +114,33 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
         super().__init__(concept_id, concept_type, fhir_schema, datasource, source_config, unit)
         self._id_field: str | None = None
         self._query_args: dict[Any, Any] = {}
+        self._fusion: "AbstractFusedQuery | None" = None
+        # Maps from the ID columns, subject table, subject range and count -> rendered query template
+        self._compiled_queries: dict[tuple[tuple[str, ...], str | None, bool, bool], str] = {}
+        # Caches the column types of the queries read with binary COPY
+        self._binary_copy_reader = BinaryCopyReader()
+        self._field_types = dict(self.FIELD_TYPES)
+        # Counts the values of float fields, which were rejected since they are not numeric
+        self._rejected_rows = 0
+        # Counts the rows dropped by the pushed limits with an additional query
+        self._count_dropped = False
 
     def create_connection(self) -> Connection:
-        engine = create_engine(self._source_config.connection)
-        return engine.connect().execution_options(stream_results=True)
+        # Queries run on client-side cursors by default, so that they can use prepared statements
+        return EngineRegistry.connect(self._source_config)
+
+    @contextmanager
+    def _connect(self, connection: Connection | None = None) -> Iterator[Connection]:
+        # The connection of a session is managed by the session itself
+        if connection is not None:
+            yield connection
+            return
+
+        with (
+            self.create_connection() as con,
+            con.begin(),
+        ):
+            yield con
 
     def build_query(
         self,
@@ -71,9 +150,20 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
         constraints: dict[str, Any],
         ids: DataFrame,
         joins: dict[str, dict[str, str]] | None = None,
+        subject_table: str | None = None,
+        subject_range: bool = False,
+        transforms: dict[str, tuple[float, float]] | None = None,
+        limits: dict[str, tuple[float | None, float | None]] | None = None,
+        count_dropped: bool = False,
     ) -> Composable:
         """
-        builds a select SQL query to retrieve data from the database.
+        builds a select SQL query template to retrieve data from the database.
+
+        The IDs are not part of the query. Instead, every ID column is bound to the array parameter
+        `ids_<n>` (see `build_params`), so that the same template can be used for all chunks. If a
+        subject table is given, the IDs are selected from that table instead. If the IDs are a
+        contiguous range, the first ID column is additionally restricted to the range bound to
+        `range_lo` and `range_hi`, so that the database can scan a single range of its index.
 
         Parameters
         ----------
@@ -86,15 +176,50 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
         constraints : dict
             The constraints to be applied to the query.
         ids : pd.DataFrame
-            The IDs to be used in the query.
+            The IDs to be used in the query, only its columns are part of the template.
         joins : dict
             The tables to be joined and the fields to join on.
+        subject_table : str | None
+            The (temporary) table, which holds the IDs to be used in the query.
+        subject_range : bool
+            Whether the first ID column is restricted to the range of the IDs.
+        transforms : dict | None
+            The (factor, offset) of the fields, whose values are converted by `factor * value + offset`.
+        limits : dict | None
+            The (lower, upper) limits of the (converted) values of the fields, rows with values outside
+            of them are dropped.
+        count_dropped : bool
+            Whether the query counts the rows outside of the limits as `dropped`, instead of selecting
+            the rows within them.
         """
 
         assert self._id_field is not None, f"Attribute 'self._id_field' was not set for class {type(self)}"
 
+        def _build_value(exp: str, org: str) -> Composable:
+            value: Composable = sql.Identifier(org)
+            if transforms is not None and exp in transforms:
+                factor, offset = transforms[exp]
+                # Converted values are double precision, just like the ones converted client-side
+                value = sql.SQL("{value} * {factor}::float8").format(value=value, factor=sql.Literal(factor))
+                if offset:
+                    value = sql.SQL("{value} + {offset}::float8").format(value=value, offset=sql.Literal(offset))
+            return value
+
         def _build_field(exp: str, org: str) -> Composable:
-            return sql.Composed((sql.Identifier(org), sql.SQL(" AS "), sql.Identifier(exp)))
+            return sql.Composed((_build_value(exp, org), sql.SQL(" AS "), sql.Identifier(exp)))
+
+        def _build_limit(exp: str, lower: float | None, upper: float | None) -> Composable:
+            # The limits are compared to the converted values, just like by the limit filter
+            value = _build_value(exp, fields[exp])
+            bounds = []
+            if lower is not None:
+                bounds.append(sql.SQL("{value} >= {lower}").format(value=value, lower=sql.Literal(lower)))
+            if upper is not None:
+                bounds.append(sql.SQL("{value} <= {upper}").format(value=value, upper=sql.Literal(upper)))
+            # Missing values aren't implausible
+            return sql.SQL("({field} IS NULL OR {bounds})").format(
+                field=sql.Identifier(fields[exp]), bounds=sql.SQL(" AND ").join(bounds)
+            )
 
         def _build_constraint(key: str, value: Any) -> Composable:
             if isinstance(value, str) and value.lower() == "not null":
@@ -110,6 +235,37 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
 
             return sql.Composed((sql.Identifier(key), sql.SQL(" = "), sql.Literal(value)))
 
+        def _build_subsetting(columns: list[str]) -> Composable:
+            if not subject_range:
+                return _build_membership(columns)
+
+            return sql.SQL("{membership} AND {identifier} BETWEEN {lo} AND {hi}").format(
+                membership=_build_membership(columns),
+                identifier=sql.SQL(columns[0]),
+                lo=sql.Placeholder("range_lo"),
+                hi=sql.Placeholder("range_hi"),
+            )
+
+        def _build_membership(columns: list[str]) -> Composable:
+            if subject_table is not None:
+                identifiers = sql.SQL(", ").join(sql.SQL(c) for c in columns)
+                return sql.SQL("({identifiers}) IN (SELECT {identifiers} FROM {table})").format(
+                    identifiers=identifiers,
+                    table=sql.Identifier(subject_table),
+                )
+
+            if len(columns) == 1:
+                return sql.SQL("{identifier} = ANY({ids})").format(
+                    identifier=sql.SQL(columns[0]),
+                    ids=sql.Placeholder("ids_0"),
+                )
+
+            # Multi-column identifiers are matched against the zipped arrays
+            return sql.SQL("({identifiers}) IN (SELECT * FROM unnest({ids}))").format(
+                identifiers=sql.SQL(", ").join(sql.SQL(c) for c in columns),
+                ids=sql.SQL(", ").join(sql.Placeholder(f"ids_{n}") for n in range(len(columns))),
+            )
+
         def _build_join_identifier(identifier: str) -> Composable:
             return sql.SQL(".").join(sql.Identifier(t) for t in identifier.split("."))
 
@@ -118,18 +274,22 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
             "fields": sql.SQL(", ").join([_build_field(exp, org) for exp, org in fields.items()]),
             "schema": sql.Identifier(schema),
             "table": sql.Identifier(table),
-            "subsetting": sql.SQL(" AND ").join(
-                [
-                    sql.SQL("{next_identifier} IN ({next_list})").format(
-                        next_identifier=sql.SQL(i),
-                        next_list=sql.SQL(",".join(ids[i].astype(str))),
-                    )
-                    for i in ids.columns
-                ]
-            ),
+            "subsetting": _build_subsetting(list(ids.columns)),
         }
 
-        if len(constraints) == 0:
+        conditions = [_build_constraint(key, value) for key, value in constraints.items()]
+        limit_conditions = [
+            _build_limit(exp, lower, upper)
+            for exp, (lower, upper) in (limits or {}).items()
+            if lower is not None or upper is not None
+        ]
+        if count_dropped:
+            assert limit_conditions, f"Mapper of concept '{self._concept_id}' has no limits to count."
+            params["fields"] = sql.SQL("count(*) AS dropped")
+            conditions.append(sql.SQL("NOT ({limits})").format(limits=sql.SQL(" AND ").join(limit_conditions)))
+        else:
+            conditions += limit_conditions
+        if len(conditions) == 0:
             raw_query = """
                 SELECT {fields}
                 FROM {schema}.{table}
@@ -145,9 +305,7 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
                 AND {subsetting}
             """
 
-            params["constraints"] = sql.SQL(" AND ").join(
-                [_build_constraint(key, value) for key, value in constraints.items()]
-            )
+            params["constraints"] = sql.SQL(" AND ").join(conditions)
 
         params["joins"] = sql.SQL("")
         if joins is not None:
@@ -171,36 +329,587 @@ class AbstractDatabaseSourceMapper(AbstractSourceMapper, Generic[F]):
 
         return query
 
+    def supports_conversion(self) -> bool:
+        # Only numeric values can be converted in the query
+        field = self.CONVERTED_FIELD
+        return (
+            field is not None
+            and field in self._query_args.get("fields", {})
+            and self._field_types.get(field) == FieldType.FLOAT
+        )
+
+    def push_conversion(self, unit: str, factor: float, offset: float) -> None:
+        """
+        Converts the values of the mapper into another unit in the query, instead of a converter node.
+
+        The conversion becomes part of the selected fields (e.g. `valuenum * 133.322 AS value`), such
+        that the database returns the converted values. File sources convert the values after reading.
+
+        Parameters
+        ----------
+        unit : str
+            The unit the values are converted into.
+        factor : float
+            The factor of the conversion.
+        offset : float
+            The offset of the conversion.
+        """
+        assert self.supports_conversion(), f"Mapper of concept '{self._concept_id}' can't convert its values."
+        assert self.CONVERTED_FIELD is not None
+        self._query_args["transforms"] = {
+            **self._query_args.get("transforms", {}),
+            self.CONVERTED_FIELD: (factor, offset),
+        }
+        self._unit = unit
+        self._compiled_queries.clear()
+
+    def supports_limits(self) -> bool:
+        # Only numeric values can be compared to the limits in the query
+        return self.supports_conversion()
+
+    def push_limits(self, lower_limit: float | None, upper_limit: float | None, count_dropped: bool = False) -> None:
+        """
+        Drops the values of the mapper outside of plausibility limits in the query, instead of a filter node.
+
+        The limits are in the unit of the mapper, i.e. of the values after a pushed conversion, and
+        become part of the WHERE clause, such that implausible rows never leave the database. Rows
+        without a value are kept. Fused queries share their rows with other mappers, so they apply
+        the limits of every mapper to its own frame instead (see `filter_limits`).
+
+        Parameters
+        ----------
+        lower_limit : float | None
+            The lowest plausible value, None for no lower limit.
+        upper_limit : float | None
+            The highest plausible value, None for no upper limit.
+        count_dropped : bool
+            Whether the rows dropped in the database are counted by a separate query, which scans the
+            rows of every chunk a second time (see `count_dropped`). Rows dropped by a fused query are
+            always counted.
+        """
+        assert self.supports_limits(), f"Mapper of concept '{self._concept_id}' can't limit its values."
+        assert self.CONVERTED_FIELD is not None
+        self._query_args["limits"] = {self.CONVERTED_FIELD: (lower_limit, upper_limit)}
+        self._count_dropped = count_dropped
+        self._compiled_queries.clear()
+
+    def filter_limits(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Drops the rows of a query result outside of the pushed limits, which couldn't be applied in the query."""
+        from icu_pipeline.filter import LimitFilter
+
+        for field, (lower_limit, upper_limit) in self._query_args.get("limits", {}).items():
+            df = LimitFilter.apply(self._concept_id, df, field, lower_limit, upper_limit)
+        return df
+
+    def count_limits(self, rows: int, dropped: int | None) -> None:
+        """Counts the rows of a query result and the rows dropped by its query for the concept (see `LimitFilter`)."""
+        from icu_pipeline.filter import LimitFilter
+
+        # Without a count, the dropped rows aren't counted or a fused query counted them itself
+        if dropped is not None:
+            LimitFilter.count(self._concept_id, rows + dropped, dropped)
+
+    @staticmethod
+    def build_params(ids: DataFrame) -> dict[str, Any]:
+        """
+        Builds the bound parameters for a query template of `build_query`.
+
+        A single ID column is bound as untyped array literal, so that the database resolves it to the
+        type of the identifier column. Only arrays of the same type are matched with a hash lookup,
+        while e.g. a `smallint[]` would be compared element by element for every row of the table.
+        Multiple ID columns are joined against the unnested arrays, which works across types.
+
+        Parameters
+        ----------
+        ids : pd.DataFrame
+            The IDs to be used in the query.
+
+        Returns
+        -------
+        dict
+            The values of every ID column as array parameter `ids_<n>`.
+        """
+        if len(ids.columns) == 1:
+            return {"ids_0": _to_array_literal(ids[ids.columns[0]].tolist())}
+        return {f"ids_{n}": ids[c].tolist() for n, c in enumerate(ids.columns)}
+
+    @staticmethod
+    def _get_params(job: Job) -> dict[str, Any] | None:
+        # Within a session, the IDs are part of the subject table
+        params = {} if job.session is not None else AbstractDatabaseSourceMapper.build_params(job.subjects)
+        if job.subject_range is not None:
+            params["range_lo"], params["range_hi"] = job.subject_range
+        return params or None
+
+    @staticmethod
+    def _get_query_options(job: Job) -> dict[str, Any]:
+        # The options of `build_query`, which depend on the job
+        return {
+            "subject_table": job.session.table if job.session is not None else None,
+            "subject_range": job.subject_range is not None,
+        }
+
+    @staticmethod
+    def _get_connection(job: Job) -> Connection | None:
+        return job.session.connection if job.session is not None else None
+
+    def _get_cache(self, job: Job, count_dropped: bool = False) -> tuple[QueryCache | None, str]:
+        cache = QueryCache.for_config(self._source_config)
+        if cache is None:
+            return None, ""
+        # The result only depends on the database, the query and the subjects, fused results aren't limited yet
+        key = cache.fingerprint(
+            self._source_config.connection,
+            self._data_source,
+            self.compile_query(job, count_dropped),
+            self._query_args,
+            self._fusion is not None,
+            subjects=job.subjects,
+        )
+        return cache, key
+
+    def compile_query(self, job: Job, count_dropped: bool = False) -> str:
+        """
+        Returns the rendered query template of the mapper for the subjects of a job.
+
+        The template is built and rendered only once per mapper. Since the query text stays the same
+        for every chunk, the database can reuse the prepared statement of the previous chunks.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+        count_dropped : bool
+            Whether the query counts the rows dropped by the pushed limits instead, see `count_dropped`.
+
+        Returns
+        -------
+        str
+            The rendered query template.
+        """
+        options = self._get_query_options(job)
+        key = (tuple(job.subjects.columns), options["subject_table"], options["subject_range"], count_dropped)
+        if key not in self._compiled_queries:
+            query = self.build_query(ids=job.subjects, **options, **self._query_args, count_dropped=count_dropped)
+            rendered_query = query.as_string(None)
+            logger.debug(rendered_query)
+            self._compiled_queries[key] = rendered_query
+        return self._compiled_queries[key]
+
+    def _counts_dropped(self) -> bool:
+        # A fused query leaves the limits out, it drops and counts the rows of its frames instead
+        limits = self._query_args.get("limits", {}).values()
+        return (
+            self._count_dropped
+            and self._fusion is None
+            and any(lower is not None or upper is not None for lower, upper in limits)
+        )
+
+    def count_dropped(self, job: Job) -> int | None:
+        """
+        Counts the rows of a job, which are dropped by the pushed limits of the query.
+
+        The rows are counted by a separate aggregate query, such that they never leave the database.
+        The query scans the rows of the job a second time, so the rows are only counted if the limits
+        were pushed with `count_dropped`. Cached counts are never queried again.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
+        int | None
+            The number of dropped rows, None if the dropped rows aren't counted, i.e. without pushed
+            limits, without `count_dropped` or if the mapper is part of a fused query.
+        """
+        if not self._counts_dropped():
+            return None
+        cache, key = self._get_cache(job, count_dropped=True)
+        df = cache.get(self._concept_id, key) if cache is not None else None
+        if df is None:
+            query = self.compile_query(job, count_dropped=True)
+            df = self.read_query(query, self._get_params(job), self._get_connection(job))
+            if cache is not None:
+                cache.put(self._concept_id, key, df)
+        return int(df["dropped"].iloc[0])
+
+    async def count_dropped_async(self, job: Job) -> int | None:
+        """
+        Counts the rows of a job, which are dropped by the pushed limits, over an async connection.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
+        int | None
+            The number of dropped rows, None if the dropped rows aren't counted.
+        """
+        if not self._counts_dropped():
+            return None
+        if job.session is not None or QueryCache.for_config(self._source_config) is not None:
+            return await asyncio.to_thread(self.count_dropped, job)
+        df = await self.read_query_async(self.compile_query(job, count_dropped=True), self._get_params(job))
+        return int(df["dropped"].iloc[0])
+
     def get_data(self, job: Job) -> DataFrame:
         """
         Retrieves data from the database.
 
-        This method establishes a connection to the database, constructs a SQL query based on the
-        SQL_QUERY and SQL_FIELDS class attributes, and then executes the query to retrieve data.
-        The data is retrieved in chunks, with the chunk size specified by the source configuration.
+        This method constructs a SQL query for the subjects of the job, executes it and converts
+        the result to the FHIR schema of the mapper (see `get_result`). The rows dropped by the
+        pushed limits are counted for the concept, if requested (see `count_dropped`).
 
-        Yields
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the data retrieved from the database.
+
+        Raises
         ------
+        DatabaseError
+            If there is a problem executing the SQL query.
+        """
+        df = self.get_result(job)
+        self.count_limits(len(df), self.count_dropped(job))
+        return self._convert_result(df)
+
+    def get_result(self, job: Job) -> pd.DataFrame:
+        """
+        Retrieves the query result of a job, before it's converted to the FHIR schema.
+
+        If the mapper is part of a fused query, the result is taken from the shared result of the
+        fused query instead, and the pushed limits are applied to it (see `filter_limits`). Cached
+        results are never queried again.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
         pd.DataFrame
-            A DataFrame containing a chunk of the data retrieved from the database.
+            The query result with the normalized fields of the mapper.
 
         Raises
         ------
         DatabaseError
             If there is a problem executing the SQL query.
         """
-        with (
-            self.create_connection() as con,
-            con.begin(),
-        ):
-            query = self.build_query(ids=job.subjects, **self._query_args)
+        cache, key = self._get_cache(job)
+        df = cache.get(self._concept_id, key) if cache is not None else None
+        if df is None:
+            if self._fusion is not None:
+                df = self._fusion.get_data(self, job)
+            else:
+                df = self.read_query(self.compile_query(job), self._get_params(job), self._get_connection(job))
+            if cache is not None:
+                df = self.apply_dtypes(df)
+                cache.put(self._concept_id, key, df)
+        if self._fusion is not None:
+            # The limits are applied after the cache, such that the dropped rows are counted every time
+            df = self.filter_limits(df)
+        return df
+
+    def get_batches(self, job: Job) -> Generator[DataFrame, None, None]:
+        """
+        Retrieves data from the database in batches.
 
-            logger.debug(query.as_string(con.connection.cursor()))  # type: ignore[arg-type]
+        Every batch of the query result (see `get_result_batches`) is converted to the FHIR schema
+        on its own, so that the memory usage is bound by the batch size instead of the size of the
+        complete result.
 
-            df = pd.read_sql_query(
-                # type: ignore[arg-type]
-                query.as_string(con.connection.cursor()),  # type: ignore[arg-type]
-                con,
-                chunksize=None,
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Yields
+        ------
+        pd.DataFrame
+            DataFrames containing the batches retrieved from the database.
+        """
+        rows = 0
+        for df in self.get_result_batches(job):
+            rows += len(df)
+            yield self._convert_result(df)
+        self.count_limits(rows, self.count_dropped(job))
+
+    def get_result_batches(self, job: Job) -> Generator[pd.DataFrame, None, None]:
+        """
+        Retrieves the query result of a job in batches, before they're converted to the FHIR schema.
+
+        The rows are fetched from a server-side cursor in batches of `SourceConfig.fetch_size` rows.
+        Without a fetch size, or if the mapper is part of a fused query, the result is yielded as a
+        single batch.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Yields
+        ------
+        pd.DataFrame
+            The batches of the query result.
+        """
+        fetch_size = self._source_config.fetch_size
+        if self._fusion is not None or fetch_size <= 0:
+            yield self.get_result(job)
+            return
+
+        cache, key = self._get_cache(job)
+        batches = cache.get_batches(self._concept_id, key) if cache is not None else None
+        if batches is None:
+            query = self.compile_query(job)
+            batches = self.read_query_batches(query, self._get_params(job), fetch_size, self._get_connection(job))
+            if cache is not None:
+                # The batches are written to the cache one by one, as they are fetched
+                batches = cache.put_batches(self._concept_id, key, map(self.apply_dtypes, batches))
+        yield from batches
+
+    async def get_data_async(self, job: Job) -> DataFrame:
+        """
+        Retrieves data from the database over an async connection.
+
+        The query result (see `get_result_async`) is converted to the FHIR schema in a worker
+        thread.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the data retrieved from the database.
+        """
+        df = await self.get_result_async(job)
+        # The queries of a session share its connection, so they're executed one after the other
+        self.count_limits(len(df), await self.count_dropped_async(job))
+        return await asyncio.to_thread(self._convert_result, df)
+
+    async def get_result_async(self, job: Job) -> pd.DataFrame:
+        """
+        Retrieves the query result of a job over an async connection.
+
+        The query is executed over a connection of the async pool of the source, so that the
+        queries of all concepts of a job can be in flight at once. Jobs with a session use the
+        synchronous connection of the session in a worker thread instead.
+
+        Parameters
+        ----------
+        job : Job
+            The job containing the subjects to be queried.
+
+        Returns
+        -------
+        pd.DataFrame
+            The query result with the normalized fields of the mapper.
+        """
+        if job.session is not None:
+            return await asyncio.to_thread(self.get_result, job)
+
+        cache, key = self._get_cache(job)
+        df = await asyncio.to_thread(cache.get, self._concept_id, key) if cache is not None else None
+        if df is None:
+            if self._fusion is not None:
+                df = await self._fusion.get_data_async(self, job)
+            else:
+                df = await self.read_query_async(self.compile_query(job), self._get_params(job))
+            if cache is not None:
+                df = self.apply_dtypes(df)
+                await asyncio.to_thread(cache.put, self._concept_id, key, df)
+        if self._fusion is not None:
+            df = self.filter_limits(df)
+        return df
+
+    def _convert_result(self, df: pd.DataFrame) -> DataFrame:
+        return self._to_fihr(self.apply_dtypes(df).pipe(DataFrame)).pipe(DataFrame)
+
+    def apply_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casts the fields of a query result to the dtypes of the mapper.
+
+        Every mapper declares the types of its normalized fields (e.g. `patient_id`, `timestamp`
+        and `value`), which are cast to the dtypes of the `dtype_backend` of the source
+        configuration. Thereby the results of all fetch engines share the same dtypes and the
+        conversion to FHIR can rely on typed columns. Values of float fields which are not numeric
+        are rejected and counted.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The result of the query of the mapper.
+
+        Returns
+        -------
+        pd.DataFrame
+            The result with typed columns.
+        """
+        df, rejected = coerce_numeric(df, self._field_types)
+        if rejected:
+            self._rejected_rows += rejected
+            logger.warning(f"Rejected {rejected} non-numeric values of concept '{self._concept_id}'.")
+        return apply_dtypes(df, self._field_types, self._source_config.dtype_backend)
+
+    def read_query(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        connection: Connection | None = None,
+    ) -> pd.DataFrame:
+        """
+        Executes a query and returns the complete result.
+
+        The result is fetched with the `fetch_engine` of the source configuration. Results that can't
+        be fetched with binary COPY are read with pandas instead.
+
+        Parameters
+        ----------
+        query : str
+            The query to be executed.
+        params : dict | None
+            The parameters bound to the query.
+        connection : Connection | None
+            The connection of a session, by default a connection is borrowed from the pool.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the result of the query.
+        """
+        with self._connect(connection) as con:
+            if self._source_config.fetch_engine == FetchEngine.BINARY_COPY:
+                df = self._binary_copy_reader.read(con, query, params)
+                if df is not None:
+                    return df
+
+            if self._source_config.dtype_backend == DtypeBackend.PYARROW:
+                # Read the columns as Arrow arrays instead of casting the NumPy columns afterwards
+                return pd.read_sql_query(query, con, params=params, chunksize=None, dtype_backend="pyarrow")
+            return pd.read_sql_query(query, con, params=params, chunksize=None)
+
+    async def read_query_async(self, query: str, params: dict[str, Any] | None) -> pd.DataFrame:
+        """
+        Executes a query over an async connection and returns the complete result.
+
+        The result is always fetched as rows, independent of the `fetch_engine`.
+
+        Parameters
+        ----------
+        query : str
+            The query to be executed.
+        params : dict | None
+            The parameters bound to the query.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the result of the query.
+        """
+        async with EngineRegistry.connect_async(self._source_config) as con:
+            result = await con.exec_driver_sql(query, params)  # type: ignore[arg-type]
+            rows = result.fetchall()
+            return pd.DataFrame.from_records(rows, columns=list(result.keys()), coerce_float=True)  # type: ignore[arg-type]
+
+    def read_query_batches(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        fetch_size: int,
+        connection: Connection | None = None,
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Executes a query and yields its result in batches from a server-side cursor.
+
+        Parameters
+        ----------
+        query : str
+            The query to be executed.
+        params : dict | None
+            The parameters bound to the query.
+        fetch_size : int
+            The number of rows of a single batch.
+        connection : Connection | None
+            The connection of a session, by default a connection is borrowed from the pool.
+
+        Yields
+        ------
+        pd.DataFrame
+            DataFrames containing at most `fetch_size` rows of the result.
+        """
+        with self._connect(connection) as con:
+            # Only this statement uses a server-side cursor, the connection may be shared by a session
+            result = con.exec_driver_sql(
+                query,
+                params,  # type: ignore[arg-type]
+                execution_options={"stream_results": True, "max_row_buffer": fetch_size},
             )
-            return self._to_fihr(df.pipe(DataFrame)).pipe(DataFrame)
+            columns = list(result.keys())
+            for rows in result.partitions(fetch_size):
+                yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)  # type: ignore[arg-type]
+
+
+class AbstractWrappedSourceMapper(AbstractSourceMapper[F]):
+    """
+    Abstract class for the source mappers, which answer the query of a wrapped database source mapper.
+
+    Sources with another backend than the database wrap the database source mappers of their
+    concepts, see `getBackendMapper`. The wrapping mapper only answers the query, the conversion
+    to FHIR as well as the pushed conversions and limits are left to the database source mapper.
+
+    Parameters
+    ----------
+    mapper : AbstractDatabaseSourceMapper
+        The database source mapper, whose query is answered.
+
+    Methods
+    -------
+    get_data(job):
+        Answers the query of the job. This method should be implemented by subclasses.
+    """
+
+    def __init__(self, mapper: AbstractDatabaseSourceMapper[F]) -> None:
+        super().__init__(
+            mapper._concept_id,
+            mapper._concept_type,
+            mapper._fhir_schema,
+            mapper._data_source,
+            mapper._source_config,
+            mapper._unit,
+        )
+        self._mapper = mapper
+
+    def _to_fihr(self, df: DataFrame) -> DataFrame[F]:
+        return self._mapper._to_fihr(df)
+
+    def supports_conversion(self) -> bool:
+        return self._mapper.supports_conversion()
+
+    def push_conversion(self, unit: str, factor: float, offset: float) -> None:
+        # The query of the database source mapper converts the values
+        self._mapper.push_conversion(unit, factor, offset)
+        self._unit = unit
+
+    def supports_limits(self) -> bool:
+        return self._mapper.supports_limits()
+
+    def push_limits(self, lower_limit: float | None, upper_limit: float | None, count_dropped: bool = False) -> None:
+        self._mapper.push_limits(lower_limit, upper_limit, count_dropped)
+
+    def set_validator(self, validator: SchemaValidator) -> None:
+        # The frames are validated by the conversion of the database source mapper
+        super().set_validator(validator)
+        self._mapper.set_validator(validator)
@@ -1,17 +1,58 @@
-from typing import Generator
+from contextlib import AbstractContextManager
+from math import ceil
+from typing import Any, Generator, Sequence
 
 import pandas as pd
 from pandera.typing import DataFrame
 from psycopg import sql
 from psycopg.sql import Composable
-from sqlalchemy import Connection, create_engine
+from sqlalchemy import Connection
 
+from conceptbase.config import SamplingStrategy
 from icu_pipeline.logger import ICULogger
 from icu_pipeline.source import AbstractSourceSampler, SourceConfig
+from icu_pipeline.source.cache import QueryCache
+from icu_pipeline.source.database.engine import EngineRegistry
+from icu_pipeline.source.database.session import SubjectSession
 
 logger = ICULogger.get_logger()
 
 
+def pack_chunks(weights: Sequence[float], target: float) -> list[slice]:
+    """
+    Packs consecutive subjects into chunks of roughly equal weight.
+
+    The subjects are packed greedily in their order. A chunk is closed as soon as it reaches the
+    target weight, or before a subject would push it above the target. Thereby every subject that
+    is heavier than the target gets a chunk of its own.
+
+    Parameters
+    ----------
+    weights : Sequence[float]
+        The estimated weight of every subject.
+    target : float
+        The target weight of a chunk.
+
+    Returns
+    -------
+    list[slice]
+        The positions of the subjects of every chunk.
+    """
+    chunks = []
+    start, weight = 0, 0.0
+    for i, subject_weight in enumerate(weights):
+        if i > start and weight + subject_weight > target:
+            chunks.append(slice(start, i))
+            start, weight = i, 0.0
+        weight += subject_weight
+        if weight >= target:
+            chunks.append(slice(start, i + 1))
+            start, weight = i + 1, 0.0
+    if start < len(weights):
+        chunks.append(slice(start, len(weights)))
+    return chunks
+
+
 class AbstractDatabaseSourceSampler(AbstractSourceSampler):
     """
     Abstract class for the database source mappers.
@@ -26,22 +67,36 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
     Methods
     -------
     create_connection():
-        Establishes a connection to the database. This method should be implemented by subclasses.
+        Borrows a connection from the shared connection pool of the source.
     build_query(schema, table, fields, constraints):
         Builds a SQL query to retrieve data from the database.
+    build_partition_query():
+        Builds a SQL query for the ID ranges of the chunks.
+    build_range_query():
+        Builds a SQL query template for the subjects of an ID range.
+    build_weight_query():
+        Builds a SQL query for the ordered subjects and their estimated weight.
+    get_partitions():
+        Retrieves the ID ranges of all chunks.
+    create_session(subjects):
+        Creates a session, which holds the subjects of a chunk in a temporary table.
+    get_subject_range(subjects):
+        Returns the ID range of a chunk of the range sampling strategy.
     get_datab():
         Retrieves data from the database. This method should be implemented by subclasses.
     """
 
     IDENTIFIER: list[str]  # the identifier columns for the table
+    WEIGHT: str | None = None  # the column of the table, which estimates the data volume of a row (e.g. the LOS)
     SQL_QUERY: Composable  # the SQL query to be executed
 
     def __init__(self, source_config: SourceConfig) -> None:
         self._source_config = source_config
+        self._query_args: dict[str, Any] = {}
 
     def create_connection(self) -> Connection:
-        engine = create_engine(self._source_config.connection)
-        return engine.connect().execution_options(stream_results=True)
+        connection = EngineRegistry.connect(self._source_config)
+        return connection.execution_options(stream_results=True)
 
     def build_query(
         self,
@@ -62,6 +117,7 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
         constraints : dict
             The constraints to be applied to the query.
         """
+        self._query_args = {"schema": schema, "table": table}
 
         raw_query = """
             SELECT DISTINCT {fields}
@@ -78,6 +134,114 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
 
         return query
 
+    def build_partition_query(self) -> Composable:
+        """
+        builds a select SQL query for the ID ranges of the chunks.
+
+        The distinct values of the first identifier are numbered in ascending order and split into
+        partitions of `chunksize` values. Every row of the result is the inclusive range `(lo, hi)`
+        of a single partition, so that all chunks are known without retrieving every ID.
+        """
+        assert self._query_args, f"Method 'build_query' was not called for class {type(self)}"
+
+        raw_query = """
+            SELECT min({identifier}) AS lo, max({identifier}) AS hi
+            FROM (
+                SELECT {identifier}, (row_number() OVER (ORDER BY {identifier}) - 1) / {chunksize} AS partition
+                FROM (
+                    SELECT DISTINCT {identifier}
+                    FROM {schema}.{table}
+                    ORDER BY {identifier}
+                    LIMIT {limit}
+                ) AS ids
+            ) AS partitions
+            GROUP BY partition
+            ORDER BY partition
+        """
+
+        return sql.SQL(raw_query).format(
+            identifier=sql.Identifier(self.IDENTIFIER[0]),
+            chunksize=sql.Literal(self._source_config.chunksize),
+            schema=sql.Identifier(self._query_args["schema"]),
+            table=sql.Identifier(self._query_args["table"]),
+            limit=(sql.Literal(limit) if (limit := self._source_config.limit) > 0 else sql.SQL("ALL")),
+        )
+
+    def build_range_query(self) -> Composable:
+        """
+        builds a select SQL query template for the subjects of an ID range.
+
+        The bounds of the range are bound to the parameters `lo` and `hi`. The subjects are ordered,
+        so that the chunk of a range is the same in every run.
+        """
+        assert self._query_args, f"Method 'build_query' was not called for class {type(self)}"
+
+        raw_query = """
+            SELECT DISTINCT {fields}
+            FROM {schema}.{table}
+            WHERE {identifier} BETWEEN {lo} AND {hi}
+            ORDER BY {fields}
+        """
+
+        return sql.SQL(raw_query).format(
+            fields=sql.SQL(", ").join([sql.Identifier(i) for i in self.IDENTIFIER]),
+            schema=sql.Identifier(self._query_args["schema"]),
+            table=sql.Identifier(self._query_args["table"]),
+            identifier=sql.Identifier(self.IDENTIFIER[0]),
+            lo=sql.Placeholder("lo"),
+            hi=sql.Placeholder("hi"),
+        )
+
+    def build_weight_query(self) -> Composable:
+        """
+        builds a select SQL query for the ordered subjects and their estimated weight.
+
+        The weight of a subject is the sum of the `WEIGHT` column over all of its rows (e.g. the
+        length of all ICU stays of a patient), missing values weigh nothing. Without a `WEIGHT`
+        column, every row weighs the same.
+        """
+        assert self._query_args, f"Method 'build_query' was not called for class {type(self)}"
+
+        raw_query = """
+            SELECT {fields}, sum({weight}) AS weight
+            FROM {schema}.{table}
+            GROUP BY {fields}
+            ORDER BY {fields}
+            LIMIT {limit}
+        """
+
+        return sql.SQL(raw_query).format(
+            fields=sql.SQL(", ").join([sql.Identifier(i) for i in self.IDENTIFIER]),
+            weight=(
+                sql.SQL("COALESCE({weight}, 0)").format(weight=sql.Identifier(self.WEIGHT))
+                if self.WEIGHT is not None
+                else sql.SQL("1")
+            ),
+            schema=sql.Identifier(self._query_args["schema"]),
+            table=sql.Identifier(self._query_args["table"]),
+            limit=(sql.Literal(limit) if (limit := self._source_config.limit) > 0 else sql.SQL("ALL")),
+        )
+
+    def get_partitions(self) -> list[tuple[Any, Any]]:
+        """
+        Retrieves the ID ranges of all chunks.
+
+        The ranges are ordered and contiguous, they can be processed independently of each other
+        (e.g. by separate workers).
+
+        Returns
+        -------
+        list[tuple[Any, Any]]
+            The inclusive ID range `(lo, hi)` of every chunk.
+        """
+        with (
+            self.create_connection() as con,
+            con.begin(),
+        ):
+            query = self.build_partition_query().as_string(None)
+            logger.debug(query)
+            return [(lo, hi) for lo, hi in con.exec_driver_sql(query)]
+
     def get_samples(self) -> Generator[DataFrame, None, None]:
         """
         Retrieves data from the database.
@@ -85,6 +249,11 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
         This method establishes a connection to the database, constructs a SQL query based on the
         SQL_QUERY and SQL_FIELDS class attributes, and then executes the query to retrieve data.
         The data is retrieved in chunks, with the chunk size specified by the source configuration.
+        With the range sampling strategy, every chunk holds the ordered subjects of an ID range
+        (see `get_partitions`) instead. With the weighted sampling strategy, the ordered subjects
+        are packed into chunks of roughly equal estimated weight (see `build_weight_query`), whose
+        average size is the chunk size. If the source configuration has a query cache, the chunks
+        are read from the cache instead.
 
         Yields
         ------
@@ -96,6 +265,35 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
         DatabaseError
             If there is a problem executing the SQL query.
         """
+        cache = QueryCache.for_config(self._source_config)
+        if cache is None:
+            yield from self._get_samples()
+            return
+
+        key = cache.fingerprint(
+            self._source_config.connection,
+            type(self).__name__,
+            self.IDENTIFIER,
+            self.WEIGHT,
+            self._query_args,
+            self._source_config.sampling,
+            self._source_config.chunksize,
+            self._source_config.limit,
+        )
+        samples = cache.get_batches("samples", key)
+        if samples is None:
+            samples = cache.put_batches("samples", key, self._get_samples())
+        for df in samples:
+            yield df.pipe(DataFrame)
+
+    def _get_samples(self) -> Generator[DataFrame, None, None]:
+        if self._source_config.sampling == SamplingStrategy.RANGE:
+            yield from self._get_range_samples()
+            return
+        if self._source_config.sampling == SamplingStrategy.WEIGHTED:
+            yield from self._get_weighted_samples()
+            return
+
         with (
             self.create_connection() as con,
             con.begin(),
@@ -113,3 +311,81 @@ class AbstractDatabaseSourceSampler(AbstractSourceSampler):
                 chunksize=self._source_config.chunksize,
             ):
                 yield df.pipe(DataFrame)  # Potentially multiple columns as ID
+
+    def _get_range_samples(self) -> Generator[DataFrame, None, None]:
+        partitions = self.get_partitions()
+        logger.debug(f"Split the subjects into {len(partitions)} ID ranges.")
+
+        query = self.build_range_query().as_string(None)
+        logger.debug(query)
+        with (
+            self.create_connection() as con,
+            con.begin(),
+        ):
+            for lo, hi in partitions:
+                yield pd.read_sql_query(query, con, params={"lo": lo, "hi": hi}).pipe(DataFrame)
+
+    def _get_weighted_samples(self) -> Generator[DataFrame, None, None]:
+        query = self.build_weight_query().as_string(None)
+        logger.debug(query)
+        with (
+            self.create_connection() as con,
+            con.begin(),
+        ):
+            df = pd.read_sql_query(query, con)
+        yield from self._pack_samples(df)
+
+    def _pack_samples(self, df: pd.DataFrame) -> Generator[DataFrame, None, None]:
+        weights = df.pop("weight").astype(float)
+        if weights.sum() <= 0:
+            # Without any estimate, the subjects are packed by their count
+            weights = pd.Series(1.0, index=df.index)
+        target = weights.sum() / max(ceil(len(df) / self._source_config.chunksize), 1)
+        chunks = pack_chunks(weights.tolist(), target)
+        logger.debug(f"Packed {len(df)} subjects into {len(chunks)} chunks with a target weight of {target:.2f}.")
+
+        for chunk in chunks:
+            yield df.iloc[chunk].reset_index(drop=True).pipe(DataFrame)
+
+    def create_session(self, subjects: DataFrame) -> AbstractContextManager[Any]:
+        """
+        Creates the session in which the jobs of a chunk are processed.
+
+        If `SourceConfig.subject_table` is set, the subjects of the chunk are loaded into a temporary
+        table of a dedicated connection, which is shared by all queries of the chunk.
+
+        Parameters
+        ----------
+        subjects : pd.DataFrame
+            The chunk of subjects, as yielded by `get_samples`.
+
+        Returns
+        -------
+        AbstractContextManager
+            A context manager, which returns the `SubjectSession` of the chunk or None.
+        """
+        if not self._source_config.subject_table:
+            return super().create_session(subjects)
+        return SubjectSession(self._source_config, subjects)
+
+    def get_subject_range(self, subjects: DataFrame) -> tuple[Any, Any] | None:
+        """
+        Returns the inclusive range of the first identifier, which is covered by a chunk.
+
+        Only the chunks of the range and the weighted sampling strategy are contiguous ID ranges.
+
+        Parameters
+        ----------
+        subjects : pd.DataFrame
+            The chunk of subjects, as yielded by `get_samples`.
+
+        Returns
+        -------
+        tuple | None
+            The first and the last ID of the chunk, or None.
+        """
+        if self._source_config.sampling == SamplingStrategy.DISTINCT or len(subjects) == 0:
+            return super().get_subject_range(subjects)
+        # The subjects of a range are ordered
+        identifiers = subjects[self.IDENTIFIER[0]].tolist()
+        return identifiers[0], identifiers[-1]
@@ -0,0 +1,119 @@
+from types import TracebackType
+
+import pandas as pd
+from pandera.typing import DataFrame
+from psycopg import sql
+from sqlalchemy import Connection, RootTransaction
+
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.source import SourceConfig
+from icu_pipeline.source.database.engine import EngineRegistry
+
+logger = ICULogger.get_logger()
+
+
+class SubjectSession:
+    """
+    Database session of a single chunk, which holds the subjects of the chunk in a temporary table.
+
+    The subjects are bulk-loaded with `COPY` into a temporary table once per chunk. All mappers of
+    the chunk run their queries over the connection of the session and join against the temporary
+    table, instead of sending the IDs of the chunk with every query. The table is dropped when the
+    session is closed. Requires a PostgreSQL connection through psycopg.
+
+    Parameters
+    ----------
+    source_config : SourceConfig
+        The configuration of the source, whose connection pool is used.
+    subjects : pd.DataFrame
+        The subjects of the chunk, one column per identifier.
+
+    Attributes
+    ----------
+    TABLE : str
+        The name of the temporary table.
+
+    Methods
+    -------
+    open():
+        Borrows a connection and loads the subjects into the temporary table.
+    close(commit):
+        Drops the temporary table and returns the connection to the pool.
+    """
+
+    TABLE = "icu_pipeline_subjects"
+
+    def __init__(self, source_config: SourceConfig, subjects: DataFrame) -> None:
+        self._source_config = source_config
+        self._subjects = subjects
+        self._connection: Connection | None = None
+        self._transaction: RootTransaction | None = None
+
+    def __enter__(self) -> "SubjectSession":
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close(commit=exc_type is None)
+
+    @property
+    def connection(self) -> Connection:
+        assert self._connection is not None, "The session is not open."
+        return self._connection
+
+    @property
+    def table(self) -> str:
+        return self.TABLE
+
+    @staticmethod
+    def _get_column_type(series: pd.Series) -> sql.Composable:
+        match series.dtype.kind:
+            case "i" | "u":
+                return sql.SQL("bigint")
+            case "f":
+                return sql.SQL("double precision")
+            case _:
+                return sql.SQL("text")
+
+    def open(self) -> None:
+        assert self._connection is None, "The session is already open."
+        self._connection = EngineRegistry.connect(self._source_config)
+        self._transaction = self._connection.begin()
+
+        columns = sql.SQL(", ").join(sql.Identifier(c) for c in self._subjects.columns)
+        create_table = sql.SQL("CREATE TEMPORARY TABLE {table} ({columns}) ON COMMIT DROP").format(
+            table=sql.Identifier(self.TABLE),
+            columns=sql.SQL(", ").join(
+                sql.SQL("{} {}").format(sql.Identifier(c), self._get_column_type(self._subjects[c]))
+                for c in self._subjects.columns
+            ),
+        )
+        copy = sql.SQL("COPY {table} ({columns}) FROM STDIN").format(table=sql.Identifier(self.TABLE), columns=columns)
+
+        cursor = self._connection.connection.cursor()
+        cursor.execute(create_table)
+        with cursor.copy(copy) as copy_stream:  # type: ignore[attr-defined]
+            for row in self._subjects.astype(object).itertuples(index=False, name=None):
+                copy_stream.write_row(row)
+        # Provide the planner with statistics of the temporary table
+        cursor.execute(sql.SQL("ANALYZE {table}").format(table=sql.Identifier(self.TABLE)))
+        logger.debug(f"Loaded {len(self._subjects)} subjects into temporary table '{self.TABLE}'.")
+
+    def close(self, commit: bool = True) -> None:
+        if self._connection is None:
+            return
+        try:
+            assert self._transaction is not None
+            if commit:
+                self._transaction.commit()
+            else:
+                self._transaction.rollback()
+        finally:
+            self._connection.close()
+            self._connection = None
+            self._transaction = None
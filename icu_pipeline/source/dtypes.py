@@ -0,0 +1,290 @@
+from enum import StrEnum, auto
+from typing import Any, Callable, Sequence, cast
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionDtype
+
+from conceptbase.config import DtypeBackend
+
+
+class FieldType(StrEnum):
+    """
+    Enum for the types of the normalized fields of a source mapper.
+    """
+
+    INTEGER = auto()
+    FLOAT = auto()
+    DATETIME = auto()
+    STRING = auto()
+
+
+# Maps from dtype backend -> field type -> pandas dtype
+DTYPES: dict[DtypeBackend, dict[FieldType, str]] = {
+    DtypeBackend.NUMPY: {
+        FieldType.INTEGER: "int64",
+        FieldType.FLOAT: "float64",
+        FieldType.DATETIME: "datetime64[ns]",
+        FieldType.STRING: "object",
+    },
+    DtypeBackend.PYARROW: {
+        FieldType.INTEGER: "int64[pyarrow]",
+        FieldType.FLOAT: "double[pyarrow]",
+        FieldType.DATETIME: "timestamp[ns][pyarrow]",
+        FieldType.STRING: "string[pyarrow]",
+    },
+}
+
+
+def apply_dtypes(df: pd.DataFrame, field_types: dict[str, FieldType], backend: DtypeBackend) -> pd.DataFrame:
+    """
+    Casts the fields of a frame to the dtypes of their field types.
+
+    Only the columns which are part of the frame and whose dtype differs are cast. Columns without
+    a field type keep their dtype. Values of float fields which are not numeric become missing
+    values (see `coerce_numeric`).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The frame returned by a query.
+    field_types : dict[str, FieldType]
+        The types of the fields of the frame.
+    backend : DtypeBackend
+        The backend of the dtypes, the pyarrow backend requires the pyarrow package.
+
+    Returns
+    -------
+    pd.DataFrame
+        The frame with typed columns.
+    """
+    df, _ = coerce_numeric(df, field_types)
+    dtypes = {
+        field: DTYPES[backend][field_type]
+        for field, field_type in field_types.items()
+        if field in df.columns and str(df[field].dtype) != DTYPES[backend][field_type]
+    }
+    if not dtypes:
+        return df
+    return df.astype(dtypes)
+
+
+def coerce_numeric(df: pd.DataFrame, field_types: dict[str, FieldType]) -> tuple[pd.DataFrame, int]:
+    """
+    Coerces the float fields of a frame to numbers and returns the number of rejected values.
+
+    Sources may return float fields as text (e.g. the `value` column of `chartevents`), whose values
+    can't be cast with `astype` if they are not numeric. Those values are rejected and become
+    missing values instead (see `to_numeric`). Fields which are numeric already are kept.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The frame returned by a query.
+    field_types : dict[str, FieldType]
+        The types of the fields of the frame.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, int]
+        The frame with numeric float fields and the number of its non-missing values that were
+        rejected.
+    """
+    rejected = 0
+    for field, field_type in field_types.items():
+        if field_type != FieldType.FLOAT or field not in df.columns:
+            continue
+        if pd.api.types.is_numeric_dtype(df[field].dtype):
+            continue
+        values, count = to_numeric(df[field])
+        df = df.assign(**{field: values})
+        rejected += count
+    return df, rejected
+
+
+def _is_arrow(dtype: Any) -> bool:
+    # The pyarrow string dtype isn't an ArrowDtype
+    return isinstance(dtype, pd.ArrowDtype) or (
+        isinstance(dtype, pd.StringDtype) and getattr(dtype, "storage", None) == "pyarrow"
+    )
+
+
+def _arrow_dtype(alias: str) -> ExtensionDtype:
+    # Created on demand, since the Arrow dtypes require the pyarrow package
+    return pd.ArrowDtype.construct_from_string(alias)
+
+
+def to_float(series: pd.Series) -> pd.Series:
+    """
+    Returns the values of a numeric column as floats of the backend of the column.
+
+    Columns of the pyarrow backend become Arrow doubles with NA for missing values, all others
+    become NumPy floats with NaN for missing values.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A numeric column of either backend.
+
+    Returns
+    -------
+    pd.Series
+        The values of the column.
+    """
+    if _is_arrow(series.dtype):
+        return series.astype(_arrow_dtype("double[pyarrow]"))
+    return pd.Series(series.to_numpy(dtype=np.float64, na_value=np.nan), index=series.index)
+
+
+def to_numeric(series: pd.Series) -> tuple[pd.Series, int]:
+    """
+    Returns the values of a column as floats of its backend and the number of rejected values.
+
+    Values which are not numeric are rejected and become NaN, like missing values.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A column of either backend, e.g. of numbers or numeric strings.
+
+    Returns
+    -------
+    tuple[pd.Series, int]
+        The values of the column and the number of its non-missing values that were rejected.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return to_float(series), 0
+    values = pd.to_numeric(to_objects(series), errors="coerce")
+    if _is_arrow(series.dtype):
+        values = values.astype(_arrow_dtype("double[pyarrow]"))
+    values = to_float(values)
+    return values, int((values.isna() & series.notna()).sum())
+
+
+def map_unique(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """
+    Maps the values of a column to objects, calling the function only once per distinct value.
+
+    Rows with the same value share the same object, so the objects must not be modified in place.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A column of either backend.
+    func : Callable[[Any], Any]
+        The function, which creates the object of a value. Missing values are passed as NaN or NA.
+
+    Returns
+    -------
+    pd.Series
+        The objects of the rows.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    objects = np.empty(len(uniques), dtype=object)
+    objects[:] = [func(value) for value in uniques.tolist()]
+    return cast(pd.Series, pd.Series(objects[codes], index=series.index))
+
+
+def to_categorical(series: pd.Series) -> pd.Series:
+    """
+    Returns the values of a column as a categorical column of strings, with NaN for missing values.
+
+    Every distinct value is converted to a string only once, e.g. the IDs of the subjects of a
+    chunk to the references of the subjects.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A column of either backend.
+
+    Returns
+    -------
+    pd.Series
+        The values of the column as strings, encoded by their categories.
+    """
+    codes, uniques = pd.factorize(series)
+    categories = pd.Index(uniques.tolist(), dtype=object).astype(str)
+    # The stubs only declare sequences of codes, but the integer codes are passed as they are
+    categorical = pd.Categorical.from_codes(cast(Sequence[int], np.asarray(codes, dtype=np.intp)), categories)
+    return pd.Series(categorical, index=series.index)
+
+
+def to_constant(value: str, index: pd.Index) -> pd.Series:
+    """
+    Returns a categorical column, which repeats a single string, e.g. the code of a concept.
+
+    Parameters
+    ----------
+    value : str
+        The value of every row.
+    index : pd.Index
+        The index of the column.
+
+    Returns
+    -------
+    pd.Series
+        The categorical column with the value as its only category.
+    """
+    codes = np.zeros(len(index), dtype=np.int8)
+    categorical = pd.Categorical.from_codes(cast(Sequence[int], codes), pd.Index([value]))
+    return pd.Series(categorical, index=index)
+
+
+def to_objects(series: pd.Series) -> pd.Series:
+    """
+    Returns the values of a column as Python objects, with None for missing values.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A column of either backend.
+
+    Returns
+    -------
+    pd.Series
+        The values of the column.
+    """
+    return series.astype(object).where(series.notna(), None)
+
+
+def to_utc(series: pd.Series) -> pd.Series:
+    """
+    Returns the values of a datetime column as timezone-aware timestamps in UTC.
+
+    Columns of the pyarrow backend become Arrow timestamps, all others become NumPy timestamps.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A datetime column of either backend, or a column of datetime strings.
+
+    Returns
+    -------
+    pd.Series
+        The timestamps of the column.
+    """
+    timestamps = pd.to_datetime(series, utc=True)
+    if _is_arrow(series.dtype):
+        return timestamps.astype(_arrow_dtype("timestamp[ns, tz=UTC][pyarrow]"))
+    return cast(pd.Series, timestamps.astype(pd.DatetimeTZDtype("ns", "UTC")))
+
+
+def to_datetime64(series: pd.Series) -> np.ndarray:
+    """
+    Returns the values of a datetime column as timezone-naive NumPy timestamps in UTC.
+
+    Timezone-aware columns of both backends become object arrays of timestamps with `to_numpy`,
+    which are compared one by one. The NumPy timestamps are compared vectorized instead, e.g. as
+    the keys of a sort or an as-of join. Missing values become NaT.
+
+    Parameters
+    ----------
+    series : pd.Series
+        A datetime column of either backend, or a column of datetime strings.
+
+    Returns
+    -------
+    np.ndarray
+        The timestamps of the column as `datetime64[ns]`.
+    """
+    return to_utc(series).dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
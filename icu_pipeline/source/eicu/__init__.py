@@ -7,6 +7,7 @@ class EICUSampler(AbstractDatabaseSourceSampler):
     # TODO - subject IDs have an arbitrary amount of admissions..
     #   Use both, subject_id + admission_id?
     IDENTIFIER = ["patienthealthsystemstayid"]
+    WEIGHT = "unitdischargeoffset"
 
     def __init__(self, source_config: SourceConfig) -> None:
         super().__init__(source_config)
@@ -3,16 +3,11 @@ from typing import Any, Callable
 import pandas as pd
 from pandera.typing import DataFrame
 
-from icu_pipeline.schema.fhir import (
-    CodeableConcept,
-    Coding,
-    Quantity,
-    Reference,
-)
 from icu_pipeline.schema.fhir.observation import FHIRObservation
 from icu_pipeline.source import DataSource
 from icu_pipeline.source.database import AbstractDatabaseSourceMapper
-from icu_pipeline.source.utils import offset_to_timestamp, to_timestamp
+from icu_pipeline.source.dtypes import FieldType, map_unique, to_categorical, to_constant, to_float
+from icu_pipeline.source.utils import offsets_to_timestamps, to_timestamps
 from icu_pipeline.unit.gender import Gender
 
 
@@ -21,6 +16,16 @@ class EICUObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation]):
     Mapper class that maps the EICU data to the FHIR Observation schema.
     """
 
+    FUSION_FIELD = "value"
+    CONVERTED_FIELD = "value"
+    FIELD_TYPES = {
+        "patient_id": FieldType.INTEGER,
+        "time": FieldType.STRING,
+        "year": FieldType.INTEGER,
+        "offset": FieldType.INTEGER,
+        "value": FieldType.FLOAT,
+    }
+
     def __init__(
         self,
         schema: str,
@@ -64,27 +69,19 @@ class EICUObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation]):
         }
 
     def _to_fihr(self, df: DataFrame) -> DataFrame[FHIRObservation]:
-        observation_df = pd.DataFrame()
-
-        observation_df[FHIRObservation.subject] = df["patient_id"].map(
-            lambda id: Reference(reference=str(id), type=f"{self._data_source}")
-        )
-        observation_df[FHIRObservation.effective_date_time] = df.apply(
-            lambda _df: offset_to_timestamp(
-                to_timestamp(_df["time"], _df["year"]),
-                _df["offset"],
-            ),
-            axis=1,
+        observation_df = pd.DataFrame(index=df.index)
+
+        observation_df[FHIRObservation.code__coding__code] = to_constant(self._concept_id, df.index)
+        observation_df[FHIRObservation.code__coding__system] = to_constant(self._concept_type, df.index)
+        observation_df[FHIRObservation.subject__reference] = to_categorical(df["patient_id"])
+        observation_df[FHIRObservation.subject__type] = to_constant(f"{self._data_source}", df.index)
+        observation_df[FHIRObservation.effective_date_time] = offsets_to_timestamps(
+            to_timestamps(df["time"], df["year"]), df["offset"]
         )
-        observation_df[FHIRObservation.value_quantity] = df.apply(
-            lambda _df: Quantity(value=float(_df["value"]), unit=self._unit or self._unit),
-            axis=1,
-        )
-        observation_df[FHIRObservation.code] = [
-            CodeableConcept(coding=Coding(code=self._concept_id, system=self._concept_type))
-        ] * len(df)
+        observation_df[FHIRObservation.value_quantity__value] = to_float(df["value"])
+        observation_df[FHIRObservation.value_quantity__unit] = to_constant(self._unit, df.index)
 
-        return observation_df.pipe(DataFrame[FHIRObservation])
+        return self._validate(observation_df, FHIRObservation)
 
 
 class EICUPationObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation]):
@@ -92,6 +89,15 @@ class EICUPationObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation])
     Mapper class that maps the EICU data to the FHIR Observation schema.
     """
 
+    FUSION_FIELD = "value"
+    CONVERTED_FIELD = "value"
+    FIELD_TYPES = {
+        "patient_id": FieldType.INTEGER,
+        "time": FieldType.STRING,
+        "year": FieldType.INTEGER,
+        "value": FieldType.FLOAT,
+    }
+
     def __init__(
         self,
         schema: str,
@@ -134,6 +140,8 @@ class EICUPationObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation])
             self._converter = self._convert_age
         elif fields.get("value") == "gender":
             self._converter = self._convert_gender
+        if self._converter != self._convert_none:
+            self._field_types["value"] = FieldType.STRING
 
     def _convert_none(self, value: str) -> str:
         return value
@@ -151,24 +159,18 @@ class EICUPationObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation])
                 return str(Gender.DIVERSE.value)
 
     def _to_fihr(self, df: DataFrame) -> DataFrame[FHIRObservation]:
-        observation_df = pd.DataFrame()
-
-        observation_df[FHIRObservation.subject] = df["patient_id"].map(
-            lambda id: Reference(reference=str(id), type=f"{self._data_source}")
-        )
-        observation_df[FHIRObservation.effective_date_time] = df.apply(
-            lambda _df: to_timestamp(_df["time"], _df["year"]),
-            axis=1,
-        )
-        observation_df[FHIRObservation.value_quantity] = df.apply(
-            lambda _df: Quantity(
-                value=float(self._converter(_df["value"])),
-                unit=self._unit or self._unit,
-            ),
-            axis=1,
-        )
-        observation_df[FHIRObservation.code] = [
-            CodeableConcept(coding=Coding(code=self._concept_id, system=self._concept_type))
-        ] * len(df)
-
-        return observation_df.pipe(DataFrame[FHIRObservation])
+        observation_df = pd.DataFrame(index=df.index)
+
+        observation_df[FHIRObservation.code__coding__code] = to_constant(self._concept_id, df.index)
+        observation_df[FHIRObservation.code__coding__system] = to_constant(self._concept_type, df.index)
+        observation_df[FHIRObservation.subject__reference] = to_categorical(df["patient_id"])
+        observation_df[FHIRObservation.subject__type] = to_constant(f"{self._data_source}", df.index)
+        observation_df[FHIRObservation.effective_date_time] = to_timestamps(df["time"], df["year"])
+        if self._field_types["value"] == FieldType.FLOAT:
+            values = to_float(df["value"])
+        else:
+            values = map_unique(df["value"], lambda value: float(self._converter(value))).astype(float)
+        observation_df[FHIRObservation.value_quantity__value] = values
+        observation_df[FHIRObservation.value_quantity__unit] = to_constant(self._unit, df.index)
+
+        return self._validate(observation_df, FHIRObservation)
@@ -0,0 +1,339 @@
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Generator, TypeVar
+
+import pandas as pd
+from pandera.typing import DataFrame
+
+from conceptbase.config import SamplingStrategy
+from icu_pipeline.arrow import import_pyarrow
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
+from icu_pipeline.source import AbstractSourceSampler, SourceConfig
+from icu_pipeline.source.database import (
+    AbstractDatabaseSourceMapper,
+    AbstractDatabaseSourceSampler,
+    AbstractWrappedSourceMapper,
+)
+
+if TYPE_CHECKING:
+    from icu_pipeline.job import Job
+
+logger = ICULogger.get_logger()
+
+F = TypeVar("F", bound=AbstractFHIRSinkSchema)
+
+# The file formats of a table, in the order they are looked up
+EXTENSIONS = {".parquet": "parquet", ".csv.gz": "csv", ".csv": "csv"}
+
+
+class FileSource:
+    """
+    Source, which answers the queries of the database source mappers from Parquet or CSV files.
+
+    The file source of a source configuration with the `file` backend reads the tables of the
+    directory of its `connection`, e.g. the CSV or Parquet exports of MIMIC-IV and eICU. The
+    table `<schema>.<table>` is looked up (case-insensitively) as `<schema>/<table>.<ext>`, as
+    `<module>/<table>.<ext>` for schemas of the form `<source>_<module>` (e.g. `mimiciv_icu` ->
+    `icu`), and as `<table>.<ext>`. Tables may be single files or directories of Parquet files.
+
+    Only the columns of a query are read, and its constraints and subjects are pushed down as
+    filters. Thereby Parquet row groups whose statistics don't match the item or the ID range of
+    a chunk are skipped without being read, which works best for files sorted by subject.
+    Requires the pyarrow package.
+
+    Parameters
+    ----------
+    directory : str | Path
+        The directory of the tables.
+
+    Methods
+    -------
+    for_config(source_config):
+        Returns the shared file source of a source configuration.
+    get_dataset(schema, table):
+        Returns the dataset of a table.
+    read(schema, table, fields, constraints, ids, joins):
+        Reads the rows of a query of a database source mapper.
+    read_subjects(schema, table, identifier, weight):
+        Reads the ordered subjects of a table and their weight.
+    """
+
+    _sources: dict[str, "FileSource"] = {}
+    _lock = Lock()
+
+    def __init__(self, directory: str | Path) -> None:
+        self._pa = import_pyarrow("The file source")
+        self._ds = self._pa.dataset
+        self._directory = Path(directory)
+        self._datasets: dict[str, Any] = {}
+
+    @staticmethod
+    def for_config(source_config: SourceConfig) -> "FileSource":
+        with FileSource._lock:
+            if source_config.connection not in FileSource._sources:
+                FileSource._sources[source_config.connection] = FileSource(source_config.connection)
+            return FileSource._sources[source_config.connection]
+
+    def _find_table(self, schema: str, table: str) -> tuple[Path, str]:
+        directories = [self._directory / schema, self._directory / schema.split("_", 1)[-1], self._directory]
+        for directory in directories:
+            if not directory.is_dir():
+                continue
+            paths = {p.name.lower(): p for p in directory.iterdir()}
+            for extension, file_format in EXTENSIONS.items():
+                if (path := paths.get(f"{table}{extension}".lower())) is not None:
+                    return path, file_format
+            if (path := paths.get(table.lower())) is not None and path.is_dir():
+                return path, "parquet"
+        raise FileNotFoundError(f"No file for table '{schema}.{table}' in directory '{self._directory}'.")
+
+    def get_dataset(self, schema: str, table: str) -> Any:
+        """
+        Returns the dataset of a table, which is discovered only once.
+
+        Parameters
+        ----------
+        schema : str
+            The schema of the table.
+        table : str
+            The table.
+
+        Returns
+        -------
+        pyarrow.dataset.Dataset
+            The dataset of the table.
+        """
+        name = f"{schema}.{table}"
+        if name not in self._datasets:
+            path, file_format = self._find_table(schema, table)
+            logger.debug(f"Reading table '{name}' from '{path}'.")
+            self._datasets[name] = self._ds.dataset(path, format=file_format)
+        return self._datasets[name]
+
+    def _build_constraint(self, dataset: Any, key: str, value: Any) -> Any:
+        field = self._ds.field(key)
+        if isinstance(value, str) and value.lower() == "not null":
+            return field.is_valid()
+
+        # Constraints are written for the database, which casts e.g. strings to the type of the column
+        column_type = dataset.schema.field(key).type
+        if isinstance(value, list):
+            return field.isin(self._pa.array(value).cast(column_type))
+        return field == self._pa.scalar(value).cast(column_type)
+
+    def _build_subsetting(self, dataset: Any, column: str, ids: pd.Series) -> Any:
+        values = self._pa.array(ids.unique()).cast(dataset.schema.field(column).type)
+        # The bounds of the IDs let the scan skip the row groups of other subjects
+        field = self._ds.field(column)
+        return (field >= self._pa.compute.min(values)) & (field <= self._pa.compute.max(values)) & field.isin(values)
+
+    def read(
+        self,
+        schema: str,
+        table: str,
+        fields: dict[str, str],
+        constraints: dict[str, Any],
+        ids: DataFrame,
+        joins: dict[str, dict[str, str]] | None = None,
+        transforms: dict[str, tuple[float, float]] | None = None,
+        limits: dict[str, tuple[float | None, float | None]] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Reads the rows of a query of a database source mapper.
+
+        The parameters are the same as the ones of `AbstractDatabaseSourceMapper.build_query`.
+        Unqualified columns belong to the first table that has them, starting with the queried
+        table. Every table is read with its own columns and filters before the tables are joined.
+
+        Parameters
+        ----------
+        schema : str
+            The schema to be queried.
+        table : str
+            The table to be queried.
+        fields : dict
+            The fields to be retrieved and their new name.
+        constraints : dict
+            The constraints to be applied to the query.
+        ids : pd.DataFrame
+            The IDs of the subjects to be queried.
+        joins : dict
+            The tables to be joined and the fields to join on.
+        transforms : dict | None
+            The (factor, offset) of the fields, whose values are converted by `factor * value + offset`.
+        limits : dict | None
+            The (lower, upper) limits of the converted values of the fields, rows outside of them are dropped.
+
+        Returns
+        -------
+        pd.DataFrame
+            The rows of the query, with a column for every field.
+        """
+        names = [f"{schema}.{table}", *(joins or {})]
+        datasets = {name: self.get_dataset(*name.split(".", 1)) for name in names}
+
+        def _qualify(column: str) -> str:
+            if column.count(".") == 2:
+                return column
+            for name in names:
+                if column in datasets[name].schema.names:
+                    return f"{name}.{column}"
+            raise KeyError(f"Column '{column}' is not part of the tables {names}.")
+
+        def _split(column: str) -> tuple[str, str]:
+            name, _, key = _qualify(column).rpartition(".")
+            return name, key
+
+        conditions = [
+            (_qualify(field_a), _qualify(field_b))
+            for condition in (joins or {}).values()
+            for field_a, field_b in condition.items()
+        ]
+        columns = {_split(c) for c in [*fields.values(), *ids.columns, *(c for cs in conditions for c in cs)]}
+
+        frames = {}
+        for name, dataset in datasets.items():
+            filters = [
+                self._build_constraint(dataset, _split(key)[1], value)
+                for key, value in constraints.items()
+                if _split(key)[0] == name
+            ]
+            filters += [
+                self._build_subsetting(dataset, _split(c)[1], ids[c]) for c in ids.columns if _split(c)[0] == name
+            ]
+            expression = None
+            for f in filters:
+                expression = f if expression is None else expression & f
+
+            table_columns = sorted(key for table_name, key in columns if table_name == name)
+            frame = dataset.to_table(columns=table_columns, filter=expression).to_pandas()
+            frames[name] = frame.rename(columns=lambda c: f"{name}.{c}")
+
+        df = frames[names[0]]
+        for name in names[1:]:
+            # Every condition of a join has a field of the joined table and one of the previous tables
+            pairs = [
+                (a, b) if _split(b)[0] == name else (b, a)
+                for a, b in conditions
+                if name in (_split(a)[0], _split(b)[0])
+            ]
+            df = df.merge(frames[name], left_on=[a for a, _ in pairs], right_on=[b for _, b in pairs])
+
+        if len(ids.columns) > 1:
+            # The columns are filtered one by one, only their combinations are the subjects
+            subjects = ids.rename(columns=_qualify).drop_duplicates()
+            df = df.merge(subjects, on=list(subjects.columns))
+
+        out = pd.DataFrame({exp: df[_qualify(org)].to_numpy() for exp, org in fields.items()})
+        for field, (factor, offset) in (transforms or {}).items():
+            out[field] = out[field].astype(float) * factor + offset
+        if limits:
+            from icu_pipeline.filter import LimitFilter
+
+            for field, (lower, upper) in limits.items():
+                out = out[LimitFilter.mask(out[field], lower, upper)].reset_index(drop=True)
+        return out
+
+    def read_subjects(self, schema: str, table: str, identifier: list[str], weight: str | None) -> pd.DataFrame:
+        """
+        Reads the ordered subjects of a table and their weight.
+
+        Parameters
+        ----------
+        schema : str
+            The schema of the table.
+        table : str
+            The table.
+        identifier : list[str]
+            The identifier columns of the subjects.
+        weight : str | None
+            The column, which estimates the data volume of a row. Without a column, every row weighs the same.
+
+        Returns
+        -------
+        pd.DataFrame
+            The distinct subjects in ascending order and their summed `weight`.
+        """
+        columns = identifier if weight is None else [*identifier, weight]
+        df = self.get_dataset(schema, table).to_table(columns=columns).to_pandas()
+        grouped = df.groupby(identifier, sort=True)
+        weights: pd.Series = grouped.size() if weight is None else grouped[weight].sum()
+        return weights.astype(float).rename("weight").reset_index()
+
+
+class FileSourceMapper(AbstractWrappedSourceMapper[F]):
+    """
+    Source mapper, which answers the query of a database source mapper from the files of its source.
+
+    Sources with the `file` backend wrap the database source mappers of their concepts. The query
+    of a database source mapper, including its pushed conversions and limits, is read from the
+    `FileSource` of the source configuration, and the rows are converted to FHIR by the database
+    source mapper. The queries of file sources are neither fused nor streamed.
+
+    Parameters
+    ----------
+    mapper : AbstractDatabaseSourceMapper
+        The database source mapper, whose query is answered.
+
+    Methods
+    -------
+    get_data(job):
+        Reads the data of a job from the files of the source.
+    """
+
+    def __init__(self, mapper: AbstractDatabaseSourceMapper[F]) -> None:
+        super().__init__(mapper)
+        self._file_source = FileSource.for_config(mapper._source_config)
+
+    def get_data(self, job: "Job") -> DataFrame:
+        # The limits are applied to the rows read from the files, such that the dropped rows are counted
+        query_args = {key: value for key, value in self._mapper._query_args.items() if key != "limits"}
+        df = self._file_source.read(ids=job.subjects, **query_args)
+        return self._mapper._convert_result(self._mapper.filter_limits(df))
+
+
+class FileSourceSampler(AbstractSourceSampler):
+    """
+    Source sampler, which reads the subjects of a database source sampler from the files of its source.
+
+    The subjects of the table of the database source sampler are read in ascending order. With
+    the weighted sampling strategy, they are packed into chunks of roughly equal weight, otherwise
+    into chunks of `chunksize` subjects. Thereby the chunks of every strategy are contiguous ID
+    ranges.
+
+    Parameters
+    ----------
+    sampler : AbstractDatabaseSourceSampler
+        The database source sampler, whose subjects are read.
+
+    Methods
+    -------
+    get_samples():
+        Reads the chunks of subjects from the files of the source.
+    """
+
+    def __init__(self, sampler: AbstractDatabaseSourceSampler) -> None:
+        self.IDENTIFIER = sampler.IDENTIFIER
+        super().__init__()
+        self._sampler = sampler
+        self._source_config = sampler._source_config
+        self._file_source = FileSource.for_config(sampler._source_config)
+
+    def get_samples(self) -> Generator[DataFrame, None, None]:
+        query_args = self._sampler._query_args
+        assert query_args, f"Method 'build_query' was not called for class {type(self._sampler)}"
+        df = self._file_source.read_subjects(
+            query_args["schema"], query_args["table"], self.IDENTIFIER, self._sampler.WEIGHT
+        )
+        if (limit := self._source_config.limit) > 0:
+            df = df.iloc[:limit]
+
+        if self._source_config.sampling == SamplingStrategy.WEIGHTED:
+            yield from self._sampler._pack_samples(df)
+            return
+
+        # The ordered subjects are contiguous ID ranges of every sampling strategy
+        df = df.drop(columns="weight")
+        for start in range(0, len(df), self._source_config.chunksize):
+            yield df.iloc[start : start + self._source_config.chunksize].reset_index(drop=True).pipe(DataFrame)
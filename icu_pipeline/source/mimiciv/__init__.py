@@ -8,6 +8,7 @@ class MimicSampler(AbstractDatabaseSourceSampler):
     # TODO - subject IDs have an arbitrary amount of admissions..
     #   Use both, subject_id + admission_id?
     IDENTIFIER = ["subject_id"]
+    WEIGHT = "los"
 
     def __init__(self, source_config: SourceConfig) -> None:
         super().__init__(source_config)
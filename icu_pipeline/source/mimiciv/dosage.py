@@ -3,19 +3,30 @@ from typing import Any
 import pandas as pd
 from pandera.typing import DataFrame
 
-from icu_pipeline.schema.fhir import CodeableConcept, CodeableReference, Coding, Dosage, Period, Quantity, Reference
 from icu_pipeline.schema.fhir.medication import FHIRMedicationStatement
 from icu_pipeline.source import DataSource
 from icu_pipeline.source.database import AbstractDatabaseSourceMapper
+from icu_pipeline.source.dtypes import FieldType, to_categorical, to_constant, to_float, to_utc
 
 
 class MimicDosageMapper(AbstractDatabaseSourceMapper[FHIRMedicationStatement]):
     """
     Mapper class that maps the MIMIC-IV data to the FHIR Dosage schema.
-      This maps non-continuous drug administrations to a simple MedicationAdministration object.
-      'Rate' is not available for such items.
+      This maps drug administrations to a MedicationStatement with the administered amount and
+      the period of the administration. Continuous infusions additionally have the rate of the
+      infusion, which is missing for non-continuous administrations (e.g. boluses).
     """
 
+    FUSION_KEY = "itemid"
+    FIELD_TYPES = {
+        "patient_id": FieldType.INTEGER,
+        "timestamp": FieldType.DATETIME,
+        "end_timestamp": FieldType.DATETIME,
+        "value": FieldType.FLOAT,
+        "rate": FieldType.FLOAT,
+        "rate_unit": FieldType.STRING,
+    }
+
     def __init__(
         self,
         schema: str,
@@ -34,31 +45,37 @@ class MimicDosageMapper(AbstractDatabaseSourceMapper[FHIRMedicationStatement]):
             fields["patient_id"] = "subject_id"
         if "timestamp" not in fields:
             fields["timestamp"] = "starttime"
+        if "end_timestamp" not in fields:
+            fields["end_timestamp"] = "endtime"
         if "value" not in fields:
             fields["value"] = "amount"
+        if "rate" not in fields:
+            fields["rate"] = "rate"
+        if "rate_unit" not in fields:
+            fields["rate_unit"] = "rateuom"
         self._query_args = {"schema": schema, "table": table, "constraints": constraints, "fields": fields}
 
     def _to_fihr(self, df: DataFrame) -> DataFrame[FHIRMedicationStatement]:
-        medication_df = pd.DataFrame()
-
-        medication_df[FHIRMedicationStatement.subject] = df["patient_id"].map(
-            lambda id: Reference(reference=str(id), type=f"{self._data_source}")
-        )
+        medication_df = pd.DataFrame(index=df.index)
 
-        medication_df[FHIRMedicationStatement.medication] = [
-            CodeableReference(concept=CodeableConcept(coding=Coding(code=self._concept_id, system=self._concept_type)))
-        ] * len(df)
+        medication_df[FHIRMedicationStatement.subject__reference] = to_categorical(df["patient_id"])
+        medication_df[FHIRMedicationStatement.subject__type] = to_constant(f"{self._data_source}", df.index)
 
-        medication_df[FHIRMedicationStatement.dosage] = df.apply(
-            lambda _df: Dosage(
-                dose_quantity=Quantity(value=_df["value"], unit=self._unit),
-                rate_quantity=Quantity(value=1.0, unit="unit"),
-            ),
-            axis=1,
+        medication_df[FHIRMedicationStatement.medication__concept__coding__code] = to_constant(
+            self._concept_id, df.index
         )
-
-        medication_df[FHIRMedicationStatement.effective_period] = df.apply(
-            lambda _df: Period(start=_df["timestamp"], end=_df["timestamp"]), axis=1
+        medication_df[FHIRMedicationStatement.medication__concept__coding__system] = to_constant(
+            self._concept_type, df.index
         )
 
-        return medication_df.pipe(DataFrame[FHIRMedicationStatement])
+        medication_df[FHIRMedicationStatement.dosage__dose_quantity__value] = to_float(df["value"])
+        medication_df[FHIRMedicationStatement.dosage__dose_quantity__unit] = to_constant(self._unit, df.index)
+        medication_df[FHIRMedicationStatement.dosage__rate_quantity__value] = to_float(df["rate"])
+        medication_df[FHIRMedicationStatement.dosage__rate_quantity__unit] = to_categorical(df["rate_unit"])
+
+        # Administrations without an end (e.g. boluses) end at their start
+        start = to_utc(df["timestamp"])
+        medication_df[FHIRMedicationStatement.effective_period__start] = start
+        medication_df[FHIRMedicationStatement.effective_period__end] = to_utc(df["end_timestamp"]).fillna(start)
+
+        return self._validate(medication_df, FHIRMedicationStatement)
@@ -1,25 +1,34 @@
-from typing import Any, Callable
+from typing import Any
 
 import pandas as pd
 from pandera.typing import DataFrame
 
-from icu_pipeline.schema.fhir import (
-    CodeableConcept,
-    Coding,
-    Quantity,
-    Reference,
-)
 from icu_pipeline.schema.fhir.observation import FHIRObservation
 from icu_pipeline.source import DataSource
 from icu_pipeline.source.database import AbstractDatabaseSourceMapper
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.source.dtypes import FieldType, to_categorical, to_constant, to_numeric, to_objects, to_utc
 from icu_pipeline.unit.gender import Gender
 
+logger = ICULogger.get_logger()
+
+# Maps the genders of MIMIC-IV to their values, all others are diverse
+GENDERS = {"M": Gender.MALE.value, "F": Gender.FEMALE.value}
+
 
 class MimicObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation]):
     """
     Mapper class that maps the MIMIC-IV data to the FHIR Observation schema.
     """
 
+    FUSION_KEY = "itemid"
+    CONVERTED_FIELD = "value"
+    FIELD_TYPES = {
+        "patient_id": FieldType.INTEGER,
+        "timestamp": FieldType.DATETIME,
+        "value": FieldType.FLOAT,
+    }
+
     def __init__(
         self,
         schema: str,
@@ -49,38 +58,30 @@ class MimicObservationMapper(AbstractDatabaseSourceMapper[FHIRObservation]):
             "joins": joins,
         }
 
-        self._converter: Callable[[str], str] = self._convert_none
+        self._lookup: dict[str, int] | None = None
         if fields.get("value") == "gender":
-            self._converter = self._convert_gender
+            self._lookup = GENDERS
+            self._field_types["value"] = FieldType.STRING
 
-    def _convert_none(self, value: str) -> str:
-        return value
+    def _convert_values(self, series: pd.Series) -> pd.Series:
+        if self._lookup is not None:
+            return to_objects(series).map(self._lookup).fillna(Gender.DIVERSE.value).astype(float)
 
-    def _convert_gender(self, gender: str) -> str:
-        match gender:
-            case "M":
-                return str(Gender.MALE.value)
-            case "F":
-                return str(Gender.FEMALE.value)
-            case _:
-                return str(Gender.DIVERSE.value)
+        values, rejected = to_numeric(series)
+        if rejected:
+            self._rejected_rows += rejected
+            logger.warning(f"Rejected {rejected} non-numeric values of concept '{self._concept_id}'.")
+        return values
 
     def _to_fihr(self, df: DataFrame) -> DataFrame[FHIRObservation]:
-        observation_df = pd.DataFrame()
+        observation_df = pd.DataFrame(index=df.index)
 
-        observation_df[FHIRObservation.subject] = df["patient_id"].map(
-            lambda id: Reference(reference=str(id), type=f"{self._data_source}")
-        )
-        observation_df[FHIRObservation.effective_date_time] = pd.to_datetime(df["timestamp"], utc=True)
-        observation_df[FHIRObservation.value_quantity] = df.apply(
-            lambda _df: Quantity(
-                value=float(self._converter(_df["value"])),
-                unit=self._unit or self._unit,
-            ),
-            axis=1,
-        )
-        observation_df[FHIRObservation.code] = [
-            CodeableConcept(coding=Coding(code=self._concept_id, system=self._concept_type))
-        ] * len(df)
+        observation_df[FHIRObservation.code__coding__code] = to_constant(self._concept_id, df.index)
+        observation_df[FHIRObservation.code__coding__system] = to_constant(self._concept_type, df.index)
+        observation_df[FHIRObservation.subject__reference] = to_categorical(df["patient_id"])
+        observation_df[FHIRObservation.subject__type] = to_constant(f"{self._data_source}", df.index)
+        observation_df[FHIRObservation.effective_date_time] = to_utc(df["timestamp"])
+        observation_df[FHIRObservation.value_quantity__value] = self._convert_values(df["value"])
+        observation_df[FHIRObservation.value_quantity__unit] = to_constant(self._unit, df.index)
 
-        return observation_df.pipe(DataFrame[FHIRObservation])
+        return self._validate(observation_df, FHIRObservation)
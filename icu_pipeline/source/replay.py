@@ -0,0 +1,409 @@
+import asyncio
+import json
+import time
+from contextlib import AbstractContextManager
+from dataclasses import replace
+from pathlib import Path
+from threading import Lock
+from typing import Any, Generator, Iterable, TypeVar
+
+import pandas as pd
+from pandera.typing import DataFrame
+from psycopg.sql import Composable
+
+from conceptbase.config import SourceBackend
+from icu_pipeline.job import Job
+from icu_pipeline.logger import ICULogger
+from icu_pipeline.schema.fhir import AbstractFHIRSinkSchema
+from icu_pipeline.source import AbstractSourceSampler, SourceConfig
+from icu_pipeline.source.cache import QueryCache
+from icu_pipeline.source.database import (
+    AbstractDatabaseSourceMapper,
+    AbstractDatabaseSourceSampler,
+    AbstractWrappedSourceMapper,
+)
+
+logger = ICULogger.get_logger()
+
+F = TypeVar("F", bound=AbstractFHIRSinkSchema)
+
+
+class QueryArchive:
+    """
+    Archive of recorded query results, which replays them without a database.
+
+    A source configuration with a `record_dir` records every query result of its database source
+    mappers and samplers into the archive of that directory (see `RecordingSourceMapper`). A
+    source configuration with the `replay` backend serves the recorded results of the archive in
+    the directory of its `connection` instead of querying a database (see `ReplaySourceMapper`),
+    optionally delayed by a simulated latency. Thereby complete extractions can be profiled and
+    tested with realistic data, but without a database.
+
+    The results are stored like the entries of a `QueryCache`, next to a JSON file with the
+    rendered query of every result. They are keyed by the query and the subjects, but not by the
+    connection, so that an archive can be replayed anywhere. Requires the pyarrow package.
+
+    Parameters
+    ----------
+    directory : str | Path
+        The directory of the archive.
+    latency : float
+        The simulated latency of a replayed query in seconds.
+
+    Methods
+    -------
+    for_recording(source_config):
+        Returns the archive to record into, or None if the source isn't recorded.
+    for_replay(source_config):
+        Returns the archive to replay from, or None if the source isn't replayed.
+    record(namespace, df, *parts, subjects):
+        Records the result of a query.
+    record_batches(namespace, batches, *parts, subjects):
+        Records the batches of a query result, while passing them through.
+    replay(namespace, *parts, subjects):
+        Returns the recorded result of a query.
+    replay_batches(namespace, *parts, subjects):
+        Yields the recorded batches of a query result.
+    """
+
+    _archives: dict[tuple[str, float], "QueryArchive"] = {}
+    _lock = Lock()
+
+    def __init__(self, directory: str | Path, latency: float = 0.0) -> None:
+        self._directory = Path(directory)
+        self._results = QueryCache(directory)
+        self._latency = latency
+
+    @staticmethod
+    def _get_archive(directory: str, latency: float) -> "QueryArchive":
+        with QueryArchive._lock:
+            if (directory, latency) not in QueryArchive._archives:
+                QueryArchive._archives[(directory, latency)] = QueryArchive(directory, latency)
+            return QueryArchive._archives[(directory, latency)]
+
+    @staticmethod
+    def for_recording(source_config: SourceConfig) -> "QueryArchive | None":
+        if source_config.record_dir is None:
+            return None
+        return QueryArchive._get_archive(source_config.record_dir, 0.0)
+
+    @staticmethod
+    def for_replay(source_config: SourceConfig) -> "QueryArchive | None":
+        if source_config.backend != SourceBackend.REPLAY:
+            return None
+        return QueryArchive._get_archive(source_config.connection, source_config.replay_latency)
+
+    def _write_query(self, namespace: str, key: str, parts: tuple[Any, ...]) -> None:
+        path = self._directory / namespace / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(parts, default=str, indent=2))
+
+    def record(self, namespace: str, df: pd.DataFrame, *parts: Any, subjects: pd.DataFrame | None = None) -> None:
+        """
+        Records the result of a query.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the result, e.g. the concept of the query.
+        df : pd.DataFrame
+            The result of the query.
+        *parts : Any
+            JSON serializable parts of the query, e.g. the rendered query template.
+        subjects : pd.DataFrame | None
+            The subjects of the query.
+        """
+        for _ in self.record_batches(namespace, [df], *parts, subjects=subjects):
+            pass
+
+    def record_batches(
+        self, namespace: str, batches: Iterable[pd.DataFrame], *parts: Any, subjects: pd.DataFrame | None = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Records the batches of a query result, while passing them through.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the result, e.g. the concept of the query.
+        batches : Iterable[pd.DataFrame]
+            The batches of the result.
+        *parts : Any
+            JSON serializable parts of the query, e.g. the rendered query template.
+        subjects : pd.DataFrame | None
+            The subjects of the query.
+
+        Yields
+        ------
+        pd.DataFrame
+            The batches of the result.
+        """
+        key = QueryCache.fingerprint(*parts, subjects=subjects)
+        self._write_query(namespace, key, parts)
+        yield from self._results.put_batches(namespace, key, batches)
+
+    def _lookup(self, namespace: str, parts: tuple[Any, ...], subjects: pd.DataFrame | None) -> str:
+        key = QueryCache.fingerprint(*parts, subjects=subjects)
+        if not self._results._get_path(namespace, key).exists():
+            raise KeyError(f"The result of '{namespace}/{key}' was not recorded in '{self._directory}'.")
+        if self._latency > 0:
+            time.sleep(self._latency)
+        return key
+
+    def replay(self, namespace: str, *parts: Any, subjects: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        Returns the recorded result of a query.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the result, e.g. the concept of the query.
+        *parts : Any
+            JSON serializable parts of the query, as they were recorded.
+        subjects : pd.DataFrame | None
+            The subjects of the query.
+
+        Returns
+        -------
+        pd.DataFrame
+            The recorded result.
+
+        Raises
+        ------
+        KeyError
+            If the query was not recorded.
+        """
+        df = self._results.get(namespace, self._lookup(namespace, parts, subjects))
+        assert df is not None
+        return df
+
+    def replay_batches(
+        self, namespace: str, *parts: Any, subjects: pd.DataFrame | None = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """
+        Yields the recorded batches of a query result.
+
+        Parameters
+        ----------
+        namespace : str
+            The namespace of the result, e.g. the concept of the query.
+        *parts : Any
+            JSON serializable parts of the query, as they were recorded.
+        subjects : pd.DataFrame | None
+            The subjects of the query.
+
+        Yields
+        ------
+        pd.DataFrame
+            The recorded batches.
+
+        Raises
+        ------
+        KeyError
+            If the query was not recorded.
+        """
+        batches = self._results.get_batches(namespace, self._lookup(namespace, parts, subjects))
+        assert batches is not None
+        yield from batches
+
+
+def _get_mapper_query(mapper: AbstractDatabaseSourceMapper, job: Job, count_dropped: bool = False) -> tuple[Any, ...]:
+    # Recorded results don't depend on the session or the range of a job, they're replayed without them
+    return mapper._data_source, mapper.compile_query(replace(job, session=None, subject_range=None), count_dropped)
+
+
+def _get_sampler_query(sampler: AbstractDatabaseSourceSampler) -> tuple[Any, ...]:
+    # The chunks of a recorded run only depend on the sampling, not on the database
+    source_config = sampler._source_config
+    return (
+        sampler.SQL_QUERY.as_string(None) if isinstance(sampler.SQL_QUERY, Composable) else sampler.SQL_QUERY,
+        sampler.WEIGHT,
+        source_config.sampling,
+        source_config.chunksize,
+        source_config.limit,
+    )
+
+
+class RecordingSourceMapper(AbstractWrappedSourceMapper[F]):
+    """
+    Source mapper, which records the query results of a database source mapper.
+
+    Sources with a `record_dir` wrap the database source mappers of their concepts. The query
+    results of a database source mapper are recorded into the `QueryArchive` of the directory,
+    before they're converted to FHIR, along with the number of rows dropped by its pushed limits.
+    Recorded queries are never fused.
+
+    Parameters
+    ----------
+    mapper : AbstractDatabaseSourceMapper
+        The database source mapper, whose query results are recorded.
+
+    Methods
+    -------
+    get_data(job):
+        Retrieves the data of a job from the database and records it.
+    get_batches(job):
+        Retrieves the data of a job from the database in batches and records them.
+    get_data_async(job):
+        Retrieves the data of a job from the database over an async connection and records it.
+    """
+
+    def __init__(self, mapper: AbstractDatabaseSourceMapper[F]) -> None:
+        super().__init__(mapper)
+        archive = QueryArchive.for_recording(mapper._source_config)
+        assert archive is not None, f"The results of '{self._concept_id}' are not recorded."
+        self._archive = archive
+
+    def _record_dropped(self, job: Job, rows: int, dropped: int | None) -> None:
+        if dropped is not None:
+            df = pd.DataFrame({"dropped": [dropped]})
+            query = _get_mapper_query(self._mapper, job, count_dropped=True)
+            self._archive.record(self._concept_id, df, *query, subjects=job.subjects)
+        self._mapper.count_limits(rows, dropped)
+
+    def get_data(self, job: Job) -> DataFrame:
+        df = self._mapper.apply_dtypes(self._mapper.get_result(job))
+        self._archive.record(self._concept_id, df, *_get_mapper_query(self._mapper, job), subjects=job.subjects)
+        self._record_dropped(job, len(df), self._mapper.count_dropped(job))
+        return self._mapper._convert_result(df)
+
+    def get_batches(self, job: Job) -> Generator[DataFrame, None, None]:
+        batches = self._archive.record_batches(
+            self._concept_id,
+            map(self._mapper.apply_dtypes, self._mapper.get_result_batches(job)),
+            *_get_mapper_query(self._mapper, job),
+            subjects=job.subjects,
+        )
+        rows = 0
+        for df in batches:
+            rows += len(df)
+            yield self._mapper._convert_result(df)
+        self._record_dropped(job, rows, self._mapper.count_dropped(job))
+
+    async def get_data_async(self, job: Job) -> DataFrame:
+        df = self._mapper.apply_dtypes(await self._mapper.get_result_async(job))
+        await asyncio.to_thread(
+            self._archive.record, self._concept_id, df, *_get_mapper_query(self._mapper, job), subjects=job.subjects
+        )
+        dropped = await self._mapper.count_dropped_async(job)
+        await asyncio.to_thread(self._record_dropped, job, len(df), dropped)
+        return await asyncio.to_thread(self._mapper._convert_result, df)
+
+
+class ReplaySourceMapper(AbstractWrappedSourceMapper[F]):
+    """
+    Source mapper, which replays the recorded query results of a database source mapper.
+
+    Sources with the `replay` backend wrap the database source mappers of their concepts. The
+    query of a database source mapper is answered from the `QueryArchive` of a recorded run, and
+    the result is converted to FHIR by the database source mapper. The rows dropped by the pushed
+    limits are counted as they were recorded, if they are counted (see `count_dropped`). The queries are never fused.
+
+    Parameters
+    ----------
+    mapper : AbstractDatabaseSourceMapper
+        The database source mapper, whose query results are replayed.
+
+    Methods
+    -------
+    get_data(job):
+        Replays the recorded data of a job.
+    get_batches(job):
+        Replays the recorded batches of the data of a job.
+    """
+
+    def __init__(self, mapper: AbstractDatabaseSourceMapper[F]) -> None:
+        super().__init__(mapper)
+        archive = QueryArchive.for_replay(mapper._source_config)
+        assert archive is not None, f"The results of '{self._concept_id}' are not replayed."
+        self._archive = archive
+
+    def _replay_dropped(self, job: Job, rows: int) -> None:
+        dropped = None
+        if self._mapper._counts_dropped():
+            query = _get_mapper_query(self._mapper, job, count_dropped=True)
+            dropped = int(self._archive.replay(self._concept_id, *query, subjects=job.subjects)["dropped"].iloc[0])
+        self._mapper.count_limits(rows, dropped)
+
+    def get_data(self, job: Job) -> DataFrame:
+        df = self._archive.replay(self._concept_id, *_get_mapper_query(self._mapper, job), subjects=job.subjects)
+        self._replay_dropped(job, len(df))
+        return self._mapper._convert_result(df)
+
+    def get_batches(self, job: Job) -> Generator[DataFrame, None, None]:
+        if self._source_config.fetch_size <= 0:
+            yield self.get_data(job)
+            return
+        rows = 0
+        for df in self._archive.replay_batches(
+            self._concept_id, *_get_mapper_query(self._mapper, job), subjects=job.subjects
+        ):
+            rows += len(df)
+            yield self._mapper._convert_result(df)
+        self._replay_dropped(job, rows)
+
+
+class RecordingSourceSampler(AbstractSourceSampler):
+    """
+    Source sampler, which records the chunks of subjects of a database source sampler.
+
+    Parameters
+    ----------
+    sampler : AbstractDatabaseSourceSampler
+        The database source sampler, whose chunks are recorded.
+
+    Methods
+    -------
+    get_samples():
+        Retrieves the chunks of subjects from the database and records them.
+    """
+
+    def __init__(self, sampler: AbstractDatabaseSourceSampler) -> None:
+        self.IDENTIFIER = sampler.IDENTIFIER
+        super().__init__()
+        self._sampler = sampler
+        archive = QueryArchive.for_recording(sampler._source_config)
+        assert archive is not None, f"The chunks of {type(sampler)} are not recorded."
+        self._archive = archive
+
+    def get_samples(self) -> Generator[DataFrame, None, None]:
+        for df in self._archive.record_batches(
+            "samples", self._sampler.get_samples(), *_get_sampler_query(self._sampler)
+        ):
+            yield df.pipe(DataFrame)
+
+    def create_session(self, subjects: DataFrame) -> AbstractContextManager[Any]:
+        return self._sampler.create_session(subjects)
+
+    def get_subject_range(self, subjects: DataFrame) -> tuple[Any, Any] | None:
+        return self._sampler.get_subject_range(subjects)
+
+
+class ReplaySourceSampler(AbstractSourceSampler):
+    """
+    Source sampler, which replays the recorded chunks of subjects of a database source sampler.
+
+    Replayed chunks are processed without sessions and ID ranges, just like they were recorded.
+
+    Parameters
+    ----------
+    sampler : AbstractDatabaseSourceSampler
+        The database source sampler, whose chunks are replayed.
+
+    Methods
+    -------
+    get_samples():
+        Replays the recorded chunks of subjects.
+    """
+
+    def __init__(self, sampler: AbstractDatabaseSourceSampler) -> None:
+        self.IDENTIFIER = sampler.IDENTIFIER
+        super().__init__()
+        self._sampler = sampler
+        archive = QueryArchive.for_replay(sampler._source_config)
+        assert archive is not None, f"The chunks of {type(sampler)} are not replayed."
+        self._archive = archive
+
+    def get_samples(self) -> Generator[DataFrame, None, None]:
+        for df in self._archive.replay_batches("samples", *_get_sampler_query(self._sampler)):
+            yield df.pipe(DataFrame)
@@ -1,6 +1,10 @@
+from typing import cast
+
+import numpy as np
 import pandas as pd
 
 from icu_pipeline.schema.fhir import Period
+from icu_pipeline.source.dtypes import to_float
 
 
 def to_timestamp(time: str, year: int | str, month: int | str = "01", day: int | str = "01") -> pd.Timestamp:
@@ -77,3 +81,88 @@ def offset_to_period(admit_year: int | str, admit_time: str, admit_offset: int,
         start=start,
         end=offset_to_timestamp(start, discharge_offset),
     )
+
+
+def to_timestamps(time: pd.Series, year: pd.Series, month: int | str = "01", day: int | str = "01") -> pd.Series:
+    """
+    Convert columns of time strings and years to timestamps.
+
+    The vectorized version of `to_timestamp`, which parses every distinct combination of time and
+    year only once, e.g. once per admission instead of once per row. Rows with a missing time or
+    year become NaT.
+
+    Parameters
+    ----------
+    time : pd.Series
+        String representations of the times.
+    year : pd.Series
+        Years of the timestamps.
+    month : int | str, optional
+        Month of the timestamps, by default "01"
+    day : int | str, optional
+        Day of the timestamps, by default "01"
+
+    Returns
+    -------
+    pd.Series
+        Timestamps in UTC with the index of the times.
+    """
+    time_codes, times = pd.factorize(time, use_na_sentinel=False)
+    year_codes, years = pd.factorize(year, use_na_sentinel=False)
+    keys, codes = np.unique(time_codes * len(years) + year_codes, return_inverse=True)
+
+    admissions = [(times[key // len(years)], years[key % len(years)]) for key in keys]
+    timestamps = [pd.NaT if pd.isna(t) or pd.isna(y) else to_timestamp(t, y, month, day) for t, y in admissions]
+    values = pd.DatetimeIndex(timestamps, tz="UTC").as_unit("ns").take(codes)
+    return cast(pd.Series, pd.Series(values, index=time.index))
+
+
+def offsets_to_timestamps(timestamps: pd.Series, offsets: pd.Series) -> pd.Series:
+    """
+    Convert columns of offsets to timestamps.
+
+    The vectorized version of `offset_to_timestamp`, which adds the offsets in minutes to the
+    timestamps of the same rows.
+
+    Parameters
+    ----------
+    timestamps : pd.Series
+        The timestamps to add the offsets to.
+    offsets : pd.Series
+        The offsets to add to the timestamps.
+
+    Returns
+    -------
+    pd.Series
+        The timestamps, shifted by the offsets.
+    """
+    return timestamps + pd.to_timedelta(to_float(offsets), unit="min")
+
+
+def offsets_to_periods(
+    admit_year: pd.Series, admit_time: pd.Series, admit_offset: pd.Series, discharge_offset: pd.Series
+) -> pd.DataFrame:
+    """
+    Convert columns of offsets to periods.
+
+    The vectorized version of `offset_to_period`, which returns the periods in the columnar form
+    of the FHIR schemas.
+
+    Parameters
+    ----------
+    admit_year : pd.Series
+        Years of the admissions.
+    admit_time : pd.Series
+        Times of the admissions.
+    admit_offset : pd.Series
+        Offsets of the admissions.
+    discharge_offset : pd.Series
+        Offsets of the discharges.
+
+    Returns
+    -------
+    pd.DataFrame
+        The `start` and `end` columns of the periods with the specified offsets.
+    """
+    start = offsets_to_timestamps(to_timestamps(admit_time, admit_year), admit_offset)
+    return pd.DataFrame({"start": start, "end": offsets_to_timestamps(start, discharge_offset)})
@@ -3,6 +3,7 @@ import glob
 from os.path import basename, dirname, isfile, join
 
 from icu_pipeline.unit.converter import BaseConverter, ConverterConfig
+from icu_pipeline.unit.registry import Unit, UnitRegistry
 
 # Use BaseConverter::getConverter(source_type, sink_type)
 
@@ -15,4 +16,4 @@ for m in __all__:
     # importlib.import_module(m)
 ## Necessary in order to use inheritance in abstract class
 
-__all__ += ["BaseConverter", "ConverterConfig"]
+__all__ += ["BaseConverter", "ConverterConfig", "Unit", "UnitRegistry"]
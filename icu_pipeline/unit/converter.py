@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Generator
 
-from pandera.typing import DataFrame, Series
+from pandera.typing import DataFrame
 
 from icu_pipeline.graph import Node
-from icu_pipeline.schema.fhir import Quantity
+from icu_pipeline.schema.fhir import FHIRObservation
 from icu_pipeline.source import DataSource
+from icu_pipeline.source.dtypes import to_constant
+from icu_pipeline.unit.registry import Dimension, UnitRegistry
 
 from ..job import Job
 
@@ -20,16 +22,37 @@ class ConverterConfig:
 
 
 class BaseConverter(Node):
+    """
+    Base class of the nodes that convert the values of a concept into the unit of the concept.
+
+    Subclasses declare a dimension by its SI unit, and the factors, and if needed the offsets,
+    that convert a value of each of their units into the SI unit, i.e.
+    `si = FACTORS[unit] * value + OFFSETS[unit]`. The units are registered in the `UnitRegistry`,
+    which also parses compound units of them (e.g. `ug/kg/min`). The transform between a pair of
+    units is composed from these once, such that a conversion is a single vectorized operation on
+    the values, instead of one to and one from the SI unit.
+    """
+
     SI_UNIT: str = ""
+    # The dimension, if it's not just the SI unit (e.g. 1/s for Hz)
+    DIMENSION: Dimension | None = None
+    FACTORS: dict[str, float] = {}
+    OFFSETS: dict[str, float] = {}
     AVAILABLE_UNITS: list[str] = []
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.AVAILABLE_UNITS = list(cls.FACTORS)
+        if cls.FACTORS:
+            UnitRegistry.register(cls)
+
     def __init__(self, converter_config: ConverterConfig) -> None:
         super().__init__(concept_id=converter_config.concept_id)
         self._config = converter_config
         if self._config.sink_unit is None:
             self._config.sink_unit = self.SI_UNIT
 
-    def get_data(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
+    def _check_sources(self, job: Job) -> None:
         expected_sources = 1 + len(self.REQUIRED_CONCEPTS)
         n_sources = len(self._sources)
         assert (
@@ -39,9 +62,22 @@ class BaseConverter(Node):
             job.database in self._config.source_units
         ), f"DataSource '{job.database}' is not configured for this Converter."
 
+    def get_data(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> DataFrame:
+        self._check_sources(job)
+
         # Read all sources
         data = super().fetch_sources(job, *args, **kwargs)
+        return self._convert_data(job, data)
 
+    def get_batches(self, job: Job, *args: list[Any], **kwargs: dict[Any, Any]) -> Generator[DataFrame, None, None]:
+        self._check_sources(job)
+
+        # Dependencies are read completely, only the data of the concept itself is streamed
+        dependencies = {c: s.read(job, *args, **kwargs) for c, s in self._sources.items() if c != self._concept_id}
+        for batch in self._sources[self._concept_id].read_batches(job, *args, **kwargs):
+            yield self._convert_data(job, {**dependencies, self._concept_id: batch})
+
+    def _convert_data(self, job: Job, data: dict[str, DataFrame]) -> DataFrame:
         # If In-Unit == Out-Unit
         if self._config.source_units[job.database] == self._config.sink_unit:
             return data[self._concept_id].pipe(DataFrame)
@@ -58,34 +94,80 @@ class BaseConverter(Node):
         # Check if output != input
         relevant_data = data[self._concept_id]
 
-        # FHIR Quantities need conversion of column 'value_quantity'
-        if "value_quantity" in relevant_data.columns:
-            # Convert inplace
-            relevant_data["value_quantity"] = self._convertToSI(source_unit, relevant_data["value_quantity"], data)  # type: ignore[arg-type]
-            relevant_data["value_quantity"] = self._convertToTarget(sink_unit, relevant_data["value_quantity"], data)  # type: ignore[arg-type]
+        # FHIR Quantities need conversion of the value and the unit column of 'value_quantity'
+        value, unit = FHIRObservation.value_quantity__value, FHIRObservation.value_quantity__unit
+        if value in relevant_data.columns:
+            factor, offset = self.getTransform(source_unit, sink_unit)
+            # Convert inplace, with a single vectorized operation on the values
+            values = relevant_data[value] * factor
+            relevant_data[value] = values + offset if offset else values
+            relevant_data[unit] = to_constant(sink_unit, relevant_data.index)
+            # The data of the sources may be a managed copy, e.g. of the multiprocessing graph
+            data[self._concept_id] = relevant_data
 
         return data
 
-    def _convertToSI(self, source_unit: str, data: Series[Quantity], dependencies: dict[str, DataFrame]) -> Series:  # type: ignore[type-var]
-        raise NotImplementedError
-
-    def _convertToTarget(self, sink_unit: str, data: Series[Quantity], dependencies: dict[str, DataFrame]) -> Series:  # type: ignore[type-var]
-        raise NotImplementedError
+    @classmethod
+    def getTransform(cls, source_unit: str, sink_unit: str) -> tuple[float, float]:
+        """
+        Returns the affine transform `y = factor * x + offset` from the source to the sink unit.
+
+        Parameters
+        ----------
+        source_unit : str
+            The unit of the values to be converted.
+        sink_unit : str
+            The unit the values are converted into.
+
+        Returns
+        -------
+        tuple[float, float]
+            The factor and the offset of the transform.
+
+        Raises
+        ------
+        KeyError
+            If one of the units is unknown.
+        NotImplementedError
+            If the units have different dimensions.
+        """
+        return UnitRegistry.get_transform(source_unit, sink_unit)
+
+    def getLinearTransforms(self) -> dict[DataSource, tuple[float, float]] | None:
+        """
+        Returns the transform of every source, if the conversion only depends on the values.
+
+        Such conversions can be applied by the source mappers instead of the converter, see
+        `Concept.pushConversion`. Converters with dependencies or their own conversion of the
+        data return None.
+
+        Returns
+        -------
+        dict[DataSource, tuple[float, float]] | None
+            The factor and offset of the transform from the unit of every source to the sink unit.
+        """
+        if self.REQUIRED_CONCEPTS or type(self).convert is not BaseConverter.convert:
+            return None
+        return {
+            source: self.getTransform(source_unit, self._config.sink_unit)
+            for source, source_unit in self._config.source_units.items()
+        }
 
     @staticmethod
     def getConverter(config: ConverterConfig) -> BaseConverter:
-        relevant_subclass = None
-        # Check all implemented Subclasses
-        for next_subclass in BaseConverter.__subclasses__():
-            # If the default unit for this concept (see config) is available, use this one
-            if config.sink_unit in next_subclass.AVAILABLE_UNITS:
-                relevant_subclass = next_subclass
-                break
-        assert relevant_subclass is not None, f"No Converter found for config {config}"
-        # Make sure that the source units are also implemented
+        from icu_pipeline.unit.dosage import DosageConverter
+
+        # Amounts per administration period are normalized into rates by their own converter
+        if DosageConverter.accepts(config):
+            return DosageConverter(converter_config=config)
+
+        # The converter of the dimension of the default unit for this concept (see config)
+        relevant_subclass = UnitRegistry.get_converter(config.sink_unit)
+        # Make sure that the source units are of the same dimension
+        dimension = UnitRegistry.get(config.sink_unit).dimension
         for source in config.source_units.values():
             assert (
-                source in relevant_subclass.AVAILABLE_UNITS
+                UnitRegistry.get(source).dimension == dimension
             ), f"Converter '{relevant_subclass.__name__}' can't handle source unit '{source}'"
 
         return relevant_subclass(converter_config=config)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from pandera.typing import DataFrame
+
+from icu_pipeline.schema.fhir import FHIRMedicationStatement, FHIRObservation
+from icu_pipeline.source.dtypes import to_constant, to_datetime64
+from icu_pipeline.unit.converter import BaseConverter, ConverterConfig
+
+
+class DosageConverter(BaseConverter):
+    """
+    Converts the administered amounts of a medication into rates per body weight, e.g. `mg/time` into `ug/kg/min`.
+
+    A source unit `<amount>/time` denotes an amount, which is administered over the effective period
+    of a record. The rate of a record is its amount divided by the duration of its period and by the
+    most recent body weight of the patient at the start of the period. Records before the first weight
+    of a patient use this first weight instead. Records without a duration (e.g. boluses) or without
+    any weight of the patient have no rate.
+
+    The weights of a chunk are joined to all of its records by a single as-of join, grouped by the
+    subject, such that the rates are computed column-wise for the whole chunk instead of per record.
+    The rates replace the rate quantities of the records, while their dose quantities are kept.
+    """
+
+    PERIOD = "time"
+    WEIGHT_CONCEPT = "BodyWeight"
+    REQUIRED_CONCEPTS = [WEIGHT_CONCEPT]
+
+    def __init__(self, converter_config: ConverterConfig) -> None:
+        super().__init__(converter_config)
+        for source, source_unit in self._config.source_units.items():
+            assert source_unit.endswith(
+                f"/{self.PERIOD}"
+            ), f"Converter '{type(self).__name__}' can't handle source unit '{source_unit}' of '{source}'"
+            # Raises early, if the amount per weight and time can't be converted into the sink unit
+            self.getTransform(self._get_rate_unit(source_unit), self._config.sink_unit)
+
+    @staticmethod
+    def accepts(config: ConverterConfig) -> bool:
+        """Returns whether the source units of a concept are amounts per administration period."""
+        return any(unit.endswith(f"/{DosageConverter.PERIOD}") for unit in config.source_units.values())
+
+    @staticmethod
+    def _get_rate_unit(source_unit: str) -> str:
+        # The unit of an amount divided by a weight in kg and a duration in seconds
+        return f"{source_unit.removesuffix(f'/{DosageConverter.PERIOD}')}/kg/s"
+
+    def _get_weights(self, df: pd.DataFrame, weights: pd.DataFrame) -> np.ndarray:
+        out = np.full(len(df), np.nan)
+        if weights.empty or df.empty:
+            return out
+
+        factor, _ = self.getTransform(str(weights[FHIRObservation.value_quantity__unit].iloc[0]), "kg")
+        # The references of both frames are compared as strings, since their categories differ
+        left = pd.DataFrame(
+            {
+                "subject": df[FHIRMedicationStatement.subject__reference].astype(str).to_numpy(),
+                "time": to_datetime64(df[FHIRMedicationStatement.effective_period__start]),
+                "position": np.arange(len(df)),
+            }
+        )
+        # Records without a start have no weight, the as-of join doesn't accept missing keys
+        left = left[left["time"].notna()].sort_values("time", kind="stable")
+        right = (
+            pd.DataFrame(
+                {
+                    "subject": weights[FHIRObservation.subject__reference].astype(str).to_numpy(),
+                    "time": to_datetime64(weights[FHIRObservation.effective_date_time]),
+                    "weight": weights[FHIRObservation.value_quantity__value].to_numpy() * factor,
+                }
+            )
+            .dropna()
+            .sort_values("time", kind="stable")
+        )
+
+        backward = pd.merge_asof(left, right, on="time", by="subject", direction="backward")
+        forward = pd.merge_asof(left, right, on="time", by="subject", direction="forward")
+        out[left["position"].to_numpy()] = backward["weight"].fillna(forward["weight"]).to_numpy()
+        return out
+
+    def convert(self, source_unit: str, sink_unit: str, data: dict[str, DataFrame]) -> dict[str, DataFrame]:
+        df = data[self._concept_id]
+        factor, _ = self.getTransform(self._get_rate_unit(source_unit), sink_unit)
+
+        start = df[FHIRMedicationStatement.effective_period__start]
+        duration = (df[FHIRMedicationStatement.effective_period__end] - start).dt.total_seconds().to_numpy()
+        amount = df[FHIRMedicationStatement.dosage__dose_quantity__value].to_numpy(dtype=float)
+        weight = self._get_weights(df, data[self.WEIGHT_CONCEPT])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = amount * factor / (np.where(duration > 0, duration, np.nan) * weight)
+        df[FHIRMedicationStatement.dosage__rate_quantity__value] = rate
+        df[FHIRMedicationStatement.dosage__rate_quantity__unit] = to_constant(sink_unit, df.index)
+        # The data of the sources may be a managed copy, e.g. of the multiprocessing graph
+        data[self._concept_id] = df
+        return data
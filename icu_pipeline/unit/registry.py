@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from icu_pipeline.unit.converter import BaseConverter
+
+# The SI units of the numerator and of the denominator of a unit, e.g. (("kg",), ("kg", "s")) for ug/kg/min.
+# Units of the same dimension can be converted into each other.
+Dimension = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class Unit:
+    """
+    A unit, which is converted into the SI unit of its dimension by `si = factor * value + offset`.
+
+    Attributes
+    ----------
+    dimension : Dimension
+        The SI units of the numerator and of the denominator of the unit.
+    factor : float
+        The factor that converts a value of the unit into the SI unit.
+    offset : float
+        The offset that is added after the factor, only units like °C have one.
+    """
+
+    dimension: Dimension
+    factor: float
+    offset: float = 0.0
+
+
+class UnitRegistry:
+    """
+    Process-wide index of the units of all converters.
+
+    Every converter registers the units it declares, together with its dimension, when the
+    class is defined. Thereby the registry is complete once `icu_pipeline.unit` is imported,
+    and the converter of a unit is found by a single lookup instead of searching all converters.
+
+    Compound units of registered units, like `ug/kg/min` or `mg/dl`, are parsed on first use:
+    the first term is the numerator, all terms after a `/` are denominators and terms joined by
+    `*` are multiplied. The factor of a compound unit is the product of the factors of its terms,
+    and the parsed unit is kept, such that every unit is only parsed once.
+
+    Methods
+    -------
+    register(converter):
+        Registers the units of a converter.
+    get(unit):
+        Returns the dimension, SI factor and offset of a unit.
+    get_converter(unit):
+        Returns the converter class of the dimension of a unit.
+    get_transform(source_unit, sink_unit):
+        Returns the affine transform from the source to the sink unit.
+    """
+
+    _units: dict[str, Unit] = {}
+    _converters: dict[Dimension, type[BaseConverter]] = {}
+    _transforms: dict[tuple[str, str], tuple[float, float]] = {}
+    _lock = Lock()
+
+    @staticmethod
+    def register(converter: type[BaseConverter]) -> None:
+        dimension = converter.DIMENSION or ((converter.SI_UNIT,), ())
+        with UnitRegistry._lock:
+            for name, factor in converter.FACTORS.items():
+                assert (
+                    name not in UnitRegistry._units
+                ), f"Unit '{name}' of '{converter.__name__}' is already registered."
+                UnitRegistry._units[name] = Unit(dimension, factor, converter.OFFSETS.get(name, 0.0))
+            UnitRegistry._converters[dimension] = converter
+
+    @staticmethod
+    def _parse(expression: str) -> Unit:
+        factor = 1.0
+        numerator: list[str] = []
+        denominator: list[str] = []
+        for i, term in enumerate(expression.split("/")):
+            for name in term.split("*"):
+                if name.strip() == "1":
+                    continue
+                if (unit := UnitRegistry._units.get(name.strip())) is None:
+                    raise KeyError(f"Unit '{name}' of '{expression}' is unknown.")
+                if unit.offset:
+                    raise ValueError(f"Unit '{name}' with an offset can't be part of the compound unit '{expression}'.")
+                if i == 0:
+                    factor *= unit.factor
+                    numerator += unit.dimension[0]
+                    denominator += unit.dimension[1]
+                else:
+                    factor /= unit.factor
+                    numerator += unit.dimension[1]
+                    denominator += unit.dimension[0]
+        return Unit((tuple(sorted(numerator)), tuple(sorted(denominator))), factor)
+
+    @staticmethod
+    def get(unit: str) -> Unit:
+        """
+        Returns the dimension, SI factor and offset of a unit.
+
+        Parameters
+        ----------
+        unit : str
+            A registered unit, e.g. "mmHg", or a compound of registered units, e.g. "ug/kg/min".
+
+        Returns
+        -------
+        Unit
+            The unit.
+
+        Raises
+        ------
+        KeyError
+            If the unit or a term of the compound unit is unknown.
+        """
+        if (known := UnitRegistry._units.get(unit)) is not None:
+            return known
+        parsed = UnitRegistry._parse(unit)
+        with UnitRegistry._lock:
+            return UnitRegistry._units.setdefault(unit, parsed)
+
+    @staticmethod
+    def get_converter(unit: str) -> type[BaseConverter]:
+        """
+        Returns the converter class of the dimension of a unit.
+
+        Compound units whose dimension isn't declared by a converter are converted by the
+        `BaseConverter` itself, since their transforms are completely defined by the registry.
+        """
+        from icu_pipeline.unit.converter import BaseConverter
+
+        return UnitRegistry._converters.get(UnitRegistry.get(unit).dimension, BaseConverter)
+
+    @staticmethod
+    def get_transform(source_unit: str, sink_unit: str) -> tuple[float, float]:
+        """
+        Returns the affine transform `y = factor * x + offset` from the source to the sink unit.
+
+        Parameters
+        ----------
+        source_unit : str
+            The unit of the values to be converted.
+        sink_unit : str
+            The unit the values are converted into.
+
+        Returns
+        -------
+        tuple[float, float]
+            The factor and the offset of the transform.
+
+        Raises
+        ------
+        NotImplementedError
+            If the units have different dimensions.
+        """
+        if (transform := UnitRegistry._transforms.get((source_unit, sink_unit))) is not None:
+            return transform
+
+        source, sink = UnitRegistry.get(source_unit), UnitRegistry.get(sink_unit)
+        if source.dimension != sink.dimension:
+            raise NotImplementedError(
+                f"Unit '{source_unit}' of dimension {source.dimension} can't be converted into "
+                f"'{sink_unit}' of dimension {sink.dimension}."
+            )
+        # y = (a_source * x + b_source - b_sink) / a_sink
+        transform = (source.factor / sink.factor, (source.offset - sink.offset) / sink.factor)
+        with UnitRegistry._lock:
+            return UnitRegistry._transforms.setdefault((source_unit, sink_unit), transform)
@@ -1,64 +1,8 @@
-from typing import Callable
-
-from pandera.typing import DataFrame, Series
-
-from icu_pipeline.schema.fhir import Quantity
 from icu_pipeline.unit.converter import BaseConverter
 
 
 class TemperatureConverter(BaseConverter):
-    SI_UNIT = "°K"
-    AVAILABLE_UNITS = ["°K", "°C", "°F"]
+    SI_UNIT = "K"
+    FACTORS = {"K": 1.0, "°C": 1.0, "°F": 5 / 9}
+    OFFSETS = {"°C": 273.15, "°F": 273.15 - 32 * 5 / 9}
     REQUIRED_CONCEPTS = []
-
-    def _convertToSI(
-        self,
-        source_unit: str,
-        data: Series[Quantity],  # type: ignore[type-var]
-        dependencies: dict[str, DataFrame],
-    ) -> Series:
-        convert: Callable[[float], float] = lambda v: v
-        # Data can have any Unit and will be transformed to °C
-        match source_unit:
-            # Already SI-Unit
-            case self.SI_UNIT:
-                return data
-
-            # Actual Conversions
-            case "°C":
-                convert = lambda v: v + 273.15
-
-            case "°F":
-                convert = lambda v: (v - 32) * 5 / 9 + 273.15
-
-            # Not Implemented
-            case _:
-                raise NotImplementedError
-
-        return data.apply(lambda q: Quantity(value=convert(q["value"]), unit=self.SI_UNIT)).pipe(Series)
-
-    def _convertToTarget(
-        self,
-        sink_unit: str,
-        data: Series[Quantity],  # type: ignore[type-var]
-        dependencies: dict[str, DataFrame],
-    ) -> Series:
-        convert: Callable[[float], float] = lambda v: v
-        # Data uses °C and can be transformed in to any Unit
-        match sink_unit:
-            # Already SI-Unit
-            case self.SI_UNIT:
-                return data
-
-            # Actual Conversions
-            case "°C":
-                convert = lambda v: v - 273.15
-
-            case "°F":
-                convert = lambda v: ((v - 273.15) * 9 / 5) + 32
-
-            # Not Implemented
-            case _:
-                raise NotImplementedError
-
-        return data.apply(lambda q: Quantity(value=convert(q["value"]), unit=self.SI_UNIT)).pipe(Series)
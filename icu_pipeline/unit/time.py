@@ -1,75 +1,14 @@
-from typing import Callable
-
-from pandera.typing import DataFrame, Series
-
-from icu_pipeline.schema.fhir import Quantity
 from icu_pipeline.unit.converter import BaseConverter
 
 
 class TimeConverter(BaseConverter):
     SI_UNIT = "s"
-    AVAILABLE_UNITS = [
-        "s",
-        "min",
-        "h",
-        "year",
-    ]  # year is amiguous (365, 366 days). TODO - Ignore since error is small and mimic does it anyway?
+    # year is amiguous (365, 366 days). TODO - Ignore since error is small and mimic does it anyway?
+    FACTORS = {
+        "s": 1.0,
+        "min": 60.0,
+        "h": 60.0 * 60,
+        "hour": 60.0 * 60,
+        "year": 60.0 * 60 * 24 * 365,
+    }
     # REQUIRED_CONCEPTS = ["SystolicBloodPressure"]
-
-    def _convertToSI(
-        self,
-        source_unit: str,
-        data: Series[Quantity],  # type: ignore[type-var]
-        dependencies: dict[str, DataFrame],
-    ) -> Series:
-        convert: Callable[[float], float] = lambda v: v
-        # Data can use any unit and will be transformed to Hz
-        match source_unit:
-            # Already SI-Unit
-            case self.SI_UNIT:
-                return data
-
-            # Actual Conversions
-            case "min":
-                convert = lambda v: v * 60
-
-            case "h":
-                convert = lambda v: v * 60 * 60
-
-            case "year":
-                convert = lambda v: v * 60 * 60 * 24 * 365
-
-            # Not Implemented
-            case _:
-                raise NotImplementedError
-
-        return data.apply(lambda q: Quantity(value=convert(q["value"]), unit=self.SI_UNIT)).pipe(Series)
-
-    def _convertToTarget(
-        self,
-        sink_unit: str,
-        data: Series[Quantity],  # type: ignore[type-var]
-        dependencies: dict[str, DataFrame],
-    ) -> Series:
-        convert: Callable[[float], float] = lambda v: v
-        # Data contains Hz values and can be transformed into any Unit
-        match sink_unit:
-            # Already SI-Unit
-            case self.SI_UNIT:
-                return data
-
-            # Actual Conversions
-            case "min":
-                convert = lambda v: v / 60
-
-            case "h":
-                convert = lambda v: v / 60 / 60
-
-            case "year":
-                convert = lambda v: v / 60 / 60 / 24 / 365
-
-            # Not Implemented
-            case _:
-                raise NotImplementedError
-
-        return data.apply(lambda q: Quantity(value=convert(q["value"]), unit=sink_unit)).pipe(Series)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+from pandera.errors import SchemaError
+
+from icu_pipeline.schema.fhir import FHIRObservation, to_nested
+
+
+class TestFHIRSchema:
+    def test_to_nested(self):
+        record = {
+            "code__coding__code": "364075005",
+            "code__coding__system": "snomed",
+            "value_quantity__value": 80.0,
+            "value_quantity__unit": "bpm",
+        }
+
+        assert to_nested(record) == {
+            "code": {"coding": {"code": "364075005", "system": "snomed"}},
+            "value_quantity": {"value": 80.0, "unit": "bpm"},
+        }
+
+    def test_flat_columns(self):
+        df = pd.DataFrame(
+            {
+                "code__coding__code": ["364075005"],
+                "code__coding__system": ["snomed"],
+                "subject__reference": ["1"],
+                "subject__type": ["mimiciv"],
+                "effective_date_time": pd.to_datetime(["2173-08-03 16:00"], utc=True),
+                "value_quantity__value": [float("nan")],
+                "value_quantity__unit": ["bpm"],
+            }
+        )
+        df = df.astype(
+            {c: "category" for c in df.columns if c.endswith(("code", "system", "reference", "type", "unit"))}
+        )
+
+        FHIRObservation.validate(df)
+        with pytest.raises(SchemaError):
+            FHIRObservation.validate(df.drop(columns=["value_quantity__unit"]))
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+from pandera.errors import SchemaError
+
+from conceptbase.config import ValidationMode
+from icu_pipeline.schema.fhir import FHIRObservation
+from icu_pipeline.schema.validation import SchemaValidator
+
+
+class TestSchemaValidator:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        SchemaValidator.reset()
+        yield
+        SchemaValidator.reset()
+
+    @pytest.fixture
+    def df(self):
+        df = pd.DataFrame(
+            {
+                "code__coding__code": ["364075005"] * 4,
+                "code__coding__system": ["snomed"] * 4,
+                "subject__reference": ["1", "1", "2", "2"],
+                "subject__type": ["mimiciv"] * 4,
+                "effective_date_time": pd.to_datetime(["2173-08-03 16:00"] * 4, utc=True),
+                "value_quantity__value": [80.0, 90.0, float("nan"), 70.0],
+                "value_quantity__unit": ["bpm"] * 4,
+            }
+        )
+        return df.astype(
+            {c: "category" for c in df.columns if c.endswith(("code", "system", "reference", "type", "unit"))}
+        )
+
+    @pytest.fixture
+    def invalid_df(self, df: pd.DataFrame):
+        # A non-nullable column with a missing value in a single row
+        return df.assign(effective_date_time=df["effective_date_time"].where(df.index != 3))
+
+    def test_full(self, df: pd.DataFrame, invalid_df: pd.DataFrame):
+        validator = SchemaValidator(ValidationMode.FULL)
+
+        assert validator.validate(df, FHIRObservation) is df
+        with pytest.raises(SchemaError):
+            validator.validate(invalid_df, FHIRObservation)
+
+        statistics = SchemaValidator.get_statistics()["FHIRObservation"]
+        assert (statistics.frames, statistics.skipped, statistics.rows) == (2, 0, 8)
+        assert statistics.time > 0
+
+    def test_sample(self, df: pd.DataFrame, invalid_df: pd.DataFrame):
+        validator = SchemaValidator(ValidationMode.SAMPLE, sample_size=2)
+
+        validator.validate(df, FHIRObservation)
+        # The invalid row is only found if it's part of the sample
+        with pytest.raises(SchemaError):
+            SchemaValidator(ValidationMode.SAMPLE, sample_size=4).validate(invalid_df, FHIRObservation)
+
+        assert SchemaValidator.get_statistics()["FHIRObservation"].rows == 6
+
+    def test_first(self, df: pd.DataFrame, invalid_df: pd.DataFrame):
+        validator = SchemaValidator(ValidationMode.FIRST)
+
+        validator.validate(df, FHIRObservation, "HeartRate")
+
+        # The first frame of a concept is shared by all validators, e.g. of the mappers of several sources
+        assert SchemaValidator(ValidationMode.FIRST).validate(invalid_df, FHIRObservation, "HeartRate") is invalid_df
+        with pytest.raises(SchemaError):
+            validator.validate(invalid_df, FHIRObservation, "BodyTemperature")
+        statistics = SchemaValidator.get_statistics()["FHIRObservation"]
+        assert (statistics.frames, statistics.skipped) == (2, 1)
+
+    def test_schema(self, df: pd.DataFrame, invalid_df: pd.DataFrame):
+        validator = SchemaValidator(ValidationMode.SCHEMA)
+
+        validator.validate(invalid_df, FHIRObservation)
+        with pytest.raises(SchemaError):
+            validator.validate(df.drop(columns=["value_quantity__unit"]), FHIRObservation)
+
+        assert SchemaValidator.get_statistics()["FHIRObservation"].rows == 0
+
+    def test_off(self, invalid_df: pd.DataFrame):
+        validator = SchemaValidator(ValidationMode.OFF)
+
+        assert validator.validate(invalid_df.drop(columns=["value_quantity__unit"]), FHIRObservation) is not None
+        assert SchemaValidator.get_statistics()["FHIRObservation"].skipped == 1
+
+    def test_merge(self, df: pd.DataFrame):
+        SchemaValidator(ValidationMode.FULL).validate(df, FHIRObservation)
+        statistics = SchemaValidator.get_statistics()
+
+        # The counters of another process are added to the counters of this process
+        SchemaValidator.merge(statistics)
+
+        merged = SchemaValidator.get_statistics()["FHIRObservation"]
+        assert (merged.frames, merged.rows) == (2, 8)
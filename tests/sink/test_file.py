@@ -1,10 +1,11 @@
+import json
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
 
-from icu_pipeline.sink.file import CSVFileSinkMapper, JSONLFileSinkMapper
+from icu_pipeline.sink.file import CSVFileSinkMapper, JSONLFileSinkMapper, ParquetFileSinkMapper
 
 
 class TestCSVFileSinkMapper:
@@ -24,15 +25,67 @@ class TestCSVFileSinkMapper:
         mapper = CSVFileSinkMapper(Path("."))
         result = mapper.to_output_format(mock_df_generator, mock_concept)
 
-        # assert result["total_rows"] == 3 # TODO fix this
+        assert result["total_rows"] == 3
         mock_to_csv.assert_called()
 
+    def test_to_output_format_batches(self, tmp_path, mock_concept):
+        batches = [
+            pd.DataFrame({"value_quantity__value": [1.0, 2.0], "value_quantity__unit": ["bpm", "bpm"]}),
+            # Streamed batches don't necessarily start at index 0
+            pd.DataFrame({"value_quantity__value": [3.0], "value_quantity__unit": ["bpm"]}, index=[2]),
+            pd.DataFrame({"value_quantity__value": [], "value_quantity__unit": []}),
+        ]
+        mapper = CSVFileSinkMapper(tmp_path)
+        result = mapper.to_output_format((df for df in batches), mock_concept)
+
+        assert result["total_rows"] == 3
+        df = pd.read_csv(tmp_path / "TestConcept.csv")
+        assert df["value_quantity__value"].tolist() == [1.0, 2.0, 3.0]
+
 
 class TestJSONLFileSinkMapper:
-    @patch("pandas.DataFrame.to_json")
-    def test_to_output_format(self, mock_to_json):
-        mapper = JSONLFileSinkMapper(Path("."))
-        df = pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6]})
+    def test_to_output_format(self, tmp_path):
+        mock_concept = Mock()
+        mock_concept._concept_config.name = "TestConcept"
+        batches = [
+            pd.DataFrame(
+                {
+                    "effective_date_time": pd.to_datetime(["2173-08-03 16:00"], utc=True),
+                    "value_quantity__value": [80.0],
+                    "value_quantity__unit": ["bpm"],
+                }
+            ),
+            pd.DataFrame({"effective_date_time": [], "value_quantity__value": [], "value_quantity__unit": []}),
+        ]
+        mapper = JSONLFileSinkMapper(tmp_path)
+        result = mapper.to_output_format((df for df in batches), mock_concept)
+
+        assert result["total_rows"] == 1
+        record = json.loads((tmp_path / "TestConcept.jsonl").read_text())
+        assert record == {
+            "effective_date_time": "2173-08-03T16:00:00.000Z",
+            "value_quantity": {"value": 80.0, "unit": "bpm"},
+        }
+
+
+class TestParquetFileSinkMapper:
+    def test_to_output_format(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        mock_concept = Mock()
+        mock_concept._concept_config.name = "TestConcept"
+        batches = [
+            pd.DataFrame({"value_quantity__value": [1.0, 2.0], "value_quantity__unit": ["bpm", "bpm"]}),
+            pd.DataFrame({"value_quantity__value": [], "value_quantity__unit": []}),
+            # The categories differ between the batches
+            pd.DataFrame({"value_quantity__value": [3.0], "value_quantity__unit": ["1/min"]}),
+        ]
+        batches = [df.astype({"value_quantity__value": float, "value_quantity__unit": "category"}) for df in batches]
+        mapper = ParquetFileSinkMapper(tmp_path)
+
+        result = mapper.to_output_format((df for df in batches), mock_concept)
+        mapper.to_output_format((df for df in batches[:1]), mock_concept)
 
-        with pytest.raises(NotImplementedError):
-            mapper._to_output_format(df, None)
+        assert result["total_rows"] == 3
+        df = pd.read_parquet(tmp_path / "TestConcept.parquet")
+        assert df["value_quantity__unit"].dtype == "category"
+        assert sorted(df["value_quantity__unit"].tolist()) == ["1/min", "bpm", "bpm", "bpm", "bpm"]
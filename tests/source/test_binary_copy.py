@@ -0,0 +1,82 @@
+import struct
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from icu_pipeline.source.database import BinaryCopyReader
+from icu_pipeline.source.database.binary_copy import BINARY_TYPES, SIGNATURE, TRAILER
+
+
+def create_stream(rows: list[list[bytes | None]]) -> bytes:
+    data = SIGNATURE + struct.pack(">ii", 0, 0)
+    for row in rows:
+        data += struct.pack(">h", len(row))
+        for value in row:
+            if value is None:
+                data += struct.pack(">i", -1)
+            else:
+                data += struct.pack(">i", len(value)) + value
+    return data + TRAILER
+
+
+def create_connection(columns: list[tuple[str, int]], stream: bytes) -> MagicMock:
+    cursor = MagicMock()
+    cursor.description = [SimpleNamespace(name=name, type_code=type_code) for name, type_code in columns]
+    cursor.copy.return_value.__enter__.return_value = [stream[:10], stream[10:]]
+    connection = MagicMock()
+    connection.connection.cursor.return_value = cursor
+    return connection
+
+
+class TestBinaryCopyReader:
+    @pytest.fixture
+    def columns(self):
+        return [("patient_id", 23), ("timestamp", 1114), ("value", 701)]
+
+    @pytest.fixture
+    def timestamp(self):
+        # 2000-01-02 00:00:00 in microseconds since 2000-01-01
+        return struct.pack(">q", 86_400_000_000)
+
+    def test_build_copy(self, columns: list[tuple[str, int]]):
+        copy = BinaryCopyReader._build_copy(
+            "SELECT * FROM t", [(name, BINARY_TYPES[type_code]) for name, type_code in columns]
+        ).as_string(None)
+
+        assert copy.startswith('COPY (SELECT q."patient_id" AS "patient_id", ')
+        assert 'COALESCE(q."timestamp", \'-infinity\') AS "timestamp"' in copy
+        assert 'COALESCE(q."value", \'NaN\') AS "value"' in copy
+        assert copy.endswith("FROM (SELECT * FROM t) AS q) TO STDOUT (FORMAT BINARY)")
+
+    def test_read(self, columns: list[tuple[str, int]], timestamp: bytes):
+        stream = create_stream(
+            [
+                [struct.pack(">i", 1), timestamp, struct.pack(">d", 80.0)],
+                [struct.pack(">i", 2), struct.pack(">q", np.iinfo(np.int64).min), struct.pack(">d", float("nan"))],
+            ]
+        )
+        df = BinaryCopyReader().read(create_connection(columns, stream), "SELECT * FROM t", None)
+
+        assert df is not None
+        assert df["patient_id"].tolist() == [1, 2]
+        assert df["patient_id"].dtype == np.int64
+        assert df["timestamp"].iloc[0] == pd.Timestamp("2000-01-02")
+        assert pd.isna(df["timestamp"].iloc[1])
+        assert df["value"].iloc[0] == 80.0
+        assert pd.isna(df["value"].iloc[1])
+
+    def test_read_null_integer(self, columns: list[tuple[str, int]], timestamp: bytes):
+        stream = create_stream([[None, timestamp, struct.pack(">d", 80.0)]])
+
+        assert BinaryCopyReader().read(create_connection(columns, stream), "SELECT * FROM t", None) is None
+
+    def test_read_text_column(self):
+        reader = BinaryCopyReader()
+        connection = create_connection([("patient_id", 23), ("gender", 25)], b"")
+
+        assert reader.read(connection, "SELECT * FROM t", None) is None
+        assert reader._columns["SELECT * FROM t"] is None
+        connection.connection.cursor.return_value.copy.assert_not_called()
@@ -0,0 +1,120 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource, SourceConfig
+from icu_pipeline.source.cache import QueryCache
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "patient_id": [1, 1, 2],
+            "timestamp": pd.to_datetime(["2173-08-03 16:00", "2173-08-03 17:00", "2173-08-03 16:00"]),
+            "value": [80.0, 81.0, 90.0],
+        }
+    )
+
+
+class TestQueryCache:
+    @pytest.fixture
+    def cache(self, tmp_path: Path):
+        return QueryCache(tmp_path)
+
+    def test_put_get(self, cache: QueryCache, df: pd.DataFrame):
+        assert cache.get("HeartRate", "key") is None
+
+        cache.put("HeartRate", "key", df)
+
+        pd.testing.assert_frame_equal(cache.get("HeartRate", "key"), df)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_put_batches(self, cache: QueryCache, df: pd.DataFrame):
+        batches = [df.iloc[:2], df.iloc[2:].reset_index(drop=True)]
+
+        assert list(cache.put_batches("HeartRate", "key", batches)) == batches
+
+        assert [len(b) for b in cache.get_batches("HeartRate", "key")] == [2, 1]
+
+    def test_incomplete_batches(self, cache: QueryCache, df: pd.DataFrame):
+        batches = cache.put_batches("HeartRate", "key", [df, df])
+        next(batches)
+        batches.close()
+
+        assert cache.get("HeartRate", "key") is None
+
+    def test_evict_least_recently_used(self, tmp_path: Path, df: pd.DataFrame):
+        cache = QueryCache(tmp_path)
+        for i, key in enumerate(["a", "b"]):
+            cache.put("HeartRate", key, df)
+            os.utime(cache._get_path("HeartRate", key), (i, i))
+        cache.get("HeartRate", "a")
+
+        entry_size = cache._get_path("HeartRate", "a").stat().st_size
+        cache._max_size = 2 * entry_size
+        cache.put("HeartRate", "c", df)
+
+        assert cache.get("HeartRate", "a") is not None
+        assert cache.get("HeartRate", "b") is None
+        assert cache.get("HeartRate", "c") is not None
+
+    def test_invalidate(self, cache: QueryCache, df: pd.DataFrame):
+        cache.put("HeartRate", "key", df)
+        cache.put("BodyTemperature", "key", df)
+
+        cache.invalidate("HeartRate")
+
+        assert cache.get("HeartRate", "key") is None
+        assert cache.get("BodyTemperature", "key") is not None
+
+    def test_fingerprint(self):
+        subjects = pd.DataFrame({"subject_id": [1, 2]})
+
+        assert QueryCache.fingerprint("query", subjects=subjects) == QueryCache.fingerprint("query", subjects=subjects)
+        assert QueryCache.fingerprint("query", subjects=subjects) != QueryCache.fingerprint(
+            "query", subjects=subjects[:1]
+        )
+        assert QueryCache.fingerprint("query", subjects=subjects) != QueryCache.fingerprint("other", subjects=subjects)
+
+
+class TestMapperCache:
+    @pytest.fixture
+    def mapper(self, tmp_path: Path):
+        return MimicObservationMapper(
+            schema="mimiciv_icu",
+            table="chartevents",
+            constraints={"itemid": "220045"},
+            concept_id="HeartRate",
+            concept_type="snomed",
+            source_config=SourceConfig(connection="", cache_dir=str(tmp_path)),
+            unit="bpm",
+        )
+
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+
+    def test_get_data(self, mapper: MimicObservationMapper, job: Job, df: pd.DataFrame):
+        with patch.object(MimicObservationMapper, "read_query", return_value=df) as read_query:
+            cold = mapper.get_data(job)
+            warm = mapper.get_data(job)
+
+        read_query.assert_called_once()
+        pd.testing.assert_frame_equal(cold, warm)
+
+    def test_get_data_of_other_subjects(self, mapper: MimicObservationMapper, job: Job, df: pd.DataFrame):
+        other_job = Job(jobID="other", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [3]}))
+
+        with patch.object(MimicObservationMapper, "read_query", return_value=df) as read_query:
+            mapper.get_data(job)
+            mapper.get_data(other_job)
+
+        assert read_query.call_count == 2
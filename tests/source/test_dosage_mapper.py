@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import Timestamp
+
+from icu_pipeline.schema.fhir import FHIRMedicationStatement
+from icu_pipeline.source import SourceConfig
+from icu_pipeline.source.mimiciv import MimicDosageMapper
+
+
+class TestDosageMapper:
+    @pytest.fixture
+    def mapper(self):
+        return MimicDosageMapper(
+            schema="mimiciv_icu",
+            table="inputevents",
+            constraints={"itemid": "221906"},
+            concept_id="Norepinephrine_dosage",
+            concept_type="snomed",
+            source_config=SourceConfig(connection=""),
+            unit="mg",
+        )
+
+    def test_query_fields(self, mapper: MimicDosageMapper):
+        assert mapper._query_args["fields"] == {
+            "patient_id": "subject_id",
+            "timestamp": "starttime",
+            "end_timestamp": "endtime",
+            "value": "amount",
+            "rate": "rate",
+            "rate_unit": "rateuom",
+        }
+
+    def test_to_fihr(self, mapper: MimicDosageMapper):
+        df = pd.DataFrame(
+            {
+                "patient_id": [1234, 1234],
+                "timestamp": [Timestamp("2173-08-03 16:00:00"), Timestamp("2173-08-03 18:00:00")],
+                "end_timestamp": [Timestamp("2173-08-03 17:30:00"), None],
+                "value": [0.45, 2.0],
+                "rate": [0.05, None],
+                "rate_unit": ["mcg/kg/min", None],
+            }
+        )
+
+        medication_df = mapper._to_fihr(mapper.apply_dtypes(df))
+        FHIRMedicationStatement.validate(medication_df)
+
+        # A continuous infusion
+        assert medication_df[FHIRMedicationStatement.effective_period__start][0] == Timestamp(
+            "2173-08-03 16:00", tz="UTC"
+        )
+        assert medication_df[FHIRMedicationStatement.effective_period__end][0] == Timestamp(
+            "2173-08-03 17:30", tz="UTC"
+        )
+        assert medication_df[FHIRMedicationStatement.dosage__dose_quantity__value][0] == 0.45
+        assert medication_df[FHIRMedicationStatement.dosage__dose_quantity__unit][0] == "mg"
+        assert medication_df[FHIRMedicationStatement.dosage__rate_quantity__value][0] == 0.05
+        assert medication_df[FHIRMedicationStatement.dosage__rate_quantity__unit][0] == "mcg/kg/min"
+        assert medication_df[FHIRMedicationStatement.medication__concept__coding__code][0] == "Norepinephrine_dosage"
+
+        # A bolus without an end and a rate
+        assert medication_df[FHIRMedicationStatement.effective_period__end][1] == Timestamp(
+            "2173-08-03 18:00", tz="UTC"
+        )
+        assert np.isnan(medication_df[FHIRMedicationStatement.dosage__rate_quantity__value][1])
+        assert pd.isna(medication_df[FHIRMedicationStatement.dosage__rate_quantity__unit][1])
@@ -0,0 +1,216 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conceptbase.config import DtypeBackend
+from icu_pipeline.job import Job
+from icu_pipeline.schema.fhir import FHIRObservation
+from icu_pipeline.schema.validation import SchemaValidator
+from icu_pipeline.source import DataSource, SourceConfig
+from icu_pipeline.source.dtypes import (
+    FieldType,
+    apply_dtypes,
+    coerce_numeric,
+    map_unique,
+    to_categorical,
+    to_constant,
+    to_datetime64,
+    to_float,
+    to_numeric,
+    to_objects,
+    to_utc,
+)
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+FIELD_TYPES = {
+    "patient_id": FieldType.INTEGER,
+    "timestamp": FieldType.DATETIME,
+    "value": FieldType.FLOAT,
+}
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "patient_id": [1, 2],
+            "timestamp": ["2173-08-03 16:00:00", "2173-08-03 17:00:00"],
+            "value": pd.Series([80.0, None], dtype=object),
+            "unit": ["bpm", "bpm"],
+        }
+    )
+
+
+class TestApplyDtypes:
+    def test_numpy(self, df: pd.DataFrame):
+        typed_df = apply_dtypes(df, FIELD_TYPES, DtypeBackend.NUMPY)
+
+        assert typed_df["patient_id"].dtype == np.int64
+        assert typed_df["timestamp"].dtype == "datetime64[ns]"
+        assert typed_df["value"].dtype == np.float64
+        assert typed_df["unit"].dtype == object
+
+    def test_pyarrow(self, df: pd.DataFrame):
+        pytest.importorskip("pyarrow")
+        typed_df = apply_dtypes(df, FIELD_TYPES, DtypeBackend.PYARROW)
+
+        assert str(typed_df["patient_id"].dtype) == "int64[pyarrow]"
+        assert str(typed_df["timestamp"].dtype) == "timestamp[ns][pyarrow]"
+        assert str(typed_df["value"].dtype) == "double[pyarrow]"
+        assert typed_df["unit"].dtype == object
+
+        # The conversions keep the Arrow dtypes
+        assert str(to_float(typed_df["value"]).dtype) == "double[pyarrow]"
+        assert to_float(typed_df["value"]).isna()[1]
+        assert str(to_utc(typed_df["timestamp"]).dtype) == "timestamp[ns, tz=UTC][pyarrow]"
+        assert to_datetime64(to_utc(typed_df["timestamp"])).dtype == "datetime64[ns]"
+        assert to_objects(typed_df["value"]).tolist() == [80.0, None]
+
+    def test_typed_frame_is_not_copied(self, df: pd.DataFrame):
+        typed_df = apply_dtypes(df, FIELD_TYPES, DtypeBackend.NUMPY)
+
+        assert apply_dtypes(typed_df, FIELD_TYPES, DtypeBackend.NUMPY) is typed_df
+
+    def test_coerce_numeric(self, df: pd.DataFrame):
+        df["value"] = ["80", "n/a"]
+
+        numeric_df, rejected = coerce_numeric(df, FIELD_TYPES)
+
+        assert numeric_df["value"].dtype == "float64"
+        assert np.isnan(numeric_df["value"][1])
+        assert rejected == 1
+        assert apply_dtypes(df, FIELD_TYPES, DtypeBackend.NUMPY)["value"].tolist()[0] == 80.0
+
+
+class TestConversions:
+    def test_to_numeric(self):
+        values, rejected = to_numeric(pd.Series(["80", "n/a", None, "90.5"], dtype=object))
+
+        assert values.dtype == np.float64
+        assert values[[0, 3]].tolist() == [80.0, 90.5]
+        assert rejected == 1
+
+    def test_map_unique(self):
+        objects = map_unique(pd.Series([1, 2, 1], index=[5, 6, 7]), lambda value: {"value": value})
+
+        assert objects.tolist() == [{"value": 1}, {"value": 2}, {"value": 1}]
+        assert objects.index.tolist() == [5, 6, 7]
+        assert objects[5] is objects[7]
+
+    def test_to_categorical(self):
+        references = to_categorical(pd.Series([1234, 42, 1234, None], dtype="Int64"))
+
+        assert references.dtype == "category"
+        assert references.cat.categories.tolist() == ["1234", "42"]
+        assert references[:3].tolist() == ["1234", "42", "1234"]
+        assert pd.isna(references[3])
+
+    def test_to_constant(self):
+        units = to_constant("bpm", pd.Index([3, 4]))
+
+        assert units.cat.categories.tolist() == ["bpm"]
+        assert units.to_dict() == {3: "bpm", 4: "bpm"}
+
+    def test_to_datetime64(self):
+        timestamps = pd.Series(pd.to_datetime(["2173-08-03 16:00+02:00", None], utc=True))
+
+        values = to_datetime64(timestamps)
+
+        assert values.dtype == "datetime64[ns]"
+        assert values[0] == np.datetime64("2173-08-03T14:00")
+        assert np.isnat(values[1])
+
+
+class TestMapperDtypes:
+    @pytest.mark.parametrize("dtype_backend", list(DtypeBackend))
+    def test_to_fihr(self, df: pd.DataFrame, dtype_backend: DtypeBackend):
+        if dtype_backend == DtypeBackend.PYARROW:
+            pytest.importorskip("pyarrow")
+        mapper = MimicObservationMapper(
+            schema="mimiciv_icu",
+            table="chartevents",
+            constraints={"itemid": "220045"},
+            concept_id="364075005",
+            concept_type="snomed",
+            source_config=SourceConfig(connection="", dtype_backend=dtype_backend),
+            unit="bpm",
+        )
+
+        observation_df = mapper._to_fihr(mapper.apply_dtypes(df))
+        SchemaValidator().validate(observation_df, FHIRObservation)
+
+        expected = {
+            DtypeBackend.NUMPY: ("datetime64[ns, UTC]", "float64"),
+            DtypeBackend.PYARROW: ("timestamp[ns, tz=UTC][pyarrow]", "double[pyarrow]"),
+        }
+        assert str(observation_df[FHIRObservation.effective_date_time].dtype) == expected[dtype_backend][0]
+        assert str(observation_df[FHIRObservation.value_quantity__value].dtype) == expected[dtype_backend][1]
+        assert observation_df[FHIRObservation.subject__reference].dtype == "category"
+        assert observation_df[FHIRObservation.value_quantity__unit].dtype == "category"
+        assert observation_df[FHIRObservation.value_quantity__value][0] == 80.0
+        assert pd.isna(observation_df[FHIRObservation.value_quantity__value][1])
+
+    def test_string_value(self):
+        mapper = MimicObservationMapper(
+            schema="mimiciv_hosp",
+            table="patients",
+            constraints={},
+            fields={"value": "gender"},
+            concept_id="263495000",
+            concept_type="snomed",
+            source_config=SourceConfig(connection=""),
+            unit="",
+        )
+
+        assert mapper._field_types["value"] == FieldType.STRING
+
+        df = pd.DataFrame({"patient_id": [1, 2, 3], "timestamp": ["2173-08-03"] * 3, "value": ["M", "F", None]})
+        observation_df = mapper._to_fihr(mapper.apply_dtypes(df))
+
+        assert observation_df[FHIRObservation.value_quantity__value].tolist() == [1.0, 0.0, 2.0]
+
+    def test_rejected_values(self, df: pd.DataFrame):
+        mapper = MimicObservationMapper(
+            schema="mimiciv_icu",
+            table="chartevents",
+            constraints={"itemid": "220045"},
+            fields={"value": "value"},
+            concept_id="364075005",
+            concept_type="snomed",
+            source_config=SourceConfig(connection=""),
+            unit="bpm",
+        )
+        df["value"] = ["80", "n/a"]
+
+        observation_df = mapper._to_fihr(df)
+
+        assert observation_df[FHIRObservation.value_quantity__value][0] == 80.0
+        assert np.isnan(observation_df[FHIRObservation.value_quantity__value][1])
+        assert mapper._rejected_rows == 1
+
+    @pytest.mark.parametrize("dtype_backend", list(DtypeBackend))
+    def test_rejected_values_get_data(self, df: pd.DataFrame, dtype_backend: DtypeBackend):
+        if dtype_backend == DtypeBackend.PYARROW:
+            pytest.importorskip("pyarrow")
+        mapper = MimicObservationMapper(
+            schema="mimiciv_icu",
+            table="chartevents",
+            constraints={"itemid": "220045"},
+            fields={"value": "value"},
+            concept_id="364075005",
+            concept_type="snomed",
+            source_config=SourceConfig(connection="", dtype_backend=dtype_backend),
+            unit="bpm",
+        )
+        job = Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+        df["value"] = ["80", "n/a"]
+
+        # The text values are typed before the conversion to FHIR
+        with patch.object(MimicObservationMapper, "read_query", return_value=df):
+            observation_df = mapper.get_data(job)
+
+        assert observation_df[FHIRObservation.value_quantity__value][0] == 80.0
+        assert pd.isna(observation_df[FHIRObservation.value_quantity__value][1])
+        assert mapper._rejected_rows == 1
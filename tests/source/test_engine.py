@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+
+from icu_pipeline.source import SourceConfig
+from icu_pipeline.source.database import EngineRegistry
+
+
+class TestEngineRegistry:
+    @pytest.fixture
+    def source_config(self, tmp_path):
+        yield SourceConfig(connection=f"sqlite:///{tmp_path / 'test.sqlite'}", pool_size=2)
+        EngineRegistry.dispose()
+
+    def test_engine_is_shared(self, source_config: SourceConfig):
+        engine = EngineRegistry.get_engine(source_config)
+        assert EngineRegistry.get_engine(source_config) is engine
+        # Equal configurations share the engine as well
+        assert EngineRegistry.get_engine(SourceConfig(**vars(source_config))) is engine
+
+    def test_pool_settings_create_new_engine(self, source_config: SourceConfig):
+        engine = EngineRegistry.get_engine(source_config)
+        other_config = SourceConfig(connection=source_config.connection, pool_size=3)
+        assert EngineRegistry.get_engine(other_config) is not engine
+
+    def test_statistics(self, source_config: SourceConfig):
+        for _ in range(3):
+            with EngineRegistry.connect(source_config) as con:
+                con.execute(text("SELECT 1"))
+
+        statistics = EngineRegistry.get_statistics(source_config)
+        assert statistics.misses == 1
+        assert statistics.hits == 2
+        assert statistics.checkouts == 3
+        assert statistics.wait_time > 0
+
+    def test_dispose(self, source_config: SourceConfig):
+        engine = EngineRegistry.get_engine(source_config)
+        EngineRegistry.dispose()
+        assert EngineRegistry.get_engine(source_config) is not engine
+        assert EngineRegistry.get_statistics(source_config).checkouts == 0
@@ -0,0 +1,186 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conceptbase.config import SamplingStrategy, SourceBackend
+from icu_pipeline.filter import LimitFilter
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource, SourceConfig, getBackendMapper, getDataSampler
+from icu_pipeline.source.eicu import EICUObservationMapper
+from icu_pipeline.source.file import FileSource, FileSourceMapper, FileSourceSampler
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def directory(tmp_path: Path):
+    (tmp_path / "mimiciv_icu").mkdir()
+    pd.DataFrame(
+        {
+            "subject_id": [1, 1, 2, 2, 3],
+            "charttime": pd.to_datetime(["2173-08-03 16:00"] * 5),
+            "itemid": [220045, 220050, 220045, 220045, 220045],
+            "valuenum": [80.0, 120.0, 90.0, 91.0, 70.0],
+        }
+    ).to_parquet(tmp_path / "mimiciv_icu" / "chartevents.parquet", row_group_size=2)
+    pd.DataFrame({"subject_id": [3, 1, 2, 1], "los": [1.0, 2.0, 0.5, 1.0]}).to_parquet(
+        tmp_path / "mimiciv_icu" / "icustays.parquet"
+    )
+    # The flat layout and the names of the eICU CSV exports
+    pd.DataFrame({"patientunitstayid": [10, 11], "observationoffset": [5, 15], "heartrate": [75.0, None]}).to_csv(
+        tmp_path / "vitalPeriodic.csv.gz", index=False
+    )
+    pd.DataFrame(
+        {
+            "patientunitstayid": [10, 11],
+            "patienthealthsystemstayid": [100, 101],
+            "hospitaladmittime24": ["08:00:00", "09:00:00"],
+            "hospitaldischargeyear": [2014, 2015],
+        }
+    ).to_csv(tmp_path / "patient.csv.gz", index=False)
+    return tmp_path
+
+
+class TestFileSource:
+    def test_for_config(self, directory: Path):
+        source_config = SourceConfig(connection=str(directory), backend=SourceBackend.FILE)
+
+        assert FileSource.for_config(source_config)._directory == directory
+        assert FileSource.for_config(source_config) is FileSource.for_config(source_config)
+
+    def test_read(self, directory: Path):
+        df = FileSource(directory).read(
+            schema="mimiciv_icu",
+            table="chartevents",
+            fields={"patient_id": "subject_id", "value": "valuenum"},
+            constraints={"itemid": "220045"},
+            ids=pd.DataFrame({"subject_id": [2, 3]}),
+        )
+
+        assert df.columns.tolist() == ["patient_id", "value"]
+        assert df["value"].tolist() == [90.0, 91.0, 70.0]
+
+    def test_read_transforms(self, directory: Path):
+        df = FileSource(directory).read(
+            schema="mimiciv_icu",
+            table="chartevents",
+            fields={"patient_id": "subject_id", "value": "valuenum"},
+            constraints={"itemid": "220045"},
+            ids=pd.DataFrame({"subject_id": [1]}),
+            transforms={"value": (1 / 60, 0.0)},
+        )
+
+        assert df["value"].tolist() == pytest.approx([80.0 / 60])
+
+    def test_read_limits(self, directory: Path):
+        df = FileSource(directory).read(
+            schema="mimiciv_icu",
+            table="chartevents",
+            fields={"patient_id": "subject_id", "value": "valuenum"},
+            constraints={"itemid": "220045"},
+            ids=pd.DataFrame({"subject_id": [1, 2, 3]}),
+            limits={"value": (75.0, 90.5)},
+        )
+
+        assert df.to_dict("list") == {"patient_id": [1, 2], "value": [80.0, 90.0]}
+
+    def test_read_join(self, directory: Path):
+        df = FileSource(directory).read(
+            schema="eicu_crd",
+            table="vitalperiodic",
+            fields={"patient_id": "patienthealthsystemstayid", "offset": "observationoffset", "value": "heartrate"},
+            constraints={"heartrate": "not null"},
+            ids=pd.DataFrame({"patienthealthsystemstayid": [100, 101]}),
+            joins={
+                "eicu_crd.patient": {"eicu_crd.vitalperiodic.patientunitstayid": "eicu_crd.patient.patientunitstayid"}
+            },
+        )
+
+        assert df.to_dict("list") == {"patient_id": [100], "offset": [5], "value": [75.0]}
+
+    def test_read_subjects(self, directory: Path):
+        df = FileSource(directory).read_subjects("mimiciv_icu", "icustays", ["subject_id"], "los")
+
+        assert df.to_dict("list") == {"subject_id": [1, 2, 3], "weight": [3.0, 0.5, 1.0]}
+
+
+class TestFileMappers:
+    @pytest.fixture
+    def source_config(self, directory: Path):
+        return SourceConfig(connection=str(directory), backend=SourceBackend.FILE, chunksize=2)
+
+    def test_get_samples(self, source_config: SourceConfig):
+        sampler = getDataSampler(DataSource.MIMICIV, source_config)
+        samples = list(sampler.get_samples())
+
+        assert isinstance(sampler, FileSourceSampler)
+        assert [s["subject_id"].tolist() for s in samples] == [[1, 2], [3]]
+
+    def test_get_weighted_samples(self, source_config: SourceConfig):
+        source_config.sampling = SamplingStrategy.WEIGHTED
+        samples = list(getDataSampler(DataSource.MIMICIV, source_config).get_samples())
+
+        assert [s["subject_id"].tolist() for s in samples] == [[1], [2, 3]]
+
+    def test_get_data(self, source_config: SourceConfig):
+        mapper = getBackendMapper(
+            EICUObservationMapper(
+                schema="eicu_crd",
+                table="vitalperiodic",
+                fields={"value": "heartrate"},
+                concept_id="HeartRate",
+                concept_type="snomed",
+                source_config=source_config,
+                unit="bpm",
+            ),
+            source_config,
+        )
+        job = Job(jobID="test", database=DataSource.EICU, subjects=pd.DataFrame({"patienthealthsystemstayid": [100]}))
+
+        df = mapper.get_data(job)
+
+        assert isinstance(mapper, FileSourceMapper)
+        assert df["value_quantity__value"].iloc[0] == 75.0
+        assert str(df["effective_date_time"].iloc[0]) == "2014-01-01 08:05:00+00:00"
+
+    def test_get_data_limits(self, source_config: SourceConfig):
+        mapper = FileSourceMapper(
+            MimicObservationMapper(
+                schema="mimiciv_icu",
+                table="chartevents",
+                constraints={"itemid": "220045"},
+                concept_id="HeartRate",
+                concept_type="snomed",
+                source_config=source_config,
+                unit="bpm",
+            )
+        )
+        mapper.push_limits(75.0, 90.0)
+        job = Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2, 3]}))
+
+        LimitFilter.reset()
+        df = mapper.get_data(job)
+        statistics = LimitFilter.get_statistics()["HeartRate"]
+        LimitFilter.reset()
+
+        assert sorted(df["value_quantity__value"]) == [80.0, 90.0]
+        assert (statistics.rows, statistics.dropped) == (4, 2)
+
+    def test_get_batches(self, source_config: SourceConfig):
+        source_config.fetch_size = 1
+        mapper = FileSourceMapper(
+            MimicObservationMapper(
+                schema="mimiciv_icu",
+                table="chartevents",
+                constraints={"itemid": "220045"},
+                concept_id="HeartRate",
+                concept_type="snomed",
+                source_config=source_config,
+                unit="bpm",
+            )
+        )
+        job = Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+
+        assert [len(df) for df in mapper.get_batches(job)] == [3]
@@ -0,0 +1,197 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource, SourceConfig
+from icu_pipeline.source.database import FusedColumnQuery, FusedRowQuery, fuse_mappers
+from icu_pipeline.source.eicu import EICUObservationMapper
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+
+def create_mapper(concept_id: str, itemid: str | list[str], table: str = "chartevents") -> MimicObservationMapper:
+    return MimicObservationMapper(
+        schema="mimiciv_icu",
+        table=table,
+        constraints={"itemid": itemid},
+        concept_id=concept_id,
+        concept_type="snomed",
+        source_config=SourceConfig(connection=""),
+        unit="bpm",
+    )
+
+
+def create_eicu_mapper(concept_id: str, column: str, table: str = "vitalperiodic") -> EICUObservationMapper:
+    return EICUObservationMapper(
+        schema="eicu_crd",
+        table=table,
+        fields={"value": column},
+        concept_id=concept_id,
+        concept_type="snomed",
+        source_config=SourceConfig(connection=""),
+        unit="bpm",
+    )
+
+
+class TestFusedRowQuery:
+    @pytest.fixture
+    def mappers(self):
+        return [
+            create_mapper("HeartRate", "220045"),
+            create_mapper("SystolicBloodPressure", ["220050", "220179"]),
+            create_mapper("SystolicBloodPressure_Arterial_Invasive", "220050"),
+            create_mapper("UrineVolume", "226559", table="outputevents"),
+        ]
+
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+
+    def test_fuse_mappers(self, mappers: list[MimicObservationMapper]):
+        fused_queries = fuse_mappers(mappers)
+
+        assert len(fused_queries) == 1
+        assert isinstance(fused_queries[0], FusedRowQuery)
+        assert all(m._fusion is fused_queries[0] for m in mappers[:3])
+        assert mappers[3]._fusion is None
+
+    def test_fuse_converted_mappers(self, mappers: list[MimicObservationMapper]):
+        mappers[1].push_conversion("Pa", 133.322, 0.0)
+        fused_queries = fuse_mappers(mappers)
+
+        # Mappers, whose values are converted differently, can't share their rows
+        assert len(fused_queries) == 1
+        assert mappers[1]._fusion is None
+        assert all(m._fusion is fused_queries[0] for m in (mappers[0], mappers[2]))
+
+    def test_limits(self, mappers: list[MimicObservationMapper], job: Job):
+        mappers[0].push_limits(0.0, 300.0)
+        fused_query = fuse_mappers(mappers)[0]
+        df = pd.DataFrame({"patient_id": [1, 1], "value": [80.0, 400.0], "fusion_key": ["220045", "220050"]})
+
+        # The limits of a single mapper aren't part of the shared query
+        assert "IS NULL OR" not in fused_query.build_query(job).as_string(None)
+        with patch.object(MimicObservationMapper, "read_query", return_value=df):
+            heart_rate = fused_query.get_data(mappers[0], job)
+            blood_pressure = fused_query.get_data(mappers[1], job)
+
+        assert heart_rate["value"].tolist() == [80.0]
+        assert blood_pressure["value"].tolist() == [400.0]
+
+    def test_build_query(self, mappers: list[MimicObservationMapper], job: Job):
+        fused_query = fuse_mappers(mappers)[0]
+
+        query = fused_query.build_query(job).as_string(None)
+        assert '"itemid" AS "fusion_key"' in query
+        assert "\"itemid\" = any('{220045,220050,220179}')" in query
+        assert "subject_id = ANY(%(ids_0)s)" in query
+
+    def test_get_data(self, mappers: list[MimicObservationMapper], job: Job):
+        fused_query = fuse_mappers(mappers)[0]
+        df = pd.DataFrame(
+            {
+                "patient_id": [1, 1, 2, 2],
+                "timestamp": pd.to_datetime(["2173-08-03 16:00"] * 4),
+                "value": [80.0, 120.0, 110.0, 85.0],
+                "fusion_key": [220045, 220050, 220179, 220045],
+            }
+        )
+
+        with patch.object(MimicObservationMapper, "read_query", return_value=df) as read_query:
+            heart_rate = fused_query.get_data(mappers[0], job)
+            blood_pressure = fused_query.get_data(mappers[1], job)
+            invasive_blood_pressure = fused_query.get_data(mappers[2], job)
+
+        read_query.assert_called_once()
+        assert heart_rate["value"].tolist() == [80.0, 85.0]
+        assert blood_pressure["value"].tolist() == [120.0, 110.0]
+        assert invasive_blood_pressure["value"].tolist() == [120.0]
+        assert "fusion_key" not in heart_rate.columns
+
+    def test_get_data_async(self, mappers: list[MimicObservationMapper], job: Job):
+        fused_query = fuse_mappers(mappers)[0]
+        df = pd.DataFrame(
+            {
+                "patient_id": [1, 2],
+                "timestamp": pd.to_datetime(["2173-08-03 16:00"] * 2),
+                "value": [80.0, 120.0],
+                "fusion_key": [220045, 220050],
+            }
+        )
+
+        async def get_data():
+            # The concepts of a job request the fused query concurrently
+            return await asyncio.gather(*(fused_query.get_data_async(m, job) for m in mappers[:3]))
+
+        with patch.object(MimicObservationMapper, "read_query_async", new=AsyncMock(return_value=df)) as read_query:
+            heart_rate, blood_pressure, invasive_blood_pressure = asyncio.run(get_data())
+
+        read_query.assert_awaited_once()
+        assert heart_rate["value"].tolist() == [80.0]
+        assert blood_pressure["value"].tolist() == [120.0]
+        assert invasive_blood_pressure["value"].tolist() == [120.0]
+
+
+class TestFusedColumnQuery:
+    @pytest.fixture
+    def mappers(self):
+        return [
+            create_eicu_mapper("HeartRate", "heartrate"),
+            create_eicu_mapper("OxygenSaturation_Peripheral", "sao2"),
+            create_eicu_mapper("SystolicBloodPressure", "noninvasivesystolic", table="vitalaperiodic"),
+        ]
+
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.EICU, subjects=pd.DataFrame({"patienthealthsystemstayid": [1, 2]}))
+
+    def test_fuse_mappers(self, mappers: list[EICUObservationMapper]):
+        fused_queries = fuse_mappers(mappers)
+
+        assert len(fused_queries) == 1
+        assert isinstance(fused_queries[0], FusedColumnQuery)
+        assert all(m._fusion is fused_queries[0] for m in mappers[:2])
+        assert mappers[2]._fusion is None
+
+    def test_build_query(self, mappers: list[EICUObservationMapper], job: Job):
+        fused_query = fuse_mappers(mappers)[0]
+
+        query = fused_query.build_query(job).as_string(None)
+        assert '"heartrate" AS "fusion_heartrate"' in query
+        assert '"sao2" AS "fusion_sao2"' in query
+        assert "IS NOT NULL" not in query
+        assert "patienthealthsystemstayid = ANY(%(ids_0)s)" in query
+
+    def test_build_query_transforms(self, mappers: list[EICUObservationMapper], job: Job):
+        mappers[0].push_conversion("Hz", 1 / 60, 0.0)
+        fused_query = fuse_mappers(mappers)[0]
+
+        query = fused_query.build_query(job).as_string(None)
+        # Only the values of the converted concept are transformed
+        assert f'"heartrate" * {1 / 60}::float8 AS "fusion_heartrate"' in query
+        assert '"sao2" AS "fusion_sao2"' in query
+
+    def test_get_data(self, mappers: list[EICUObservationMapper], job: Job):
+        fused_query = fuse_mappers(mappers)[0]
+        df = pd.DataFrame(
+            {
+                "patient_id": [1, 1, 2],
+                "time": ["08:00:00"] * 3,
+                "year": [2014] * 3,
+                "offset": [5, 10, 15],
+                "fusion_heartrate": [80.0, None, 90.0],
+                "fusion_sao2": [None, 97.0, 98.0],
+            }
+        )
+
+        with patch.object(EICUObservationMapper, "read_query", return_value=df) as read_query:
+            heart_rate = fused_query.get_data(mappers[0], job)
+            oxygen_saturation = fused_query.get_data(mappers[1], job)
+
+        read_query.assert_called_once()
+        assert heart_rate["value"].tolist() == [80.0, 90.0]
+        assert heart_rate["offset"].tolist() == [5, 15]
+        assert oxygen_saturation["value"].tolist() == [97.0, 98.0]
+        assert "fusion_sao2" not in heart_rate.columns
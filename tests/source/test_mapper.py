@@ -0,0 +1,141 @@
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from icu_pipeline.filter import LimitFilter
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource, SourceConfig
+from icu_pipeline.source.database import SubjectSession
+from icu_pipeline.source.database.mapper import _to_array_literal
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+
+class TestQueryTemplate:
+    @pytest.fixture
+    def mapper(self):
+        return MimicObservationMapper(
+            schema="mimiciv_icu",
+            table="chartevents",
+            constraints={"itemid": "220045"},
+            concept_id="HeartRate",
+            concept_type="snomed",
+            source_config=SourceConfig(connection=""),
+            unit="bpm",
+        )
+
+    def test_build_query(self, mapper: MimicObservationMapper):
+        ids = pd.DataFrame({"subject_id": [1, 2, 3]})
+        query = mapper.build_query(ids=ids, **mapper._query_args).as_string(None)
+
+        assert "subject_id = ANY(%(ids_0)s)" in query
+        # The IDs are bound as parameter instead of being part of the query
+        assert "1,2,3" not in query
+        assert mapper.build_params(ids) == {"ids_0": "{1,2,3}"}
+
+    def test_build_query_multiple_identifiers(self, mapper: MimicObservationMapper):
+        ids = pd.DataFrame({"subject_id": [1, 2], "hadm_id": [10, 20]})
+        query = mapper.build_query(ids=ids, **mapper._query_args).as_string(None)
+
+        assert "(subject_id, hadm_id) IN (SELECT * FROM unnest(%(ids_0)s, %(ids_1)s))" in query
+        assert mapper.build_params(ids) == {"ids_0": [1, 2], "ids_1": [10, 20]}
+
+    def test_build_query_subject_table(self, mapper: MimicObservationMapper):
+        ids = pd.DataFrame({"subject_id": [1, 2, 3]})
+        query = mapper.build_query(ids=ids, subject_table="icu_pipeline_subjects", **mapper._query_args)
+
+        assert '(subject_id) IN (SELECT subject_id FROM "icu_pipeline_subjects")' in query.as_string(None)
+
+    def test_push_conversion(self, mapper: MimicObservationMapper):
+        ids = pd.DataFrame({"subject_id": [1]})
+        assert mapper.supports_conversion()
+
+        mapper.push_conversion("Hz", 1 / 60, 0.0)
+        query = mapper.build_query(ids=ids, **mapper._query_args).as_string(None)
+
+        assert f'"valuenum" * {1 / 60}::float8 AS "value"' in query
+        assert mapper._unit == "Hz"
+
+    def test_push_limits(self, mapper: MimicObservationMapper):
+        ids = pd.DataFrame({"subject_id": [1]})
+
+        mapper.push_limits(0.0, 300.0)
+        query = mapper.build_query(ids=ids, **mapper._query_args).as_string(None)
+        assert '("valuenum" IS NULL OR "valuenum" >= 0.0 AND "valuenum" <= 300.0)' in query
+
+        # The limits are compared to the converted values
+        mapper.push_conversion("Hz", 0.5, 0.0)
+        mapper.push_limits(None, 5.0)
+        query = mapper.build_query(ids=ids, **mapper._query_args).as_string(None)
+        assert '("valuenum" IS NULL OR "valuenum" * 0.5::float8 <= 5.0)' in query
+
+    def test_count_dropped(self, mapper: MimicObservationMapper):
+        job = Job(jobID="0", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1]}))
+        df = pd.DataFrame({"patient_id": [1], "timestamp": pd.to_datetime(["2173-08-03 16:00"]), "value": [80.0]})
+        assert mapper.count_dropped(job) is None
+
+        # The dropped rows are only counted on request, since the count query scans the rows again
+        mapper.push_limits(0.0, 300.0)
+        assert mapper.count_dropped(job) is None
+
+        mapper.push_limits(0.0, 300.0, count_dropped=True)
+        query = mapper.compile_query(job, count_dropped=True)
+        assert "SELECT count(*) AS dropped" in query
+        assert 'NOT (("valuenum" IS NULL OR "valuenum" >= 0.0 AND "valuenum" <= 300.0))' in query
+
+        LimitFilter.reset()
+        with patch.object(MimicObservationMapper, "read_query", side_effect=[df, pd.DataFrame({"dropped": [2]})]):
+            mapper.get_data(job)
+
+        statistics = LimitFilter.get_statistics()["HeartRate"]
+        LimitFilter.reset()
+        assert (statistics.rows, statistics.dropped) == (3, 2)
+
+    def test_session(self, mapper: MimicObservationMapper):
+        session = Mock(spec=SubjectSession, table=SubjectSession.TABLE)
+        job = Job(jobID="0", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1]}), session=session)
+        df = pd.DataFrame({"patient_id": [1], "timestamp": pd.to_datetime(["2173-08-03 16:00"]), "value": [80.0]})
+
+        with patch.object(MimicObservationMapper, "read_query", return_value=df) as read_query:
+            mapper.get_data(job)
+
+        query, params, connection = read_query.call_args.args
+        assert SubjectSession.TABLE in query
+        # The IDs are not sent with the query, and the query runs on the connection of the session
+        assert params is None
+        assert connection is session.connection
+
+    def test_subject_range(self, mapper: MimicObservationMapper):
+        job = Job(
+            jobID="test",
+            database=DataSource.MIMICIV,
+            subjects=pd.DataFrame({"subject_id": [1, 2, 3]}),
+            subject_range=(1, 3),
+        )
+        query = mapper.compile_query(job)
+
+        assert "subject_id = ANY(%(ids_0)s) AND subject_id BETWEEN %(range_lo)s AND %(range_hi)s" in query
+        assert mapper._get_params(job) == {"ids_0": "{1,2,3}", "range_lo": 1, "range_hi": 3}
+
+    def test_array_literal_missing_ids(self):
+        assert _to_array_literal([1, None, float("nan"), 2.0]) == "{1,NULL,NULL,2}"
+        assert _to_array_literal(["a", None, 'b"c']) == '{"a",NULL,"b\\"c"}'
+
+    def test_compile_query_once(self, mapper: MimicObservationMapper):
+        jobs = [
+            Job(jobID=str(i), database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [i, i + 1]}))
+            for i in range(3)
+        ]
+        df = pd.DataFrame({"patient_id": [1], "timestamp": pd.to_datetime(["2173-08-03 16:00"]), "value": [80.0]})
+
+        with (
+            patch.object(MimicObservationMapper, "build_query", wraps=mapper.build_query) as build_query,
+            patch.object(MimicObservationMapper, "read_query", return_value=df) as read_query,
+        ):
+            for job in jobs:
+                mapper.get_data(job)
+
+        build_query.assert_called_once()
+        queries = {c.args[0] for c in read_query.call_args_list}
+        assert len(queries) == 1
+        assert read_query.call_args.args[1] == {"ids_0": "{2,3}"}
@@ -8,6 +8,7 @@ from pandas import Timestamp
 from icu_pipeline.schema.fhir import (
     FHIRObservation,
 )
+from icu_pipeline.source import SourceConfig
 from icu_pipeline.source.mimiciv import MimicObservationMapper
 
 
@@ -24,7 +25,7 @@ class TestObservationMapper:
                 constraints={"itemid": "220045"},
                 concept_id="364075005",
                 concept_type="snomed",
-                source_config="test",
+                source_config=SourceConfig(connection="test"),
                 unit="bpm",
             )
 
@@ -92,10 +93,10 @@ class TestObservationMapper:
         assert len(observation_df.index) == 10
         FHIRObservation.validate(observation_df)  # will raise an exception if invalid
 
-        assert observation_df[FHIRObservation.subject][0]["reference"] == "1234"
-        assert observation_df[FHIRObservation.subject][0]["type"] == "mimiciv"
+        assert observation_df[FHIRObservation.subject__reference][0] == "1234"
+        assert observation_df[FHIRObservation.subject__type][0] == "mimiciv"
         assert observation_df[FHIRObservation.effective_date_time][0] == Timestamp("2173-08-03 16:00:00", tz="UTC")
-        assert observation_df[FHIRObservation.value_quantity][0]["value"] == 107.0
-        assert observation_df[FHIRObservation.value_quantity][0]["unit"] == "bpm"
-        assert observation_df[FHIRObservation.code][0]["coding"]["code"] == "364075005"
-        assert observation_df[FHIRObservation.code][0]["coding"]["system"] == "snomed"
+        assert observation_df[FHIRObservation.value_quantity__value][0] == 107.0
+        assert observation_df[FHIRObservation.value_quantity__unit][0] == "bpm"
+        assert observation_df[FHIRObservation.code__coding__code][0] == "364075005"
+        assert observation_df[FHIRObservation.code__coding__system][0] == "snomed"
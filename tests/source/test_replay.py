@@ -0,0 +1,89 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from conceptbase.config import SourceBackend
+from icu_pipeline.job import Job
+from icu_pipeline.source import AbstractSourceMapper, DataSource, SourceConfig, getBackendMapper, getDataSampler
+from icu_pipeline.source.mimiciv import MimicObservationMapper, MimicSampler
+from icu_pipeline.source.replay import QueryArchive, RecordingSourceMapper, ReplaySourceMapper
+
+pytest.importorskip("pyarrow")
+
+
+def create_mapper(source_config: SourceConfig) -> AbstractSourceMapper:
+    mapper = MimicObservationMapper(
+        schema="mimiciv_icu",
+        table="chartevents",
+        constraints={"itemid": "220045"},
+        concept_id="HeartRate",
+        concept_type="snomed",
+        source_config=source_config,
+        unit="bpm",
+    )
+    return getBackendMapper(mapper, source_config)
+
+
+class TestReplay:
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                "patient_id": [1, 2],
+                "timestamp": pd.to_datetime(["2173-08-03 16:00", "2173-08-03 17:00"]),
+                "value": [80.0, 90.0],
+            }
+        )
+
+    def test_for_config(self, tmp_path: Path):
+        assert QueryArchive.for_replay(SourceConfig(connection="postgresql://localhost/mimic")) is None
+        assert QueryArchive.for_recording(SourceConfig(connection="postgresql://localhost/mimic")) is None
+        replay_config = SourceConfig(connection=str(tmp_path), backend=SourceBackend.REPLAY)
+        assert QueryArchive.for_replay(replay_config)._directory == tmp_path
+
+    def test_record_replay(self, tmp_path: Path, job: Job, df: pd.DataFrame):
+        recording = create_mapper(SourceConfig(connection="postgresql://localhost/mimic", record_dir=str(tmp_path)))
+        with patch.object(MimicObservationMapper, "read_query", return_value=df):
+            recorded = recording.get_data(job)
+
+        replaying = create_mapper(SourceConfig(connection=str(tmp_path), backend=SourceBackend.REPLAY))
+        with patch.object(MimicObservationMapper, "read_query") as read_query:
+            replayed = replaying.get_data(job)
+
+        assert isinstance(recording, RecordingSourceMapper)
+        assert isinstance(replaying, ReplaySourceMapper)
+        read_query.assert_not_called()
+        pd.testing.assert_frame_equal(recorded, replayed)
+        assert "chartevents" in next((tmp_path / "HeartRate").glob("*.json")).read_text()
+
+    def test_replay_batches(self, tmp_path: Path, job: Job, df: pd.DataFrame):
+        source_config = SourceConfig(connection="postgresql://localhost/mimic", fetch_size=1, record_dir=str(tmp_path))
+        with patch.object(MimicObservationMapper, "read_query_batches", return_value=iter([df[:1], df[1:]])):
+            list(create_mapper(source_config).get_batches(job))
+
+        replaying = create_mapper(SourceConfig(connection=str(tmp_path), backend=SourceBackend.REPLAY, fetch_size=1))
+
+        assert [len(b) for b in replaying.get_batches(job)] == [1, 1]
+
+    def test_replay_missing(self, tmp_path: Path, job: Job):
+        mapper = create_mapper(SourceConfig(connection=str(tmp_path), backend=SourceBackend.REPLAY))
+
+        with pytest.raises(KeyError):
+            mapper.get_data(job)
+
+    def test_replay_samples(self, tmp_path: Path):
+        samples = [pd.DataFrame({"subject_id": [1, 2]}), pd.DataFrame({"subject_id": [3]})]
+        source_config = SourceConfig(connection="postgresql://localhost/mimic", record_dir=str(tmp_path))
+        with patch.object(MimicSampler, "_get_samples", return_value=iter(samples)):
+            list(getDataSampler(DataSource.MIMICIV, source_config).get_samples())
+
+        replay_config = SourceConfig(connection=str(tmp_path), backend=SourceBackend.REPLAY)
+        replayed = list(getDataSampler(DataSource.MIMICIV, replay_config).get_samples())
+
+        assert [s["subject_id"].tolist() for s in replayed] == [[1, 2], [3]]
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from conceptbase.config import SamplingStrategy
+from icu_pipeline.source import SourceConfig
+from icu_pipeline.source.database.sampler import pack_chunks
+from icu_pipeline.source.mimiciv import MimicSampler
+
+
+class TestRangeSampler:
+    @pytest.fixture
+    def sampler(self):
+        return MimicSampler(SourceConfig(connection="", chunksize=100, limit=1000, sampling=SamplingStrategy.RANGE))
+
+    def test_build_partition_query(self, sampler: MimicSampler):
+        query = sampler.build_partition_query().as_string(None)
+
+        assert 'SELECT min("subject_id") AS lo, max("subject_id") AS hi' in query
+        assert '(row_number() OVER (ORDER BY "subject_id") - 1) / 100 AS partition' in query
+        assert 'FROM "mimiciv_icu"."icustays"' in query
+        assert "LIMIT 1000" in query
+
+    def test_build_range_query(self, sampler: MimicSampler):
+        query = sampler.build_range_query().as_string(None)
+
+        assert 'WHERE "subject_id" BETWEEN %(lo)s AND %(hi)s' in query
+        assert 'ORDER BY "subject_id"' in query
+
+    def test_get_subject_range(self, sampler: MimicSampler):
+        subjects = pd.DataFrame({"subject_id": [3, 5, 8]})
+
+        assert sampler.get_subject_range(subjects) == (3, 8)
+        assert sampler.get_subject_range(subjects.iloc[:0]) is None
+
+    def test_get_subject_range_distinct(self):
+        sampler = MimicSampler(SourceConfig(connection=""))
+
+        assert sampler.get_subject_range(pd.DataFrame({"subject_id": [3, 5, 8]})) is None
+
+
+class TestWeightedSampler:
+    @pytest.fixture
+    def sampler(self):
+        return MimicSampler(SourceConfig(connection="", chunksize=100, sampling=SamplingStrategy.WEIGHTED))
+
+    def test_build_weight_query(self, sampler: MimicSampler):
+        query = sampler.build_weight_query().as_string(None)
+
+        assert 'SELECT "subject_id", sum(COALESCE("los", 0)) AS weight' in query
+        assert 'GROUP BY "subject_id"' in query
+        assert 'ORDER BY "subject_id"' in query
+        assert "LIMIT ALL" in query
+
+    def test_pack_chunks(self):
+        chunks = pack_chunks([1.0, 1.0, 1.0, 10.0, 1.0, 2.0, 1.0], target=3.0)
+
+        assert chunks == [slice(0, 3), slice(3, 4), slice(4, 6), slice(6, 7)]
+
+    def test_pack_chunks_heavy_subject(self):
+        # A heavy subject closes the current chunk and gets a chunk of its own
+        chunks = pack_chunks([1.0, 5.0, 1.0], target=2.0)
+
+        assert chunks == [slice(0, 1), slice(1, 2), slice(2, 3)]
+
+    def test_get_subject_range(self, sampler: MimicSampler):
+        assert sampler.get_subject_range(pd.DataFrame({"subject_id": [3, 5, 8]})) == (3, 8)
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource, SourceConfig
+from icu_pipeline.source.mimiciv import MimicObservationMapper
+
+
+def create_mapper(fetch_size: int) -> MimicObservationMapper:
+    return MimicObservationMapper(
+        schema="mimiciv_icu",
+        table="chartevents",
+        constraints={"itemid": "220045"},
+        concept_id="HeartRate",
+        concept_type="snomed",
+        source_config=SourceConfig(connection="", fetch_size=fetch_size),
+        unit="bpm",
+    )
+
+
+class TestStreaming:
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1, 2]}))
+
+    @pytest.fixture
+    def batches(self):
+        return [
+            pd.DataFrame(
+                {
+                    "patient_id": [1, 1],
+                    "timestamp": pd.to_datetime(["2173-08-03 16:00", "2173-08-03 17:00"]),
+                    "value": [80.0, 81.0],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "patient_id": [2],
+                    "timestamp": pd.to_datetime(["2173-08-03 16:00"]),
+                    "value": [90.0],
+                }
+            ),
+        ]
+
+    def test_get_batches(self, job: Job, batches: list[pd.DataFrame]):
+        mapper = create_mapper(fetch_size=2)
+
+        with patch.object(MimicObservationMapper, "read_query_batches", return_value=iter(batches)) as read_batches:
+            result = list(mapper.get_batches(job))
+
+        assert read_batches.call_args.args[2] == 2
+        assert [len(df) for df in result] == [2, 1]
+        assert result[1]["value_quantity__value"].iloc[0] == 90.0
+
+    def test_get_batches_without_fetch_size(self, job: Job, batches: list[pd.DataFrame]):
+        mapper = create_mapper(fetch_size=-1)
+
+        with patch.object(MimicObservationMapper, "read_query", return_value=pd.concat(batches)) as read_query:
+            result = list(mapper.get_batches(job))
+
+        read_query.assert_called_once()
+        assert [len(df) for df in result] == [3]
@@ -1,8 +1,13 @@
 import pandas as pd
+import pytest
+
 from icu_pipeline.source.utils import (
     to_timestamp,
+    to_timestamps,
     offset_to_timestamp,
+    offsets_to_timestamps,
     offset_to_period,
+    offsets_to_periods,
 )
 
 
@@ -20,3 +25,48 @@ class TestUtils:
         period = offset_to_period(2022, "12:00", 60, 120)
         assert period["start"] == pd.Timestamp("2022-01-01T13:00", tz="UTC")
         assert period["end"] == pd.Timestamp("2022-01-01T15:00", tz="UTC")
+
+
+class TestVectorizedUtils:
+    @pytest.fixture(params=["numpy", "pyarrow"])
+    def df(self, request):
+        if request.param == "pyarrow":
+            pytest.importorskip("pyarrow")
+        df = pd.DataFrame(
+            {
+                "time": ["12:00:00", "08:30:00", "12:00:00", "23:59:00"],
+                "year": [2022, 2014, 2022, 2015],
+                "offset": [60, -15, 1440, 0],
+                "discharge": [120, 30, 5, 1],
+            },
+            index=[3, 5, 7, 9],
+        )
+        return df if request.param == "numpy" else df.convert_dtypes(dtype_backend="pyarrow")
+
+    def test_to_timestamps(self, df: pd.DataFrame):
+        timestamps = to_timestamps(df["time"], df["year"])
+
+        assert timestamps.dtype == "datetime64[ns, UTC]"
+        assert timestamps.index.equals(df.index)
+        assert timestamps.tolist() == [to_timestamp(t, y) for t, y in zip(df["time"], df["year"])]
+
+    def test_offsets_to_timestamps(self, df: pd.DataFrame):
+        timestamps = offsets_to_timestamps(to_timestamps(df["time"], df["year"]), df["offset"])
+
+        assert timestamps.tolist() == [
+            offset_to_timestamp(to_timestamp(t, y), o) for t, y, o in zip(df["time"], df["year"], df["offset"])
+        ]
+
+    def test_offsets_to_periods(self, df: pd.DataFrame):
+        periods = offsets_to_periods(df["year"], df["time"], df["offset"], df["discharge"])
+
+        assert periods.to_dict("records") == [
+            offset_to_period(y, t, o, d) for y, t, o, d in zip(df["year"], df["time"], df["offset"], df["discharge"])
+        ]
+
+    def test_missing_values(self):
+        timestamps = to_timestamps(pd.Series(["12:00", None]), pd.Series([2022, 2022]))
+
+        assert timestamps[0] == pd.Timestamp("2022-01-01T12:00", tz="UTC")
+        assert pd.isna(timestamps[1])
+        assert to_timestamps(pd.Series([], dtype=object), pd.Series([], dtype="int64")).empty
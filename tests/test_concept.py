@@ -11,6 +11,7 @@ from icu_pipeline.concept import (
     DataSource,
     SourceConfig,
 )
+from icu_pipeline.unit import BaseConverter, ConverterConfig
 
 
 class TestConcept:
@@ -47,3 +48,35 @@ class TestConcept:
     #     chunk = example_concept.map()
     #     assert chunk is not None
     #     assert next(chunk) is not None
+
+    def test_push_conversion(self, example_concept: Concept):
+        config = ConverterConfig(concept_id="HeartRate", source_units={DataSource.MIMICIV: "bpm"}, sink_unit="Hz")
+        converter = BaseConverter.getConverter(config)
+
+        assert example_concept.pushConversion(converter)
+        mapper = example_concept._data_sources[DataSource.MIMICIV]
+        assert mapper._query_args["transforms"]["value"] == pytest.approx((1 / 60, 0.0))
+        assert mapper._unit == "Hz"
+
+    def test_push_identity_conversion(self, example_concept: Concept):
+        # The values of sources in the unit of the concept are passed unchanged
+        assert example_concept.pushConversion(example_concept.getDefaultConverter())
+        assert not example_concept._data_sources[DataSource.MIMICIV]._query_args.get("transforms")
+
+    def test_limits(self, example_concept: Concept):
+        assert example_concept._concept_config.lower_limit == 0.0
+        assert example_concept._concept_config.upper_limit == 300.0
+        # Concepts without limits declare them as empty strings
+        config = ConceptConfig(**{**example_concept._concept_config.model_dump(), "lower_limit": ""})
+        assert config.lower_limit is None
+
+    def test_push_limits(self, example_concept: Concept):
+        assert example_concept.pushLimits(0.0, 300.0)
+        mapper = example_concept._data_sources[DataSource.MIMICIV]
+        assert mapper._query_args["limits"] == {"value": (0.0, 300.0)}
+
+    def test_push_limits_other_unit(self, example_concept: Concept):
+        # Values in another unit than the one of the concept can't be compared to its limits
+        example_concept._concept_config.unit = "Hz"
+        assert not example_concept.pushLimits(0.0, 5.0)
+        assert "limits" not in example_concept._data_sources[DataSource.MIMICIV]._query_args
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from icu_pipeline.filter import LimitFilter
+
+
+class TestLimitFilter:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        LimitFilter.reset()
+        yield
+        LimitFilter.reset()
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                "subject__reference": ["1", "1", "2", "2", "3"],
+                "value_quantity__value": [-5.0, 80.0, float("nan"), 300.0, 301.0],
+                "value_quantity__unit": ["bpm"] * 5,
+            }
+        )
+
+    def test_filter(self, df: pd.DataFrame):
+        filtered = LimitFilter("HeartRate", 0.0, 300.0).filter(df)
+
+        # Missing values and values at the limits are plausible
+        assert filtered["value_quantity__value"].tolist()[0] == 80.0
+        assert filtered["value_quantity__value"].isna().tolist() == [False, True, False]
+        assert filtered["value_quantity__value"].tolist()[2] == 300.0
+        assert filtered.index.tolist() == [0, 1, 2]
+
+        statistics = LimitFilter.get_statistics()["HeartRate"]
+        assert (statistics.rows, statistics.dropped) == (5, 2)
+
+    def test_open_limits(self, df: pd.DataFrame):
+        assert len(LimitFilter("HeartRate", None, 100.0).filter(df)) == 3
+        assert len(LimitFilter("HeartRate", 0.0, None).filter(df)) == 4
+        assert LimitFilter.get_statistics()["HeartRate"].dropped == 3
+
+    def test_unchanged(self, df: pd.DataFrame):
+        assert len(LimitFilter("HeartRate", None, None).filter(df)) == 5
+        # Frames without a value field can't be filtered
+        assert len(LimitFilter("Gender", 0.0, 1.0).filter(df.drop(columns=["value_quantity__value"]))) == 5
+        assert "Gender" not in LimitFilter.get_statistics()
@@ -0,0 +1,62 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from icu_pipeline.graph.asynchronous import AsyncNode, AsyncPipe
+from icu_pipeline.job import Job
+from icu_pipeline.source import DataSource
+
+
+class SlowSource(AsyncNode):
+    running = 0
+    max_running = 0
+
+    async def get_data_async(self, job: Job) -> pd.DataFrame:
+        SlowSource.running += 1
+        SlowSource.max_running = max(SlowSource.max_running, SlowSource.running)
+        await asyncio.sleep(0.05)
+        SlowSource.running -= 1
+        return pd.DataFrame({"value": [self._concept_id]})
+
+
+class Merge(AsyncNode):
+    def get_data(self, job: Job, *args, **kwargs) -> pd.DataFrame:
+        return pd.concat(self.fetch_sources(job).values(), ignore_index=True)
+
+
+def connect(source: AsyncNode, sink: AsyncNode) -> None:
+    pipe = AsyncPipe(source, sink)
+    source._sinks[source._concept_id] = pipe
+    sink._sources[source._concept_id] = pipe
+
+
+class TestAsyncGraph:
+    @pytest.fixture
+    def job(self):
+        return Job(jobID="test", database=DataSource.MIMICIV, subjects=pd.DataFrame({"subject_id": [1]}))
+
+    def test_fetch_sources_concurrently(self, job: Job):
+        SlowSource.max_running = 0
+        sink = Merge("sink")
+        for i in range(5):
+            connect(SlowSource(f"concept_{i}"), sink)
+
+        data = sink.fetch_sources(job)
+
+        assert sorted(data) == [f"concept_{i}" for i in range(5)]
+        assert SlowSource.max_running == 5
+
+    def test_nested_nodes(self, job: Job):
+        # Synchronous nodes in worker threads read the data, which was fetched before they started
+        sink = Merge("sink")
+        for i in range(2):
+            merge = Merge(f"merge_{i}")
+            for j in range(3):
+                connect(SlowSource(f"concept_{i}_{j}"), merge)
+            connect(merge, sink)
+
+        data = sink.fetch_source_batches(job)
+
+        assert sorted(data) == ["merge_0", "merge_1"]
+        assert next(data["merge_1"])["value"].tolist() == ["concept_1_0", "concept_1_1", "concept_1_2"]
@@ -1,13 +1,18 @@
 import pytest
 import os
+from pathlib import Path
 from dotenv import load_dotenv
+from conceptbase.config import SourceBackend, ValidationMode
 from icu_pipeline.pipeline import (
     Pipeline,
     DataSource,
     SourceConfig,
 )
 from icu_pipeline.concept import Concept
+from icu_pipeline.filter import LimitFilter
+from icu_pipeline.schema.validation import SchemaValidator
 from icu_pipeline.sink.file import CSVFileSinkMapper
+from icu_pipeline.sink.pandas import PandasSink
 
 
 class TestPipeline:
@@ -57,3 +62,38 @@ class TestPipeline:
         # TODO - Test is currently not working
         # assert os.path.exists("output")
         # assert os.path.exists("output/HeartRate.csv")
+
+
+class TestReplayPipeline:
+    @pytest.fixture
+    def pipeline(self):
+        pytest.importorskip("pyarrow")
+        # Recorded from a database with a `record_dir`, the fixture has to be recorded again when the queries change
+        archive = Path(__file__).parent / "fixtures" / "replay"
+        source_config = SourceConfig(connection=str(archive), backend=SourceBackend.REPLAY, limit=4, chunksize=2)
+        return Pipeline({DataSource.MIMICIV: source_config}, PandasSink(), count_dropped=True)
+
+    def test_transform(self, pipeline: Pipeline):
+        """
+        Test run for the whole pipeline on the recorded query results of a run, without a database.
+        """
+        LimitFilter.reset()
+        SchemaValidator.reset()
+        results = list(pipeline.transform(["HeartRate", "Gender"]))
+
+        assert [sorted(result["Gender"]["subject__reference"]) for result in results] == [["29", "42"], ["34", "4"]]
+        assert [len(result["HeartRate"]) for result in results] == [48, 48]
+        assert results[0]["HeartRate"]["value_quantity__value"].between(20, 300).all()
+        # The rows dropped by the pushed limits of the recorded run are counted again, also by the processes of the graph
+        assert LimitFilter.get_statistics()["HeartRate"].rows == 96
+        # Both chunks of both concepts are validated completely
+        assert SchemaValidator.get_statistics()["FHIRObservation"].frames == 4
+
+    def test_validation(self, pipeline: Pipeline):
+        pipeline = Pipeline(pipeline._source_configs, PandasSink(), validation=ValidationMode.FIRST)
+
+        list(pipeline.transform(["HeartRate", "Gender"]))
+
+        # Only the first chunk of every concept is validated, also by the processes of the graph
+        statistics = SchemaValidator.get_statistics()["FHIRObservation"]
+        assert (statistics.frames, statistics.skipped) == (2, 2)
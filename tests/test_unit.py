@@ -0,0 +1,198 @@
+import pandas as pd
+import pytest
+
+from icu_pipeline.schema.fhir import FHIRMedicationStatement
+from icu_pipeline.source import DataSource
+from icu_pipeline.unit import BaseConverter, ConverterConfig, Unit, UnitRegistry
+from icu_pipeline.unit.dosage import DosageConverter
+from icu_pipeline.unit.frequency import FrequencyConverter
+from icu_pipeline.unit.mass import MassConverter
+from icu_pipeline.unit.pressure import PressureConverter
+from icu_pipeline.unit.temperature import TemperatureConverter
+
+
+def create_converter(source_unit: str, sink_unit: str) -> BaseConverter:
+    return BaseConverter.getConverter(
+        ConverterConfig(concept_id="Concept", source_units={DataSource.MIMICIV: source_unit}, sink_unit=sink_unit)
+    )
+
+
+class TestConverter:
+    @pytest.mark.parametrize(
+        "source_unit, sink_unit, values, expected",
+        [
+            ("mmHg", "Pa", [1.0, 2.0], [133.322, 266.644]),
+            ("bar", "mbar", [1.0], [1000.0]),
+            ("°F", "°C", [32.0, 212.0], [0.0, 100.0]),
+            ("°C", "K", [0.0], [273.15]),
+            ("mg", "g", [1500.0], [1.5]),
+            ("kg", "mg", [1.0], [1e6]),
+            ("cm", "m", [180.0], [1.8]),
+            ("ml", "l", [500.0], [0.5]),
+            ("mg/dl", "g/l", [100.0], [1.0]),
+            ("mcg/kg/min", "mg/kg/h", [1.0], [0.06]),
+            ("milliunit", "unit", [1000.0], [1.0]),
+            ("h", "min", [2.0], [120.0]),
+            ("bpm", "Hz", [60.0], [1.0]),
+        ],
+    )
+    def test_convert(self, source_unit: str, sink_unit: str, values: list[float], expected: list[float]):
+        converter = create_converter(source_unit, sink_unit)
+        df = pd.DataFrame({"value_quantity__value": values, "value_quantity__unit": source_unit})
+
+        converted = converter.convert(source_unit, sink_unit, {"Concept": df})["Concept"]
+
+        assert converted["value_quantity__value"].tolist() == pytest.approx(expected)
+        assert converted["value_quantity__unit"].tolist() == [sink_unit] * len(values)
+
+    def test_missing_values(self):
+        df = pd.DataFrame({"value_quantity__value": [float("nan"), 50.0], "value_quantity__unit": "°F"})
+
+        converted = create_converter("°F", "°C").convert("°F", "°C", {"Concept": df})["Concept"]
+
+        assert converted["value_quantity__value"].isna().tolist() == [True, False]
+
+    def test_transforms(self):
+        assert PressureConverter.AVAILABLE_UNITS == ["Pa", "mmHg", "bar", "mbar", "cmH2O"]
+        assert MassConverter.getTransform("g", "g") == (1.0, 0.0)
+        # The transforms are composed once per pair of units
+        transform = TemperatureConverter.getTransform("°F", "°C")
+        assert UnitRegistry._transforms[("°F", "°C")] == transform
+
+    def test_get_converter(self):
+        assert isinstance(create_converter("°F", "°C"), TemperatureConverter)
+        assert isinstance(create_converter("1/h", "bpm"), FrequencyConverter)
+        # Compound units without a converter of their dimension are converted by the registry alone
+        assert type(create_converter("mg/kg/h", "ug/kg/min")) is BaseConverter
+
+    def test_unknown_unit(self):
+        with pytest.raises(NotImplementedError):
+            MassConverter.getTransform("mg", "Pa")
+        with pytest.raises(AssertionError):
+            create_converter("Pa", "kg")
+        with pytest.raises(KeyError):
+            create_converter("mg/fortnight", "ug/kg/min")
+
+
+class TestUnitRegistry:
+    def test_get(self):
+        assert UnitRegistry.get("mmHg") == Unit((("Pa",), ()), 133.322)
+        assert UnitRegistry.get("°C") == Unit((("K",), ()), 1.0, 273.15)
+
+    def test_compound(self):
+        unit = UnitRegistry.get("ug/kg/min")
+
+        assert unit.dimension == (("kg",), ("kg", "s"))
+        assert unit.factor == pytest.approx(1e-9 / 60)
+        # Parsed units are kept
+        assert UnitRegistry._units["ug/kg/min"] is unit
+        assert UnitRegistry.get("mg/dl").dimension == UnitRegistry.get("g/l").dimension
+        assert UnitRegistry.get("1/h").dimension == UnitRegistry.get("Hz").dimension
+        assert UnitRegistry.get("mg*h/l").dimension == (("kg", "s"), ("l",))
+
+    @pytest.mark.parametrize(
+        "source_unit, sink_unit, factor",
+        [
+            ("mg/kg/h", "ug/kg/min", 1000 / 60),
+            ("mg/dl", "g/l", 0.01),
+            ("ml/h", "l/min", 1e-3 / 60),
+            ("1/min", "1/h", 60.0),
+        ],
+    )
+    def test_get_transform(self, source_unit: str, sink_unit: str, factor: float):
+        assert UnitRegistry.get_transform(source_unit, sink_unit) == (pytest.approx(factor), 0.0)
+
+    def test_invalid(self):
+        with pytest.raises(KeyError):
+            UnitRegistry.get("mg/fortnight")
+        with pytest.raises(ValueError):
+            UnitRegistry.get("°C/min")
+        with pytest.raises(NotImplementedError):
+            UnitRegistry.get_transform("ug/kg/min", "ug/min")
+
+
+class TestDosageConverter:
+    @pytest.fixture
+    def converter(self):
+        return create_converter("mg/time", "ug/kg/min")
+
+    @pytest.fixture
+    def dosages(self):
+        return pd.DataFrame(
+            {
+                "subject__reference": pd.Categorical(["1", "1", "2", "2", "3"]),
+                "effective_period__start": pd.to_datetime(
+                    [
+                        "2173-08-03 10:00",
+                        "2173-08-03 16:00",
+                        "2173-08-03 16:00",
+                        "2173-08-03 18:00",
+                        "2173-08-03 16:00",
+                    ],
+                    utc=True,
+                ),
+                "effective_period__end": pd.to_datetime(
+                    [
+                        "2173-08-03 11:00",
+                        "2173-08-03 17:00",
+                        "2173-08-03 16:30",
+                        "2173-08-03 18:00",
+                        "2173-08-03 17:00",
+                    ],
+                    utc=True,
+                ),
+                "dosage__dose_quantity__value": [0.6, 0.6, 0.3, 1.0, 0.6],
+                "dosage__dose_quantity__unit": "mg/time",
+                "dosage__rate_quantity__value": float("nan"),
+                "dosage__rate_quantity__unit": pd.Categorical([None] * 5),
+            }
+        )
+
+    @pytest.fixture
+    def weights(self):
+        return pd.DataFrame(
+            {
+                "subject__reference": pd.Categorical(["2", "1", "1"]),
+                "effective_date_time": pd.to_datetime(
+                    ["2173-08-03 12:00", "2173-08-03 12:00", "2173-08-03 15:00"], utc=True
+                ),
+                "value_quantity__value": [50.0, 100.0, 50.0],
+                "value_quantity__unit": "kg",
+            }
+        )
+
+    def test_get_converter(self, converter: BaseConverter):
+        assert isinstance(converter, DosageConverter)
+        assert converter.REQUIRED_CONCEPTS == ["BodyWeight"]
+        # The conversion depends on the weights, so it can't be pushed into the mappers
+        assert converter.getLinearTransforms() is None
+        assert isinstance(create_converter("IE/time", "IE/kg/min"), DosageConverter)
+        with pytest.raises(NotImplementedError):
+            create_converter("mg/time", "ug/min")
+
+    def test_convert(self, converter: DosageConverter, dosages: pd.DataFrame, weights: pd.DataFrame):
+        data = converter.convert("mg/time", "ug/kg/min", {"Concept": dosages, "BodyWeight": weights})
+
+        rates = data["Concept"][FHIRMedicationStatement.dosage__rate_quantity__value]
+        # 600 ug over 60 min: before the first weight (100 kg), after the latest weight (50 kg),
+        # 300 ug over 30 min of 50 kg, a bolus without duration and a patient without weight
+        assert rates.tolist()[:3] == pytest.approx([0.1, 0.2, 0.2])
+        assert rates.isna().tolist()[3:] == [True, True]
+        assert data["Concept"][FHIRMedicationStatement.dosage__rate_quantity__unit].tolist() == ["ug/kg/min"] * 5
+        assert data["Concept"][FHIRMedicationStatement.dosage__dose_quantity__value].tolist()[0] == 0.6
+
+    def test_convert_without_weights(self, converter: DosageConverter, dosages: pd.DataFrame, weights: pd.DataFrame):
+        data = converter.convert("mg/time", "ug/kg/min", {"Concept": dosages, "BodyWeight": weights.iloc[:0]})
+
+        assert data["Concept"][FHIRMedicationStatement.dosage__rate_quantity__value].isna().all()
+
+    def test_convert_without_start(self, converter: DosageConverter, dosages: pd.DataFrame, weights: pd.DataFrame):
+        dosages["effective_period__start"] = dosages["effective_period__start"].where(dosages.index != 1)
+
+        data = converter.convert("mg/time", "ug/kg/min", {"Concept": dosages, "BodyWeight": weights})
+
+        # A record without a start has no weight, the others are joined to their weights as before
+        rates = data["Concept"][FHIRMedicationStatement.dosage__rate_quantity__value]
+        assert rates[0] == pytest.approx(0.1)
+        assert pd.isna(rates[1])
+        assert rates[2] == pytest.approx(0.2)